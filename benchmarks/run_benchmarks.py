@@ -0,0 +1,181 @@
+# benchmarks/run_benchmarks.py - python -m benchmarks.run_benchmarks run|compare
+import argparse
+import contextlib
+import gc
+import importlib.util
+import io
+import json
+import os
+import platform
+import shutil
+import sys
+import tempfile
+from datetime import datetime
+from src.instrumentation import Instrumentation
+from benchmarks.stages import ROW_BENCHMARKS, SERIES_BENCHMARKS, row_context, series_context
+
+TIERS = {
+    'smoke': {'rows': [10_000], 'series': [1, 100]},
+    'default': {'rows': [10_000, 100_000, 1_000_000], 'series': [1, 100, 1_000]},
+    'full': {'rows': [10_000, 100_000, 1_000_000, 10_000_000], 'series': [1, 100, 1_000, 10_000]}
+}
+
+# Differences below these are noise, whatever the ratio
+MIN_SECONDS = 0.05
+MIN_MB = 10.0
+
+def machine_info():
+    return {'python': platform.python_version(), 'platform': platform.platform(),
+            'processor': platform.processor(), 'cpu_count': os.cpu_count()}
+
+def measure(instrumentation, benchmark, ctx, repeats, verbose=False):
+    """Best-of-repeats wall/CPU time and the largest peak RSS growth of one benchmark"""
+    if benchmark.optional_import and importlib.util.find_spec(benchmark.optional_import) is None:
+        return {'status': f'skipped: {benchmark.optional_import} not installed'}, None
+    
+    runs = []
+    result = None
+    for _ in range(repeats):
+        args = benchmark.setup(ctx)
+        gc.collect()
+        output = io.StringIO() if not verbose else sys.stdout
+        with contextlib.redirect_stdout(output), instrumentation.stage(benchmark.name) as record:
+            result = benchmark.run(*args)
+        del args
+        runs.append(record)
+    
+    return {
+        'status': 'ok',
+        'wall_s': min(r['wall_s'] for r in runs),
+        'cpu_s': min(r['cpu_s'] for r in runs),
+        'peak_mb': round(max(r['peak_rss_mb'] - r['rss_start_mb'] for r in runs), 1),
+        'repeats': repeats
+    }, result
+
+def run_axis(axis, benchmarks, sizes, make_context, scratch, repeats, only=None, verbose=False):
+    results = []
+    for size in sizes:
+        print(f"📏 {axis} = {size:,}")
+        ctx = make_context(size, scratch)
+        instrumentation = Instrumentation(output_dir=scratch)
+        # Big inputs are timed once; small ones take the best of several runs
+        size_repeats = repeats if size < 1_000_000 else 1
+        for benchmark in benchmarks:
+            if only and benchmark.name not in only and benchmark.provides is None:
+                continue
+            try:
+                entry, output = measure(instrumentation, benchmark, ctx, size_repeats, verbose)
+            except Exception as e:
+                entry, output = {'status': f'error: {type(e).__name__}: {e}'}, None
+            if benchmark.provides:
+                ctx[benchmark.provides] = output
+            entry.update({'benchmark': benchmark.name, 'axis': axis, 'size': size})
+            if axis == 'series' and 'hierarchy' in ctx and ctx['hierarchy'] is not None:
+                entry['n_series'] = ctx['hierarchy'].n_series
+            results.append(entry)
+            if entry['status'] == 'ok':
+                print(f"   • {benchmark.name}: {entry['wall_s']:.3f}s wall, {entry['cpu_s']:.3f}s CPU, "
+                      f"+{entry['peak_mb']:.0f} MB peak")
+            else:
+                print(f"   • {benchmark.name}: {entry['status']}")
+        del ctx
+        gc.collect()
+    return results
+
+def run_suite(tier='default', rows=None, series=None, repeats=3, only=None, verbose=False):
+    """Run every benchmark over the tier's sizes; returns the baseline document"""
+    sizes = TIERS[tier]
+    scratch = tempfile.mkdtemp(prefix='benchmarks-')
+    cwd = os.getcwd()
+    # Stages writing to relative paths (reports/, powerbi/) write into the scratch directory
+    os.makedirs(os.path.join(scratch, 'reports'), exist_ok=True)
+    os.makedirs(os.path.join(scratch, 'data'), exist_ok=True)
+    os.chdir(scratch)
+    try:
+        results = run_axis('rows', ROW_BENCHMARKS, rows or sizes['rows'], row_context, scratch,
+                           repeats, only, verbose)
+        results += run_axis('series', SERIES_BENCHMARKS, series or sizes['series'], series_context, scratch,
+                            repeats, only, verbose)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(scratch, ignore_errors=True)
+    return {'created': datetime.now().isoformat(timespec='seconds'), 'tier': tier,
+            'machine': machine_info(), 'results': results}
+
+def compare(baseline, current, threshold=0.2):
+    """Benchmarks whose time or peak memory grew by more than threshold over the baseline"""
+    if baseline.get('machine') != current.get('machine'):
+        print("⚠️ Baseline was recorded on a different machine - comparisons are indicative only")
+    previous = {(r['benchmark'], r['axis'], r['size']): r for r in baseline['results'] if r['status'] == 'ok'}
+    regressions = []
+    print(f"{'benchmark':<28}{'axis':<8}{'size':>12}{'time':>10}{'memory':>10}")
+    for entry in current['results']:
+        key = (entry['benchmark'], entry['axis'], entry['size'])
+        before = previous.get(key)
+        if before is None or entry['status'] != 'ok':
+            continue
+        time_ratio = entry['wall_s'] / before['wall_s'] if before['wall_s'] else 1.0
+        memory_ratio = entry['peak_mb'] / before['peak_mb'] if before['peak_mb'] > 0 else 1.0
+        slower = time_ratio > 1 + threshold and entry['wall_s'] - before['wall_s'] > MIN_SECONDS
+        bigger = memory_ratio > 1 + threshold and entry['peak_mb'] - before['peak_mb'] > MIN_MB
+        flag = ' ❌' if slower or bigger else ''
+        print(f"{key[0]:<28}{key[1]:<8}{key[2]:>12,}{time_ratio:>9.2f}x{memory_ratio:>9.2f}x{flag}")
+        if slower or bigger:
+            regressions.append({'benchmark': key[0], 'axis': key[1], 'size': key[2],
+                                'time_ratio': round(time_ratio, 3), 'memory_ratio': round(memory_ratio, 3)})
+    
+    for entry in current['results']:
+        key = (entry['benchmark'], entry['axis'], entry['size'])
+        if entry['status'] != 'ok' and key in previous:
+            print(f"❌ {key[0]} ({key[1]}={key[2]:,}) no longer runs: {entry['status']}")
+            regressions.append({'benchmark': key[0], 'axis': key[1], 'size': key[2], 'status': entry['status']})
+    
+    if regressions:
+        print(f"❌ {len(regressions)} regression(s) beyond {threshold:.0%}")
+    else:
+        print(f"✅ No regressions beyond {threshold:.0%}")
+    return regressions
+
+def load_results(path):
+    with open(path) as f:
+        return json.load(f)
+
+def save_results(results, path):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    with open(path, 'w') as f:
+        json.dump(results, f, indent=2)
+    print(f"📝 Benchmark results saved to {path}")
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Benchmark every pipeline stage across data sizes")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    run = commands.add_parser('run', help="Run the suite and save a JSON baseline")
+    run.add_argument('--tier', choices=sorted(TIERS), default='default')
+    run.add_argument('--rows', type=int, nargs='*', help="Row counts (overrides the tier)")
+    run.add_argument('--series', type=int, nargs='*', help="Series counts (overrides the tier)")
+    run.add_argument('--only', nargs='*', help="Benchmarks to report (their inputs still run)")
+    run.add_argument('--repeats', type=int, default=3)
+    run.add_argument('--output', default=f"benchmarks/results/{datetime.now():%Y%m%d-%H%M%S}.json")
+    run.add_argument('--baseline', help="Compare against this baseline after running")
+    run.add_argument('--threshold', type=float, default=0.2)
+    run.add_argument('--verbose', action='store_true', help="Show the stages' own output")
+    
+    comparison = commands.add_parser('compare', help="Compare two saved result files")
+    comparison.add_argument('baseline')
+    comparison.add_argument('current')
+    comparison.add_argument('--threshold', type=float, default=0.2)
+    
+    args = parser.parse_args(argv)
+    if args.command == 'run':
+        current = run_suite(args.tier, args.rows, args.series, args.repeats, args.only, args.verbose)
+        save_results(current, args.output)
+        if not args.baseline:
+            return 0
+        regressions = compare(load_results(args.baseline), current, args.threshold)
+    else:
+        regressions = compare(load_results(args.baseline), load_results(args.current), args.threshold)
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main())
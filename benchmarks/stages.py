@@ -0,0 +1,158 @@
+# benchmarks/stages.py
+import os
+from src.synthetic_data import SyntheticDataGenerator
+from src.data_loader import DataLoader
+from src.data_detector import DataColumnDetector
+from src.data_validator import DataValidator
+from src.data_cleaner import DataCleaner
+from src.cleaning_plan import CleaningPlan
+from src.feature_engineer import FeatureEngineer
+from src.time_series_preparer import TimeSeriesPreparer
+from src.xgboost_model import MLForecaster
+from src.hierarchy import SeriesHierarchy
+from src.hierarchical_forecaster import HierarchicalForecaster
+from src.powerbi_data_exporter import PowerBIDataExporter
+from src.business_report_generator import BusinessReportGenerator
+from src.chart_renderer import use_headless_backend
+
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), '.data')
+
+# Series benchmarks forecast one bottom series per product under a Category level
+SERIES_LEVELS = ['Category', 'Product ID']
+ROWS_PER_SERIES = 100
+
+class Benchmark:
+    def __init__(self, name, run, setup=None, provides=None, optional_import=None):
+        """One timed step: run(*setup(ctx)) with its result stored as ctx[provides].
+        
+        setup() prepares arguments outside the timed region (e.g. a defensive
+        copy); optional_import names a module whose absence skips the benchmark.
+        """
+        self.name = name
+        self.run = run
+        self.setup = setup or (lambda ctx: ())
+        self.provides = provides
+        self.optional_import = optional_import
+
+def synthetic_csv(n_rows, seed=42):
+    """Synthetic Superstore file of n_rows, generated once and reused across runs"""
+    path = os.path.join(DATA_DIR, f'superstore_{n_rows}_{seed}.csv')
+    if not os.path.exists(path):
+        SyntheticDataGenerator(seed=seed).write_csv(path, n_rows)
+    return path
+
+def synthetic_series_frame(n_series, seed=42):
+    """Transactions whose product-level monthly sales form about n_series bottom series"""
+    generator = SyntheticDataGenerator(seed=seed, n_products=n_series)
+    return generator.generate(max(10_000, n_series * ROWS_PER_SERIES))
+
+def _load(ctx):
+    return DataLoader(cache_dir=os.path.join(ctx['scratch'], 'cache')).load_superstore_streaming(ctx['path'])
+
+def _detect(raw):
+    detected_columns, mappings = DataColumnDetector(raw).detect_columns()
+    return mappings
+
+def _validate(raw, mappings):
+    return DataValidator(raw, mappings).validate_data_suitability()
+
+def _validate_streaming(ctx, mappings):
+    chunks = DataLoader(cache_dir=os.path.join(ctx['scratch'], 'cache')).stream_superstore_data(ctx['path'])
+    return DataValidator(None, mappings).validate_streaming(chunks)
+
+def _clean(raw):
+    plan = CleaningPlan(outlier_column='Sales', outlier_group_by=['Category', 'Sub-Category'])
+    return DataCleaner(raw, copy=False).run_plan(plan).generate_report()
+
+def _features(cleaned):
+    engineer = FeatureEngineer(cleaned, copy=False)
+    return engineer.create_time_features().create_aggregate_features().generate_feature_report()
+
+def _time_series(featured):
+    preparer = TimeSeriesPreparer(featured, copy=False)
+    time_series_data = preparer.create_aggregate_time_series()
+    featured_ts_data = preparer.create_features_for_ml()
+    train_data, test_data = preparer.split_data(test_size=0.2)
+    return {'time_series_data': time_series_data, 'featured_ts_data': featured_ts_data,
+            'train_data': train_data, 'test_data': test_data}
+
+def _hierarchy(featured):
+    return TimeSeriesPreparer(featured, copy=False).create_hierarchical_time_series()
+
+def _prophet(ts):
+    # Imported here so the suite runs where prophet is not installed
+    from src.prophet_model import ProphetForecaster
+    forecaster = ProphetForecaster()
+    forecaster.build_model(ts['train_data'])
+    forecaster.make_forecast(ts['train_data'], periods=12)
+    return forecaster.evaluate_model(ts['test_data'])
+
+def _ml_fit(model):
+    def run(ts):
+        build = MLForecaster().build_xgboost_model if model == 'xgboost' else MLForecaster().build_random_forest_model
+        return build(ts['train_data'], ts['test_data'])
+    return run
+
+def _ml_forecast(ts):
+    return MLForecaster().make_forecast(ts['time_series_data'], periods=12, model='xgboost')
+
+def _export(featured, ts, forecast, root):
+    exporter = PowerBIDataExporter(featured, ts['featured_ts_data'], forecast, ts['train_data'], ts['test_data'])
+    exporter.export_partitioned(root=os.path.join(root, 'partitioned'), partition_by_category=True)
+    exporter.export_aggregation_cube(root=os.path.join(root, 'cube'))
+
+def _report(featured, ts, forecast, metrics):
+    use_headless_backend()
+    BusinessReportGenerator(featured, ts['featured_ts_data'], forecast, metrics, None).export_final_report(show=False)
+
+# Stages of main.py's pipeline over a synthetic file of a given row count, in dependency order
+ROW_BENCHMARKS = [
+    Benchmark('load', _load, lambda ctx: (ctx,), provides='raw'),
+    Benchmark('detect', _detect, lambda ctx: (ctx['raw'],), provides='mappings'),
+    Benchmark('validate', _validate, lambda ctx: (ctx['raw'], ctx['mappings'])),
+    Benchmark('validate_streaming', _validate_streaming, lambda ctx: (ctx, ctx['mappings'])),
+    Benchmark('clean', _clean, lambda ctx: (ctx['raw'].copy(),), provides='cleaned'),
+    Benchmark('features', _features, lambda ctx: (ctx['cleaned'],), provides='featured'),
+    Benchmark('time_series', _time_series, lambda ctx: (ctx['featured'],), provides='ts'),
+    Benchmark('hierarchy', _hierarchy, lambda ctx: (ctx['featured'],), provides='hierarchy'),
+    Benchmark('prophet_fit_predict', _prophet, lambda ctx: (ctx['ts'],), optional_import='prophet'),
+    Benchmark('xgboost_fit_predict', _ml_fit('xgboost'), lambda ctx: (ctx['ts'],), provides='metrics'),
+    Benchmark('random_forest_fit_predict', _ml_fit('random_forest'), lambda ctx: (ctx['ts'],)),
+    Benchmark('xgboost_forecast', _ml_forecast, lambda ctx: (ctx['ts'],), provides='forecast'),
+    Benchmark('export', _export, lambda ctx: (ctx['featured'], ctx['ts'], ctx['forecast'],
+                                              os.path.join(ctx['scratch'], 'powerbi'))),
+    Benchmark('report', _report, lambda ctx: (ctx['featured'], ctx['ts'], ctx['forecast'],
+                                              ctx['metrics']['test_metrics'])),
+]
+
+def _series_hierarchy(transactions):
+    return SeriesHierarchy.from_transactions(transactions, levels=SERIES_LEVELS)
+
+def _hierarchical_forecast(model):
+    def run(hierarchy):
+        forecaster = HierarchicalForecaster(hierarchy, model=model)
+        return forecaster.fit_forecast(periods=12)
+    return run
+
+def _reconcile(hierarchy, base_forecasts):
+    return hierarchy.reconcile(base_forecasts, method='wls')
+
+# Forecasting steps over a hierarchy with a given number of bottom series
+SERIES_BENCHMARKS = [
+    Benchmark('hierarchy_build', _series_hierarchy, lambda ctx: (ctx['transactions'],), provides='hierarchy'),
+    Benchmark('seasonal_naive', _hierarchical_forecast('seasonal_naive'), lambda ctx: (ctx['hierarchy'],),
+              provides='base_forecasts'),
+    Benchmark('xgboost_recursive', _hierarchical_forecast('xgboost_recursive'), lambda ctx: (ctx['hierarchy'],)),
+    Benchmark('random_forest_recursive', _hierarchical_forecast('random_forest_recursive'),
+              lambda ctx: (ctx['hierarchy'],)),
+    Benchmark('reconcile_wls', _reconcile, lambda ctx: (ctx['hierarchy'], ctx['base_forecasts'])),
+]
+
+def series_context(n_series, scratch):
+    """Benchmark context for the series axis; generating transactions is not timed"""
+    transactions = synthetic_series_frame(n_series)
+    return {'transactions': transactions, 'scratch': scratch}
+
+def row_context(n_rows, scratch):
+    """Benchmark context for the row axis; generating the file is not timed"""
+    return {'path': synthetic_csv(n_rows), 'scratch': scratch}
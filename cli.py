@@ -0,0 +1,264 @@
+# cli.py - python cli.py {ingest,validate,train,forecast,export,report,serve,check}
+import argparse
+import glob
+import importlib
+import json
+import os
+import subprocess
+import sys
+import time
+
+# Light commands must never import these, and must start within STARTUP_BUDGET_S
+HEAVY_MODULES = ('prophet', 'xgboost', 'sklearn', 'scipy', 'matplotlib')
+LIGHT_COMMANDS = ('ingest', 'validate', 'check')
+STARTUP_BUDGET_S = 1.5
+
+# Modules each command imports before doing any work; heavy libraries load later, only if a stage needs them
+COMMAND_MODULES = {
+    'ingest': ['src.data_loader'],
+    'validate': ['src.data_loader', 'src.data_detector', 'src.data_validator'],
+    'check': ['pandas'],
+    'train': ['main'],
+    'forecast': ['main'],
+    'export': ['main'],
+    'report': ['main'],
+    'serve': ['src.forecast_server']
+}
+
+# Pipeline stages (see main.build_pipeline) each heavy command needs
+COMMAND_STAGES = {
+    'train': ['prophet', 'ml', 'serving_model'],
+    'forecast': ['prophet', 'hierarchical', 'ml'],
+    'export': ['powerbi'],
+    'report': ['report']
+}
+
+def import_command(command):
+    """Import everything a command needs before it starts working"""
+    return [importlib.import_module(name) for name in COMMAND_MODULES[command]]
+
+def load_data(max_memory_mb=512, use_cache=True, schema=None, measure_memory=False):
+    from src.data_loader import DataLoader
+    return DataLoader().load_local_superstore_data(use_cache=use_cache, max_memory_mb=max_memory_mb,
+                                                   schema=schema, measure_memory=measure_memory)
+
+def cmd_ingest(args):
+    """Parse the source file into the columnar cache so later commands start warm"""
+    df = load_data(args.max_memory_mb, use_cache=not args.no_cache, measure_memory=args.measure_memory)
+    print(f"✅ Ingested {len(df):,} rows x {len(df.columns)} columns "
+          f"({df.memory_usage(deep=True).sum() / 1024**2:.1f} MB in memory)")
+    return 0
+
+def cmd_validate(args):
+    from src.data_loader import DataLoader
+    from src.data_detector import DataColumnDetector
+    from src.data_validator import DataValidator
+    
+    loader = DataLoader()
+    detector, schema = loader.detect_schema()
+    if args.streaming and detector is not None:
+        # Profile the file chunk by chunk without building (or caching) the full frame
+        chunks = loader.stream_superstore_data(max_memory_mb=args.max_memory_mb, schema=schema)
+        requirements, score, profile = DataValidator(None, detector.column_mapping).validate_streaming(chunks)
+        if args.output:
+            os.makedirs(os.path.dirname(args.output) or '.', exist_ok=True)
+            with open(args.output, 'w') as f:
+                json.dump(profile, f, indent=2)
+            print(f"📝 Data profile saved to {args.output}")
+        return check_score(score, args.min_score)
+    
+    df = load_data(args.max_memory_mb, schema=schema)
+    if detector is None or not set(filter(None, detector.column_mapping.values())) <= set(df.columns):
+        detector = DataColumnDetector(df)
+        detector.detect_columns()
+    auto_mappings = detector.column_mapping
+    mappings = detector.manual_column_mapping() if not auto_mappings.get('date') else auto_mappings
+    requirements, score = DataValidator(df, mappings).validate_data_suitability()
+    return check_score(score, args.min_score)
+
+def check_score(score, min_score):
+    if score < min_score:
+        print(f"❌ Suitability score {score:.1f}% is below {min_score}%")
+        return 1
+    return 0
+
+def cmd_pipeline(args):
+    """Run the pipeline stages behind a command; unchanged stages come from data/.pipeline"""
+    from main import run_pipeline
+    
+    outputs = run_pipeline(COMMAND_STAGES[args.command], force=args.force,
+                           profile_stage=args.profile, profile_mode=args.profile_mode,
+                           segment_charts=getattr(args, 'segment_charts', False))
+    if args.command == 'forecast':
+        print_forecasts(outputs)
+    return 0
+
+def print_forecasts(outputs):
+    # Both forecasts continue from the last observed month, so their dates line up
+    prophet_forecast = outputs['prophet']['future_forecast'][['ds', 'yhat']]
+    xgb_forecast = outputs['ml']['xgb_forecast']
+    table = xgb_forecast.rename(columns={'yhat': 'xgboost'}).merge(
+        prophet_forecast.assign(ds=prophet_forecast['ds'].dt.normalize()).rename(columns={'yhat': 'prophet'}),
+        on='ds', how='outer'
+    ).sort_values('ds')
+    print(f"🔮 {len(xgb_forecast)}-month forecast (Total sales)")
+    print(table.to_string(index=False, float_format=lambda v: f"{v:,.0f}"))
+    print(f"🌳 Reconciled forecasts for {outputs['hierarchical']['series_id'].nunique()} hierarchy series")
+
+def cmd_serve(args):
+    from src.forecast_server import serve
+    
+    serve(args)
+    return 0
+
+def check_project_structure():
+    print("🔍 CHECKING PROJECT STRUCTURE")
+    print("=" * 50)
+    
+    ok = True
+    folders = ['data', 'powerbi', 'reports', 'models', 'src']
+    for folder in folders:
+        if os.path.exists(folder):
+            files = sorted(os.listdir(folder))
+            print(f"📁 {folder}/: {len(files)} files")
+            for file in files:
+                print(f"   • {file}")
+        else:
+            print(f"❌ {folder}/: Folder missing!")
+            ok = False
+        print()
+    return ok
+
+def check_powerbi_data(rows=3):
+    import pandas as pd
+    
+    print("📊 CHECKING POWER BI FILES")
+    print("=" * 40)
+    
+    if not os.path.exists('powerbi'):
+        print("❌ powerbi/ folder doesn't exist")
+        return False
+    
+    csv_files = sorted(glob.glob('powerbi/*.csv'))
+    if not csv_files:
+        print("❌ No CSV files in powerbi/ folder")
+        return False
+    
+    print(f"✅ Found {len(csv_files)} CSV files:")
+    ok = True
+    for filepath in csv_files:
+        try:
+            df = pd.read_csv(filepath)
+            print(f"\n📁 {os.path.basename(filepath)} ({os.path.getsize(filepath) / 1024:.1f} KB):")
+            print(f"   Shape: {df.shape}")
+            print(f"   Columns: {list(df.columns)}")
+            print(f"   First few rows:")
+            print(df.head(rows).to_string(index=False))
+            print("-" * 30)
+        except Exception as e:
+            print(f"❌ Error reading {filepath}: {e}")
+            ok = False
+    
+    # Incremental exports describe their partitions in a manifest
+    for manifest_path in sorted(glob.glob('powerbi/*/manifest.json')):
+        with open(manifest_path) as f:
+            manifest = json.load(f)
+        partitions = sum(len(d.get('partitions', {})) for d in manifest.get('datasets', {}).values())
+        print(f"🗂️ {os.path.dirname(manifest_path)}: {len(manifest.get('datasets', {}))} datasets, "
+              f"{partitions} partitions")
+    return ok
+
+def measure_startup(command):
+    """Seconds for a fresh interpreter to import a command, and the heavy modules it pulled in"""
+    code = (
+        "import sys, time, json\n"
+        "start = time.perf_counter()\n"
+        "import cli\n"
+        f"cli.import_command({command!r})\n"
+        "heavy = [m for m in cli.HEAVY_MODULES if m in sys.modules]\n"
+        "print(json.dumps({'import_s': time.perf_counter() - start, 'heavy': heavy}))\n"
+    )
+    start = time.perf_counter()
+    result = subprocess.run([sys.executable, '-c', code], capture_output=True, text=True,
+                            cwd=os.path.dirname(os.path.abspath(__file__)))
+    elapsed = time.perf_counter() - start
+    if result.returncode != 0:
+        raise RuntimeError(result.stderr.strip().splitlines()[-1])
+    measured = json.loads(result.stdout.strip().splitlines()[-1])
+    measured['startup_s'] = elapsed
+    return measured
+
+def check_startup(budget=STARTUP_BUDGET_S):
+    print(f"⏱️ CHECKING STARTUP BUDGET ({budget:.1f}s per light command)")
+    print("=" * 40)
+    
+    ok = True
+    for command in LIGHT_COMMANDS:
+        measured = measure_startup(command)
+        within = measured['startup_s'] <= budget and not measured['heavy']
+        ok = ok and within
+        heavy = f", imported {', '.join(measured['heavy'])}" if measured['heavy'] else ''
+        print(f"{'✅' if within else '❌'} {command}: {measured['startup_s']:.2f}s "
+              f"(imports {measured['import_s']:.2f}s){heavy}")
+    return ok
+
+def cmd_check(args):
+    ok = True
+    if not args.powerbi_only:
+        ok = check_project_structure() and ok
+    ok = check_powerbi_data() and ok
+    if args.startup:
+        print()
+        ok = check_startup(args.budget) and ok
+    return 0 if ok else 1
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Sales forecasting dashboard commands")
+    commands = parser.add_subparsers(dest='command', required=True)
+    
+    ingest = commands.add_parser('ingest', help="Load the source data into the parse cache")
+    ingest.add_argument('--max-memory-mb', type=int, default=512, help="Memory budget per parsed chunk")
+    ingest.add_argument('--measure-memory', action='store_true', help="Trace the load's real peak allocation")
+    ingest.add_argument('--no-cache', action='store_true', help="Parse the file without the cache")
+    ingest.set_defaults(handler=cmd_ingest)
+    
+    validate = commands.add_parser('validate', help="Detect columns and score the data's suitability")
+    validate.add_argument('--max-memory-mb', type=int, default=512)
+    validate.add_argument('--min-score', type=float, default=60)
+    validate.add_argument('--streaming', action='store_true',
+                          help="Profile the file in one chunked pass instead of loading it")
+    validate.add_argument('--output', help="Write the streaming data profile to this JSON file")
+    validate.set_defaults(handler=cmd_validate)
+    
+    helps = {'train': "Fit the Prophet, XGBoost/RF and serving models",
+             'forecast': "Forecast the total and every hierarchy series",
+             'export': "Export the Power BI datasets, partitions and aggregation cube",
+             'report': "Write the business report and charts"}
+    for command, help_text in helps.items():
+        sub = commands.add_parser(command, help=help_text)
+        sub.add_argument('--force', nargs='*', default=[], help="Stages to rerun even if unchanged")
+        sub.add_argument('--profile', help="Stage or Class.method to profile")
+        sub.add_argument('--profile-mode', choices=['cprofile', 'sample'], default='cprofile')
+        if command == 'report':
+            sub.add_argument('--segment-charts', action='store_true',
+                             help="Also chart every hierarchy node's forecast (slow)")
+        sub.set_defaults(handler=cmd_pipeline)
+    
+    from src.forecast_server import add_arguments
+    serve = commands.add_parser('serve', help="Serve forecasts over HTTP from the model registry")
+    add_arguments(serve).set_defaults(handler=cmd_serve)
+    
+    check = commands.add_parser('check', help="Check the project folders and Power BI files")
+    check.add_argument('--powerbi-only', action='store_true')
+    check.add_argument('--startup', action='store_true', help="Also measure the light commands' startup time")
+    check.add_argument('--budget', type=float, default=STARTUP_BUDGET_S)
+    check.set_defaults(handler=cmd_check)
+    return parser
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    import_command(args.command)
+    return args.handler(args)
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -2,6 +2,7 @@
 import pandas as pd
 import json
 import os
+from src.data_detector import DataColumnDetector
 
 def detect_superstore_columns():
     """Auto-detect columns from Superstore dataset"""
@@ -13,49 +14,19 @@ def detect_superstore_columns():
         'data/superstore_sales.csv', 'data/Superstore.csv'
     ]
     
-    df = None
-    used_file = None
-    
-    for file in possible_files:
-        if os.path.exists(file):
-            try:
-                df = pd.read_csv(file)
-                used_file = file
-                print(f"✅ Loaded: {file} (Shape: {df.shape})")
-                break
-            except Exception as e:
-                print(f"❌ Error loading {file}: {e}")
-    
-    if df is None:
+    used_file = next((file for file in possible_files if os.path.exists(file)), None)
+    if used_file is None:
         print("❌ Could not find Superstore file")
         return None
     
-    # Auto-detect columns
-    mappings = {}
-    
-    # Date column
-    date_candidates = [col for col in df.columns if 'date' in col.lower() or 'time' in col.lower()]
-    if date_candidates:
-        mappings['date'] = date_candidates[0]
-        print(f"📅 Date column: {date_candidates[0]}")
-    
-    # Sales column
-    sales_candidates = [col for col in df.columns if 'sales' in col.lower() or 'amount' in col.lower() or 'revenue' in col.lower()]
-    if sales_candidates:
-        mappings['sales'] = sales_candidates[0]
-        print(f"💰 Sales column: {sales_candidates[0]}")
-    
-    # Category column
-    category_candidates = [col for col in df.columns if 'category' in col.lower() or 'type' in col.lower() or 'segment' in col.lower()]
-    if category_candidates:
-        mappings['category'] = category_candidates[0]
-        print(f"🏷️ Category column: {category_candidates[0]}")
-    
-    # Region column
-    region_candidates = [col for col in df.columns if 'region' in col.lower() or 'state' in col.lower() or 'city' in col.lower()]
-    if region_candidates:
-        mappings['region'] = region_candidates[0]
-        print(f"🌍 Region column: {region_candidates[0]}")
+    # Roles come from the values in a sample of the file, not from the column names
+    try:
+        detector = DataColumnDetector.from_file(used_file)
+        detected_columns, detected = detector.detect_columns()
+    except Exception as e:
+        print(f"❌ Error reading {used_file}: {e}")
+        return None
+    mappings = {role: col for role, col in detected.items() if col}
     
     # Save mappings
     os.makedirs('data', exist_ok=True)
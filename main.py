@@ -1,4 +1,5 @@
 # main.py - RUN THIS FILE TO START THE PROJECT
+import argparse
 import os
 import sys
 import pandas as pd
@@ -6,32 +7,60 @@ from src.data_loader import DataLoader
 from src.data_detector import DataColumnDetector
 from src.data_validator import DataValidator
 from src.data_cleaner import DataCleaner
+from src.cleaning_plan import CleaningPlan
 from src.feature_engineer import FeatureEngineer
+from src.feature_store import FeatureStore
 from src.time_series_preparer import TimeSeriesPreparer
 from src.prophet_model import ProphetForecaster
 from src.xgboost_model import MLForecaster
+from src.hierarchical_forecaster import HierarchicalForecaster
+from src.model_registry import ModelRegistry
+from src.forecast_server import publish_recursive_model
 from src.powerbi_data_exporter import PowerBIDataExporter
 from src.business_report_generator import BusinessReportGenerator
+from src.memory_tracker import MemoryTracker, frame_nbytes
+from src.chart_renderer import ChartRenderer, use_headless_backend
+from src.pipeline import Pipeline
+from src.instrumentation import Instrumentation, instrument_class
 
-def main():
-    print("🚀 FUTURE INTERNS - AI SALES FORECASTING DASHBOARD")
-    print("=" * 60)
+def enable_copy_on_write():
+    """Let phases share column buffers until one of them writes"""
+    try:
+        pd.set_option('mode.copy_on_write', True)
+    except (KeyError, pd.errors.OptionError):
+        pass  # pandas < 1.5 has no copy-on-write mode
+
+def print_phase(title):
+    print("\n" + "="*50)
+    print(title)
+    print("="*50)
+
+# Classes whose public methods are timed when a run is instrumented
+INSTRUMENTED_CLASSES = (DataLoader, DataCleaner, FeatureEngineer, TimeSeriesPreparer, ProphetForecaster,
+                        MLForecaster, PowerBIDataExporter, BusinessReportGenerator)
+
+def build_pipeline(memory, cache_dir='data/.pipeline', instrumentation=None, segment_charts=False):
+    """The project phases as cached stages; Prophet, hierarchy and ML stages run side by side.
     
-    # Ensure directories exist
-    for folder in ['data', 'notebooks', 'src', 'models', 'powerbi', 'reports', 'docs']:
-        os.makedirs(folder, exist_ok=True)
+    segment_charts adds one forecast chart per hierarchy node to the report
+    (hundreds of charts, so it is off by default).
+    """
+    pipeline = Pipeline(cache_dir, instrumentation=instrumentation)
+    frame_sizes = {}
     
-    try:
-        # PHASE 1: Data Loading & Understanding
-        print("\n" + "="*50)
-        print("📊 PHASE 1: DATA LOADING & UNDERSTANDING")
-        print("="*50)
+    # PHASE 1: Data Loading & Understanding
+    def load(max_memory_mb):
+        print_phase("📊 PHASE 1: DATA LOADING & UNDERSTANDING")
         
         loader = DataLoader()
-        df = loader.load_local_superstore_data()
+        # Column roles and dtypes come from a sample, so the full read is typed and column-pruned
+        detector, schema = loader.detect_schema()
+        df = loader.load_local_superstore_data(use_cache=True, max_memory_mb=max_memory_mb, schema=schema)
         
-        detector = DataColumnDetector(df)
-        detected_columns, auto_mappings = detector.detect_columns()
+        if detector is None or not set(filter(None, detector.column_mapping.values())) <= set(df.columns):
+            detector = DataColumnDetector(df)
+            detector.detect_columns()
+        auto_mappings = detector.column_mapping
         final_mappings = detector.manual_column_mapping() if not auto_mappings.get('date') else auto_mappings
         
         validator = DataValidator(df, final_mappings)
@@ -40,75 +69,172 @@ def main():
         if score < 60:
             print("Using sample data due to low suitability score...")
             df = loader.create_sample_data()
+        return df
+    
+    # PHASE 2: Data Cleaning
+    def clean(df, outlier_column, outlier_group_by):
+        print_phase("🧹 PHASE 2: DATA CLEANING & PREPROCESSING")
         
-        # PHASE 2: Data Cleaning
-        print("\n" + "="*50)
-        print("🧹 PHASE 2: DATA CLEANING & PREPROCESSING")
-        print("="*50)
-        
-        cleaner = DataCleaner(df)
-        cleaned_df = (cleaner.clean_dates()
-                             .handle_missing_values()
-                             .remove_outliers('Sales')
-                             .generate_report())
-        
-        # PHASE 3: Feature Engineering
-        print("\n" + "="*50)
-        print("🔧 PHASE 3: FEATURE ENGINEERING")
-        print("="*50)
-        
-        engineer = FeatureEngineer(cleaned_df)
-        featured_df = (engineer.create_time_features()
-                              .create_aggregate_features()
-                              .generate_feature_report())
-        
-        # PHASE 4: Time Series Preparation
-        print("\n" + "="*50)
-        print("📈 PHASE 4: TIME SERIES PREPARATION")
-        print("="*50)
+        frame_sizes['input'] = frame_nbytes(df)
+        with memory.track('Phase 2: cleaning'):
+            cleaner = DataCleaner(df, copy=False)
+            # Dates, imputation and outlier filtering fused into one pass
+            cleaning_plan = CleaningPlan(outlier_column=outlier_column, outlier_group_by=outlier_group_by)
+            return cleaner.run_plan(cleaning_plan).generate_report()
+    
+    # PHASE 3: Feature Engineering
+    def features(cleaned_df):
+        print_phase("🔧 PHASE 3: FEATURE ENGINEERING")
         
-        ts_preparer = TimeSeriesPreparer(featured_df)
-        time_series_data = ts_preparer.create_aggregate_time_series()
-        featured_ts_data = ts_preparer.create_features_for_ml()
-        train_data, test_data = ts_preparer.split_data(test_size=0.2)
+        # Engineered features are reused from data/.features while their inputs are unchanged
+        with memory.track('Phase 3: feature engineering'):
+            engineer = FeatureEngineer(cleaned_df, copy=False, feature_store=FeatureStore('data/.features'))
+            return (engineer.create_time_features()
+                           .create_aggregate_features()
+                           .generate_feature_report())
+    
+    # PHASE 4: Time Series Preparation
+    def time_series(featured_df, test_size):
+        print_phase("📈 PHASE 4: TIME SERIES PREPARATION")
         
-        # PHASE 5: Model Building
-        print("\n" + "="*50)
-        print("🤖 PHASE 5: MODEL BUILDING & FORECASTING")
-        print("="*50)
+        with memory.track('Phase 4: time series preparation'):
+            ts_preparer = TimeSeriesPreparer(featured_df, copy=False, feature_store=FeatureStore('data/.features'))
+            time_series_data = ts_preparer.create_aggregate_time_series()
+            featured_ts_data = ts_preparer.create_features_for_ml()
+            train_data, test_data = ts_preparer.split_data(test_size=test_size)
+            hierarchy = ts_preparer.create_hierarchical_time_series()
         
-        # Prophet Model
+        if 'input' in frame_sizes:
+            memory.report(frame_sizes['input'])
+        return {'time_series_data': time_series_data, 'featured_ts_data': featured_ts_data,
+                'train_data': train_data, 'test_data': test_data, 'hierarchy': hierarchy}
+    
+    # PHASE 5: Model Building - fitted models are reused from models/ while their training data is unchanged
+    def prophet(ts, periods):
+        registry = ModelRegistry('models')
         prophet_forecaster = ProphetForecaster()
-        prophet_model = prophet_forecaster.build_model(train_data)
-        prophet_forecast = prophet_forecaster.make_forecast(train_data, periods=12)
-        prophet_metrics = prophet_forecaster.evaluate_model(test_data)
-        prophet_forecaster.plot_forecast(train_data, test_data)
-        
-        # XGBoost Model
+        prophet_forecaster.build_model(ts['train_data'], registry=registry)
+        prophet_forecast = prophet_forecaster.make_forecast(ts['train_data'], periods=periods)
+        prophet_metrics = prophet_forecaster.evaluate_model(ts['test_data'])
+        # Refit on the full history so the future forecast starts where the ML forecast does
+        history = ts['time_series_data']
+        full_forecaster = ProphetForecaster()
+        full_forecaster.build_model(history, registry=registry, name='prophet_full')
+        future_forecast = full_forecaster.make_forecast(history, periods=periods)
+        future_forecast = future_forecast[future_forecast['ds'] > history['ds'].max()].reset_index(drop=True)
+        return {'forecast': prophet_forecast, 'metrics': prophet_metrics, 'future_forecast': future_forecast}
+    
+    def hierarchical(ts, periods, method):
+        # Reconciled forecasts for every Category/Sub-Category/Region/Segment node
+        hierarchical_forecaster = HierarchicalForecaster(ts['hierarchy'], model='prophet')
+        hierarchical_forecaster.fit_forecast(periods=periods)
+        return hierarchical_forecaster.reconcile(method=method)
+    
+    def serving_model(ts, model):
+        # Pooled recursive model over every node, served by src/forecast_server.py
+        hierarchy = ts['hierarchy']
+        return publish_recursive_model(ModelRegistry('models'), hierarchy.values, hierarchy.dates,
+                                       hierarchy.series_ids, model)
+    
+    def ml(ts, periods):
+        registry = ModelRegistry('models')
         ml_forecaster = MLForecaster()
-        xgb_results = ml_forecaster.build_xgboost_model(train_data, test_data)
-        rf_results = ml_forecaster.build_random_forest_model(train_data, test_data)
-        ml_forecaster.plot_model_comparison(train_data, test_data, xgb_results, rf_results)
-        
-        # PHASE 6: Power BI Preparation
-        print("\n" + "="*50)
-        print("📊 PHASE 6: POWER BI DASHBOARD PREPARATION")
-        print("="*50)
+        xgb_results = ml_forecaster.build_xgboost_model(ts['train_data'], ts['test_data'], registry=registry)
+        rf_results = ml_forecaster.build_random_forest_model(ts['train_data'], ts['test_data'], registry=registry)
+        # 12 months ahead, rolling the lag features forward from the last observed month
+        xgb_forecast = ml_forecaster.make_forecast(ts['time_series_data'], periods=periods, model='xgboost')
+        return {'xgb_results': xgb_results, 'rf_results': rf_results, 'xgb_forecast': xgb_forecast}
+    
+    # PHASE 6: Power BI Preparation
+    def powerbi(featured_df, ts, prophet_output, hierarchical_forecast):
+        print_phase("📊 PHASE 6: POWER BI DASHBOARD PREPARATION")
         
         powerbi_exporter = PowerBIDataExporter(
-            featured_df, featured_ts_data, prophet_forecast, train_data, test_data
+            featured_df, ts['featured_ts_data'], prophet_output['forecast'], ts['train_data'], ts['test_data'],
+            hierarchical_forecast=hierarchical_forecast
         )
         datasets = powerbi_exporter.export_all_datasets()
+        # Incremental refresh: only month partitions whose content changed are rewritten
+        powerbi_exporter.export_partitioned(partition_by_category=True)
+        # Every Category/Sub-Category/Region/Segment/State/Ship Mode slice, pre-aggregated
+        powerbi_exporter.export_aggregation_cube()
+        return sorted(datasets)
+    
+    # PHASE 7: Reporting
+    def report(featured_df, ts, prophet_output, ml_output, hierarchical_forecast, segment_charts):
+        print_phase("📄 PHASE 7: BUSINESS REPORTING & INSIGHTS")
         
-        # PHASE 7: Reporting
-        print("\n" + "="*50)
-        print("📄 PHASE 7: BUSINESS REPORTING & INSIGHTS")
-        print("="*50)
+        # Charts render headless in worker processes; unchanged charts are skipped
+        renderer = ChartRenderer('reports')
+        prophet_forecaster = ProphetForecaster()
+        prophet_forecaster.forecast = prophet_output['forecast']
+        prophet_forecaster.plot_forecast(ts['train_data'], ts['test_data'], renderer=renderer)
+        MLForecaster().plot_model_comparison(ts['train_data'], ts['test_data'], ml_output['xgb_results'],
+                                             ml_output['rf_results'], renderer=renderer)
+        # One chart per hierarchy node runs to hundreds of files, so only on request
+        if segment_charts:
+            renderer.add_series_charts(ts['hierarchy'], hierarchical_forecast)
         
+        # Runs alongside the Power BI export, so the exported datasets are not passed in
         report_generator = BusinessReportGenerator(
-            featured_df, featured_ts_data, prophet_forecast, prophet_metrics, datasets
+            featured_df, ts['featured_ts_data'], prophet_output['forecast'], prophet_output['metrics'], None
         )
-        report_generator.export_final_report()
+        report_generator.export_final_report(renderer=renderer)
+        return renderer.render_all()
+    
+    # The loader keeps its own parse cache, so loading always runs and its output hash keys the rest
+    pipeline.add('load', load, config={'max_memory_mb': 512}, cache=False)
+    pipeline.add('clean', clean, ['load'],
+                 config={'outlier_column': 'Sales', 'outlier_group_by': ['Category', 'Sub-Category']})
+    pipeline.add('features', features, ['clean'])
+    pipeline.add('time_series', time_series, ['features'], config={'test_size': 0.2})
+    pipeline.add('prophet', prophet, ['time_series'], config={'periods': 12},
+                 outputs=['models/prophet.*', 'models/prophet_full.*'])
+    pipeline.add('hierarchical', hierarchical, ['time_series'], config={'periods': 12, 'method': 'wls'})
+    pipeline.add('serving_model', serving_model, ['time_series'], config={'model': 'xgboost'},
+                 outputs=['models/{model}_serving.*'])
+    pipeline.add('ml', ml, ['time_series'], config={'periods': 12},
+                 outputs=['models/xgboost.*', 'models/random_forest.*'])
+    # Deleting or editing an exported file or chart reruns the stage that wrote it
+    pipeline.add('powerbi', powerbi, ['features', 'time_series', 'prophet', 'hierarchical'], outputs=['powerbi'])
+    pipeline.add('report', report, ['features', 'time_series', 'prophet', 'ml', 'hierarchical'],
+                 config={'segment_charts': segment_charts},
+                 outputs=['reports/*.png', 'reports/*.txt', 'reports/segments'])
+    return pipeline
+
+def run_pipeline(targets=None, force=(), profile_stage=None, profile_mode='cprofile', segment_charts=False):
+    """Run the stages targets need (every stage by default) and return the targets' outputs"""
+    # Ensure directories exist
+    for folder in ['data', 'notebooks', 'src', 'models', 'powerbi', 'reports', 'docs']:
+        os.makedirs(folder, exist_ok=True)
+    
+    use_headless_backend()
+    # Phases 2-4 hand the frame over instead of copying it (copy=False)
+    enable_copy_on_write()
+    
+    # Wall/CPU time, peak RSS, rows and I/O per stage and per class method, saved to reports/runs/
+    instrumentation = Instrumentation('reports/runs', profile_stage=profile_stage, profile_mode=profile_mode)
+    for cls in INSTRUMENTED_CLASSES:
+        instrument_class(cls)
+    instrumentation.activate()
+    
+    try:
+        # Stage outputs persist in data/.pipeline: a rerun skips unchanged stages
+        # and resumes from the stage that failed last time
+        pipeline = build_pipeline(MemoryTracker(), instrumentation=instrumentation, segment_charts=segment_charts)
+        return pipeline.run(targets, force=force)
+    finally:
+        instrumentation.deactivate()
+        instrumentation.summary()
+        instrumentation.write()
+
+def main(force=(), profile_stage=None, profile_mode='cprofile', segment_charts=False):
+    print("🚀 FUTURE INTERNS - AI SALES FORECASTING DASHBOARD")
+    print("=" * 60)
+    
+    try:
+        run_pipeline(force=force, profile_stage=profile_stage, profile_mode=profile_mode,
+                     segment_charts=segment_charts)
         
         print("\n🎉 PROJECT COMPLETED SUCCESSFULLY!")
         print("📁 Check the following folders for outputs:")
@@ -117,7 +243,7 @@ def main():
         print("   • models/ - Saved ML models")
         
         return True
-        
+    
     except Exception as e:
         print(f"❌ Error in project execution: {e}")
         import traceback
@@ -125,7 +251,15 @@ def main():
         return False
 
 if __name__ == "__main__":
-    success = main()
+    parser = argparse.ArgumentParser(description="Run the sales forecasting pipeline")
+    parser.add_argument('--force', nargs='*', default=[], help="Stages to rerun even if unchanged")
+    parser.add_argument('--profile', dest='profile_stage',
+                        help="Stage or method (e.g. ml, MLForecaster.build_xgboost_model) to profile")
+    parser.add_argument('--profile-mode', choices=['cprofile', 'sample'], default='cprofile')
+    parser.add_argument('--segment-charts', action='store_true', help="Also chart every hierarchy node's forecast")
+    args = parser.parse_args()
+    success = main(force=args.force, profile_stage=args.profile_stage, profile_mode=args.profile_mode,
+                   segment_charts=args.segment_charts)
     if success:
         print("\n✅ All phases completed! You can now:")
         print("   1. Build Power BI dashboard using files in 'powerbi/' folder")
@@ -2,6 +2,7 @@
 import pandas as pd
 import json
 from src.data_loader import DataLoader
+from src.data_cache import write_frame, frame_extension
 from src.data_detector import DataColumnDetector
 from src.data_validator import DataValidator
 from src.data_cleaner import DataCleaner
@@ -13,7 +14,7 @@ def process_data_only():
     
     # Load data
     loader = DataLoader()
-    df = loader.load_local_superstore_data()
+    df = loader.load_local_superstore_data(use_cache=True)
     
     # Detect columns
     detector = DataColumnDetector(df)
@@ -36,6 +37,8 @@ def process_data_only():
     
     # Save processed data
     featured_df.to_csv('data/processed_data.csv', index=False)
+    processed_columnar = 'data/processed_data' + frame_extension()
+    write_frame(featured_df, processed_columnar)
     
     # Save mappings
     with open('data/column_mappings.json', 'w') as f:
@@ -45,6 +48,7 @@ def process_data_only():
     print(f"📁 Files created:")
     print(f"   • data/column_mappings.json")
     print(f"   • data/processed_data.csv")
+    print(f"   • {processed_columnar}")
     
     return featured_df, mappings
 
@@ -15,7 +15,7 @@ def main():
         from data_loader import DataLoader
         
         loader = DataLoader()
-        df = loader.load_local_superstore_data()
+        df = loader.load_local_superstore_data(use_cache=True)
         
         if df is None:
             print("❌ Failed to load dataset. Exiting.")
@@ -61,6 +61,7 @@ def main():
         analysis_code = """
 import pandas as pd
 import numpy as np
+from src.date_parser import date_parser
 
 def comprehensive_data_analysis_local(df, column_mappings):
     print("=" * 70)
@@ -80,7 +81,7 @@ def comprehensive_data_analysis_local(df, column_mappings):
     
     # Convert date column if exists
     if date_col and date_col in df.columns:
-        df[date_col] = pd.to_datetime(df[date_col], errors='coerce')
+        date_parser.parse_columns(df, [date_col])
         date_min = df[date_col].min()
         date_max = df[date_col].max()
         print(f"   • Date Range: {date_min} to {date_max}")
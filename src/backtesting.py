@@ -0,0 +1,136 @@
+# src/backtesting.py
+import io
+import os
+from concurrent.futures import as_completed
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd
+from src.time_series_preparer import lag_feature_matrix
+from src.parallel_fitting import process_pool
+
+def rolling_origin_splits(n_periods, min_train, step=1, window='expanding', window_size=None):
+    """Yield (train_start, cutoff) index pairs for rolling-origin evaluation.
+    
+    Models train on periods train_start..cutoff (inclusive) and are scored on
+    cutoff + h for each horizon h. 'sliding' keeps window_size periods.
+    """
+    if window not in ('expanding', 'sliding'):
+        raise ValueError(f"Unknown window: {window}")
+    window_size = window_size or min_train
+    for cutoff in range(min_train - 1, n_periods - 1, step):
+        train_start = 0 if window == 'expanding' else max(0, cutoff - window_size + 1)
+        yield train_start, cutoff
+
+_fold_state = {}
+
+def _init_fold_worker(values, dates, feature_matrices):
+    for var in ('OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS'):
+        os.environ[var] = '1'
+    _fold_state.update(values=values, dates=dates, features=feature_matrices)
+
+def _predict_ml(model, train_start, cutoff, horizons):
+    from src.xgboost_model import MLForecaster
+    
+    values = _fold_state['values']
+    forecaster = MLForecaster(n_jobs=1)
+    predictions = {}
+    for h in horizons:
+        # Feature matrices are shared by every fold; a fold only selects rows
+        X = _fold_state['features'][h]
+        rows = np.arange(train_start + h, cutoff + 1)
+        rows = rows[~np.isnan(X[rows]).any(axis=1)]
+        if len(rows) < 3:
+            continue
+        estimator = forecaster.make_estimator(model)
+        estimator.fit(X[rows], values[rows])
+        predictions[h] = float(estimator.predict(X[cutoff + h][None, :])[0])
+    return predictions
+
+def _predict_prophet(train_start, cutoff, horizons):
+    from src.prophet_model import ProphetForecaster
+    
+    forecaster = ProphetForecaster()
+    train = pd.DataFrame({'ds': _fold_state['dates'][train_start:cutoff + 1],
+                          'y': _fold_state['values'][train_start:cutoff + 1]})
+    forecaster.build_model(train)
+    forecast = forecaster.make_forecast(train, periods=max(horizons))
+    future = forecast['yhat'].values[-max(horizons):]
+    return {h: float(future[h - 1]) for h in horizons}
+
+def _run_fold(task):
+    """Score one model on one cutoff for every horizon that fits in the data"""
+    model, train_start, cutoff, horizons = task
+    values = _fold_state['values']
+    horizons = [h for h in horizons if cutoff + h < len(values)]
+    
+    with redirect_stdout(io.StringIO()):
+        if model == 'naive':
+            predictions = {h: values[cutoff] for h in horizons}
+        elif model == 'seasonal_naive':
+            # Same month of the last observed season, whatever the horizon
+            seasonal = {h: cutoff - 12 + (h - 1) % 12 + 1 for h in horizons}
+            predictions = {h: values[i] for h, i in seasonal.items() if i >= train_start}
+        elif model == 'prophet':
+            predictions = _predict_prophet(train_start, cutoff, horizons)
+        else:
+            predictions = _predict_ml(model, train_start, cutoff, horizons)
+    
+    return [{'model': model, 'cutoff': cutoff, 'horizon': h,
+             'y_true': float(values[cutoff + h]), 'y_pred': float(y_pred)}
+            for h, y_pred in predictions.items()]
+
+class Backtester:
+    def __init__(self, time_series_data, models=('naive', 'seasonal_naive', 'xgboost', 'random_forest', 'prophet'),
+                 horizons=(1, 3, 6, 12), min_train=24, step=1, window='expanding', window_size=None,
+                 max_workers=None):
+        data = time_series_data.sort_values('ds')
+        self.dates = pd.DatetimeIndex(data['ds'])
+        self.values = data['y'].to_numpy(dtype=float)
+        self.models = list(models)
+        self.horizons = sorted(horizons)
+        self.min_train = min_train
+        self.step = step
+        self.window = window
+        self.window_size = window_size
+        self.max_workers = max_workers or os.cpu_count()
+        self.results = None
+    
+    def build_feature_matrices(self):
+        """Lag features for every horizon, computed once and reused by all folds"""
+        months = self.dates.month.values
+        return {h: lag_feature_matrix(self.values, months, h) for h in self.horizons}
+    
+    def run(self):
+        """Evaluate every model over every cutoff and horizon in parallel"""
+        splits = list(rolling_origin_splits(len(self.values), self.min_train, self.step,
+                                            self.window, self.window_size))
+        tasks = [(model, start, cutoff, self.horizons) for model in self.models for start, cutoff in splits]
+        print(f"🔁 Backtesting {len(self.models)} models over {len(splits)} cutoffs "
+              f"({self.window} window, horizons {self.horizons})...")
+        
+        init_args = (self.values, self.dates, self.build_feature_matrices())
+        rows = []
+        with process_pool(self.max_workers, _init_fold_worker, init_args) as executor:
+            futures = [executor.submit(_run_fold, task) for task in tasks]
+            for future in as_completed(futures):
+                rows.extend(future.result())
+        
+        self.results = pd.DataFrame(rows, columns=['model', 'cutoff', 'horizon', 'y_true', 'y_pred'])
+        print(f"✅ Backtest complete: {len(self.results)} forecasts scored")
+        return self.metrics_table()
+    
+    def metrics_table(self):
+        """MAE, RMSE and MAPE per model and horizon"""
+        errors = self.results.assign(
+            abs_error=(self.results['y_pred'] - self.results['y_true']).abs(),
+            sq_error=(self.results['y_pred'] - self.results['y_true']) ** 2,
+            ape=((self.results['y_pred'] - self.results['y_true']).abs()
+                 / self.results['y_true'].abs().replace(0, np.nan))
+        )
+        table = errors.groupby(['model', 'horizon']).agg(
+            MAE=('abs_error', 'mean'),
+            RMSE=('sq_error', lambda s: np.sqrt(s.mean())),
+            MAPE=('ape', 'mean'),
+            folds=('cutoff', 'nunique')
+        ).reset_index()
+        return table.sort_values(['horizon', 'MAE']).reset_index(drop=True)
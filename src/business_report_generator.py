@@ -1,7 +1,7 @@
 # src/business_report_generator.py
-import matplotlib.pyplot as plt
 import pandas as pd
 from datetime import datetime
+from src.chart_renderer import draw_business_overview
 
 class BusinessReportGenerator:
     def __init__(self, original_df, time_series_data, prophet_forecast, model_metrics, datasets):
@@ -14,8 +14,8 @@ class BusinessReportGenerator:
         import os
         os.makedirs('reports', exist_ok=True)
     
-    def export_final_report(self):
-        """Generate final business report"""
+    def export_final_report(self, show=True, renderer=None):
+        """Generate final business report; with a ChartRenderer the chart is queued for batch rendering"""
         print("📄 Generating business report...")
         
         # Create summary report
@@ -44,26 +44,28 @@ NEXT STEPS:
 • Retrain model quarterly with new data
 • Expand analysis to product-level forecasting
 """
-        
+
         with open('reports/business_report.txt', 'w') as f:
             f.write(report)
         
         # Create visualization
-        plt.figure(figsize=(10, 6))
-        plt.plot(self.time_series_data['ds'], self.time_series_data['y'], 'b-', label='Historical', linewidth=2)
-        
         future_data = self.prophet_forecast[self.prophet_forecast['ds'] > self.time_series_data['ds'].max()]
-        plt.plot(future_data['ds'], future_data['yhat'], 'r--', label='Forecast', linewidth=2)
-        
-        plt.title('Sales Forecast - Business Overview', fontsize=14, fontweight='bold')
-        plt.ylabel('Sales ($)', fontsize=12)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
-        plt.tight_layout()
-        
-        plt.savefig('reports/business_overview.png', dpi=300, bbox_inches='tight')
-        plt.show()
+        data = {
+            'history_ds': self.time_series_data['ds'].to_numpy(), 'history_y': self.time_series_data['y'].to_numpy(),
+            'forecast_ds': future_data['ds'].to_numpy(), 'forecast_y': future_data['yhat'].to_numpy()
+        }
+        if renderer is not None:
+            renderer.add('business_overview', 'business_overview.png', data, figsize=(10, 6), dpi=300)
+        else:
+            import matplotlib.pyplot as plt
+            
+            fig = plt.figure(figsize=(10, 6))
+            draw_business_overview(fig, data)
+            fig.tight_layout()
+            fig.savefig('reports/business_overview.png', dpi=300, bbox_inches='tight')
+            if show:
+                plt.show()
+            plt.close(fig)
         
         print("✅ Business report generated!")
         print("   • reports/business_report.txt")
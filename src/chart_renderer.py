@@ -0,0 +1,207 @@
+# src/chart_renderer.py
+import hashlib
+import inspect
+import json
+import os
+import re
+import time
+import numpy as np
+import pandas as pd
+from src.parallel_fitting import process_pool
+
+def use_headless_backend():
+    """Switch matplotlib to the non-interactive Agg backend (no windows, no plt.show blocking)"""
+    import matplotlib
+    matplotlib.use('Agg')
+
+def draw_forecast(fig, data):
+    """Historical, actual test and forecast lines"""
+    ax = fig.add_subplot()
+    ax.plot(data['train_ds'], data['train_y'], 'b-', label='Historical', linewidth=2)
+    ax.plot(data['test_ds'], data['test_y'], 'g-', label='Actual Test', linewidth=2)
+    ax.plot(data['forecast_ds'], data['forecast_y'], 'r--', label='Forecast', linewidth=2)
+    ax.set_title(data.get('title', 'Sales Forecast with Prophet'), fontsize=14, fontweight='bold')
+    ax.set_ylabel('Sales ($)', fontsize=12)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+
+def draw_model_comparison(fig, data):
+    """Test-set predictions of both ML models, and their MAE"""
+    ax1, ax2 = fig.subplots(1, 2)
+    
+    # Test set comparison
+    ax1.plot(data['test_ds'], data['test_y'], 'k-', label='Actual', linewidth=2)
+    ax1.plot(data['test_ds'], data['xgb_predictions'], 'r--', label='XGBoost')
+    ax1.plot(data['test_ds'], data['rf_predictions'], 'b--', label='Random Forest')
+    ax1.set_title('Model Comparison: Test Set', fontweight='bold')
+    ax1.legend()
+    ax1.grid(True, alpha=0.3)
+    
+    # Performance comparison
+    models = ['XGBoost', 'Random Forest']
+    mae_scores = [data['xgb_mae'], data['rf_mae']]
+    
+    ax2.bar(models, mae_scores, color=['red', 'blue'], alpha=0.7)
+    ax2.set_title('Model Performance (MAE)', fontweight='bold')
+    ax2.set_ylabel('MAE ($)')
+    
+    for i, v in enumerate(mae_scores):
+        ax2.text(i, v, f'${v:,.0f}', ha='center', va='bottom', fontweight='bold')
+
+def draw_business_overview(fig, data):
+    """Historical sales and the forecast beyond them"""
+    ax = fig.add_subplot()
+    ax.plot(data['history_ds'], data['history_y'], 'b-', label='Historical', linewidth=2)
+    ax.plot(data['forecast_ds'], data['forecast_y'], 'r--', label='Forecast', linewidth=2)
+    ax.set_title('Sales Forecast - Business Overview', fontsize=14, fontweight='bold')
+    ax.set_ylabel('Sales ($)', fontsize=12)
+    ax.legend()
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+
+def draw_series_forecast(fig, data):
+    """One hierarchy node: history, base forecast and reconciled forecast"""
+    ax = fig.add_subplot()
+    ax.plot(data['history_ds'], data['history_y'], 'b-', label='Historical', linewidth=1.5)
+    ax.plot(data['forecast_ds'], data['base_y'], 'r:', label='Base forecast', linewidth=1.5)
+    if data.get('reconciled_y') is not None:
+        ax.plot(data['forecast_ds'], data['reconciled_y'], 'r--', label='Reconciled forecast', linewidth=1.5)
+    ax.set_title(data['title'], fontsize=11, fontweight='bold')
+    ax.set_ylabel('Sales ($)')
+    ax.legend(fontsize=8)
+    ax.grid(True, alpha=0.3)
+    ax.tick_params(axis='x', labelrotation=45)
+
+CHART_TYPES = {
+    'forecast': draw_forecast,
+    'model_comparison': draw_model_comparison,
+    'business_overview': draw_business_overview,
+    'series_forecast': draw_series_forecast
+}
+
+def render_chart(job):
+    """Draw and save one chart in the calling process; returns its path"""
+    from matplotlib.figure import Figure
+    
+    chart_type, path, data, figsize, dpi = job
+    # A bare Figure is never registered with pyplot, so it is freed as soon as it goes out of scope
+    fig = Figure(figsize=figsize)
+    CHART_TYPES[chart_type](fig, data)
+    fig.tight_layout()
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f"{path}.tmp.png"
+    fig.savefig(tmp_path, dpi=dpi, bbox_inches='tight')
+    os.replace(tmp_path, path)
+    return path
+
+def _init_render_worker():
+    os.environ['MPLBACKEND'] = 'Agg'
+
+def _update_hash(digest, value):
+    if isinstance(value, (pd.DataFrame, pd.Series, pd.Index)):
+        digest.update(pd.util.hash_pandas_object(value, index=False).values.tobytes())
+    elif isinstance(value, np.ndarray):
+        digest.update(str(value.dtype).encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, dict):
+        for key in sorted(value):
+            digest.update(str(key).encode())
+            _update_hash(digest, value[key])
+    elif isinstance(value, (list, tuple)):
+        for item in value:
+            _update_hash(digest, item)
+    else:
+        digest.update(repr(value).encode())
+
+def chart_slug(text):
+    """File-name-safe version of a series id"""
+    return re.sub(r'[^A-Za-z0-9]+', '_', text).strip('_').lower() or 'total'
+
+class ChartRenderer:
+    def __init__(self, output_dir='reports', dpi=150, max_workers=None):
+        """Headless chart batch: parallel rendering, skipping charts whose inputs are unchanged"""
+        self.output_dir = output_dir
+        self.dpi = dpi
+        self.max_workers = max_workers or os.cpu_count() or 1
+        self.hashes_path = os.path.join(output_dir, '.chart_hashes.json')
+        self.jobs = []
+        os.makedirs(output_dir, exist_ok=True)
+    
+    def add(self, chart_type, file_name, data, figsize=(12, 6), dpi=None):
+        """Queue a chart; file_name is relative to output_dir"""
+        if chart_type not in CHART_TYPES:
+            raise ValueError(f"Unknown chart type: {chart_type}")
+        path = os.path.join(self.output_dir, file_name)
+        self.jobs.append((chart_type, path, data, figsize, dpi or self.dpi))
+        return path
+    
+    def add_series_charts(self, hierarchy, forecast_frame, directory='segments', max_depth=None):
+        """Queue one chart per hierarchy node from a HierarchicalForecaster.to_frame() result"""
+        by_series = {series_id: rows for series_id, rows in forecast_frame.groupby('series_id', sort=False)}
+        paths = []
+        for i, series_id in enumerate(hierarchy.series_ids):
+            if max_depth is not None and hierarchy.series_depths[i] > max_depth:
+                continue
+            rows = by_series.get(series_id)
+            if rows is None:
+                continue
+            data = {
+                'title': series_id,
+                'history_ds': np.asarray(hierarchy.dates),
+                'history_y': hierarchy.values[:, i],
+                'forecast_ds': rows['ds'].to_numpy(),
+                'base_y': rows['yhat_base'].to_numpy(),
+                'reconciled_y': rows['yhat'].to_numpy() if 'yhat' in rows else None
+            }
+            paths.append(self.add('series_forecast', os.path.join(directory, chart_slug(series_id) + '.png'),
+                                  data, figsize=(8, 4)))
+        return paths
+    
+    def _job_hash(self, job):
+        chart_type, _, data, figsize, dpi = job
+        digest = hashlib.sha256()
+        # Editing a chart's drawing code re-renders it too
+        digest.update(inspect.getsource(CHART_TYPES[chart_type]).encode())
+        _update_hash(digest, [chart_type, data, figsize, dpi])
+        return digest.hexdigest()
+    
+    def render_all(self):
+        """Render every queued chart whose data changed, across worker processes"""
+        hashes = {}
+        if os.path.exists(self.hashes_path):
+            with open(self.hashes_path) as f:
+                hashes = json.load(f)
+        
+        pending = []
+        for job in self.jobs:
+            job_hash = self._job_hash(job)
+            path = job[1]
+            if hashes.get(path) == job_hash and os.path.exists(path):
+                continue
+            pending.append((job, job_hash))
+        skipped = len(self.jobs) - len(pending)
+        
+        start = time.perf_counter()
+        if pending:
+            print(f"🎨 Rendering {len(pending)} charts ({skipped} unchanged)...")
+            workers = min(self.max_workers, len(pending))
+            if workers == 1:
+                for job, _ in pending:
+                    render_chart(job)
+            else:
+                chunksize = max(1, len(pending) // (workers * 4))
+                with process_pool(workers, _init_render_worker) as executor:
+                    list(executor.map(render_chart, [job for job, _ in pending], chunksize=chunksize))
+            for job, job_hash in pending:
+                hashes[job[1]] = job_hash
+            tmp_path = self.hashes_path + '.tmp'
+            with open(tmp_path, 'w') as f:
+                json.dump(hashes, f, indent=2)
+            os.replace(tmp_path, self.hashes_path)
+        
+        print(f"✅ Charts ready: {len(pending)} rendered, {skipped} unchanged "
+              f"({time.perf_counter() - start:.1f}s)")
+        rendered = [job[1] for job, _ in pending]
+        self.jobs = []
+        return {'rendered': rendered, 'skipped': skipped}
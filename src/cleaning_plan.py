@@ -0,0 +1,179 @@
+# src/cleaning_plan.py
+import numpy as np
+import pandas as pd
+from src.date_parser import date_parser
+from src.data_cleaner import OutlierSketch, outlier_bounds, within_bounds
+from src.sketches import QuantileSketch
+
+# Named imputation strategies; any other value is used as a constant fill
+IMPUTE_STRATEGIES = ('median', 'mean', 'mode', 'drop')
+
+class CleaningPlan:
+    def __init__(self, date_columns='auto', date_format=None, impute=None, outlier_column='Sales',
+                 outlier_group_by=None, outlier_k=1.5, compression=200):
+        """Declarative cleaning: which dates to parse, how to impute, which rows to filter.
+        
+        impute maps column -> 'median' | 'mean' | 'mode' | 'drop' | constant.
+        Unlisted columns default to median (numeric) or 'Unknown'; date columns
+        are parsed, never imputed. fit() gathers every statistic the plan needs,
+        transform() then cleans a frame (or each chunk of one) in a single pass.
+        """
+        self.date_columns = date_columns
+        self.date_format = date_format
+        self.impute = dict(impute or {})
+        self.outlier_column = outlier_column
+        self.outlier_group_by = [outlier_group_by] if isinstance(outlier_group_by, str) else outlier_group_by
+        self.outlier_k = outlier_k
+        self.compression = compression
+        self.fitted = False
+        self.stats = {'rows_in': 0, 'rows_out': 0, 'imputed': 0}
+    
+    def compile(self, df):
+        """Resolve the plan against df's columns: date columns and a strategy per column"""
+        if self.date_columns == 'auto':
+            dates = [col for col in df.columns if 'date' in col.lower()]
+        else:
+            dates = [col for col in self.date_columns if col in df.columns]
+        strategies = {}
+        for col in df.columns:
+            if col in dates:
+                continue
+            default = 'median' if pd.api.types.is_numeric_dtype(df[col]) else 'Unknown'
+            strategies[col] = self.impute.get(col, default)
+        
+        self.dates_ = dates
+        self.strategies_ = strategies
+        self.columns_by_strategy_ = {name: [col for col, s in strategies.items() if isinstance(s, str) and s == name]
+                                     for name in IMPUTE_STRATEGIES}
+        group_by = self.outlier_group_by
+        if self.outlier_column not in df.columns:
+            self.outlier_column_ = None
+        else:
+            self.outlier_column_ = self.outlier_column
+            if group_by is not None and not set(group_by).issubset(df.columns):
+                print(f"   ⚠️ Group columns {group_by} not found - using global bounds")
+                group_by = None
+        self.outlier_group_by_ = group_by
+        return self
+    
+    def fit(self, df):
+        """Every statistic of the plan from an in-memory frame"""
+        self.compile(df)
+        # One reduction for all null counts; statistics only where something is missing
+        missing = df.isna().sum()
+        needed = {name: [col for col in cols if missing[col] > 0]
+                  for name, cols in self.columns_by_strategy_.items()}
+        self.fill_values_ = {col: value for col, value in self.strategies_.items()
+                             if not (isinstance(value, str) and value in IMPUTE_STRATEGIES)}
+        if needed['median']:
+            self.fill_values_.update(df[needed['median']].median().to_dict())
+        if needed['mean']:
+            self.fill_values_.update(df[needed['mean']].mean().to_dict())
+        for col in needed['mode']:
+            modes = df[col].mode()
+            if len(modes):
+                self.fill_values_[col] = modes.iloc[0]
+        
+        if self.outlier_column_ is not None:
+            # Fences come from the imputed column, as when imputing before remove_outliers
+            column = self.outlier_column_
+            frame = df[(self.outlier_group_by_ or []) + [column]]
+            if column in self.fill_values_ and missing[column] > 0:
+                frame = frame.assign(**{column: frame[column].fillna(self.fill_values_[column])})
+            self.bounds_ = outlier_bounds(frame, column, self.outlier_group_by_, self.outlier_k)
+        self.fitted = True
+        return self
+    
+    def fit_chunks(self, chunks):
+        """Fit from chunked input in one pass, using mergeable statistics.
+        
+        Medians and outlier fences come from quantile sketches, so they are
+        approximate; transform_chunks() then cleans a second pass chunk by chunk.
+        """
+        median_sketches = {}
+        sums = counts = None
+        mode_counts = {}
+        outliers = None
+        rows = 0
+        for chunk in chunks:
+            if rows == 0:
+                self.compile(chunk)
+                if self.outlier_column_ is not None:
+                    outliers = OutlierSketch(self.outlier_column_, self.outlier_group_by_, self.compression)
+            rows += len(chunk)
+            for col in self.columns_by_strategy_['median']:
+                median_sketches.setdefault(col, QuantileSketch(self.compression)).update(
+                    chunk[col].to_numpy(dtype=float))
+            mean_cols = self.columns_by_strategy_['mean']
+            if mean_cols:
+                chunk_sums, chunk_counts = chunk[mean_cols].sum(), chunk[mean_cols].count()
+                sums = chunk_sums if sums is None else sums + chunk_sums
+                counts = chunk_counts if counts is None else counts + chunk_counts
+            for col in self.columns_by_strategy_['mode']:
+                counted = chunk[col].value_counts()
+                mode_counts[col] = counted if col not in mode_counts else mode_counts[col].add(counted, fill_value=0)
+            if outliers is not None:
+                outliers.update(chunk)
+        if rows == 0:
+            raise ValueError("Cannot fit a cleaning plan on empty input")
+        
+        self.fill_values_ = {col: value for col, value in self.strategies_.items()
+                             if not (isinstance(value, str) and value in IMPUTE_STRATEGIES)}
+        self.fill_values_.update({col: float(sketch.quantile(0.5)) for col, sketch in median_sketches.items()
+                                  if sketch.count})
+        if sums is not None:
+            self.fill_values_.update((sums / counts).dropna().to_dict())
+        self.fill_values_.update({col: counted.idxmax() for col, counted in mode_counts.items() if len(counted)})
+        if outliers is not None:
+            if self.outlier_column_ in self.fill_values_:
+                outliers.impute(self.fill_values_[self.outlier_column_])
+            self.bounds_ = outliers.bounds(self.outlier_k)
+        self.fitted = True
+        print(f"🧾 Cleaning plan fitted on {rows:,} streamed rows")
+        return self
+    
+    def transform(self, df):
+        """Parse, impute and filter df in one pass; cleans df's columns in place"""
+        if not self.fitted:
+            raise ValueError("CleaningPlan must be fitted before transform")
+        rows_in = len(df)
+        date_parser.parse_columns(df, self.dates_, self.date_format)
+        
+        keep = np.ones(rows_in, dtype=bool)
+        drop_cols = [col for col in self.columns_by_strategy_['drop'] if col in df.columns]
+        if drop_cols:
+            keep &= df[drop_cols].notna().all(axis=1).to_numpy()
+        
+        fills = {col: value for col, value in self.fill_values_.items() if col in df.columns}
+        has_missing = df[list(fills)].isna().any()
+        for col in has_missing[has_missing].index:
+            value = fills[col]
+            self.stats['imputed'] += int(df[col].isna().sum())
+            if isinstance(df[col].dtype, pd.CategoricalDtype) and value not in df[col].cat.categories:
+                df[col] = df[col].cat.add_categories(value)
+            # Column-wise assignment only rewrites the affected column
+            df[col] = df[col].fillna(value)
+        
+        # Fences apply to imputed values, as when imputing before remove_outliers
+        if self.outlier_column_ is not None:
+            keep &= within_bounds(df, self.outlier_column_, self.bounds_, self.outlier_group_by_)
+        if not keep.all():
+            df = df[keep]
+        self.stats['rows_in'] += rows_in
+        self.stats['rows_out'] += len(df)
+        return df
+    
+    def fit_transform(self, df):
+        return self.fit(df).transform(df)
+    
+    def transform_chunks(self, chunks):
+        """Clean each chunk of a stream with the fitted statistics"""
+        for chunk in chunks:
+            yield self.transform(chunk)
+    
+    def report(self):
+        """Print what the plan has done so far"""
+        dropped = self.stats['rows_in'] - self.stats['rows_out']
+        print(f"🧾 Cleaning plan: parsed {len(self.dates_)} date column(s), "
+              f"imputed {self.stats['imputed']:,} values, dropped {dropped:,} of {self.stats['rows_in']:,} rows")
+        return self.stats
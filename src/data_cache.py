@@ -0,0 +1,170 @@
+# src/data_cache.py
+import hashlib
+import json
+import os
+import time
+import pandas as pd
+
+try:
+    import pyarrow.feather as feather
+except ImportError:  # pyarrow is optional, fall back to pickle files
+    feather = None
+
+CACHE_FORMAT_VERSION = 1
+
+def file_fingerprint(path, block_size=1 << 20):
+    """SHA-256 of a file's contents, read in blocks"""
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for block in iter(lambda: f.read(block_size), b''):
+            digest.update(block)
+    return digest.hexdigest()
+
+def frame_extension():
+    """File extension used for cached frames"""
+    return '.arrow' if feather is not None else '.pkl'
+
+def write_frame(df, path):
+    """Write a frame in Arrow IPC (Feather v2) format, or pickle without pyarrow"""
+    tmp_path = f"{path}.tmp"
+    if feather is not None:
+        # Uncompressed so reads map the file instead of decompressing into new buffers
+        feather.write_feather(df.reset_index(drop=True), tmp_path, compression='uncompressed')
+    else:
+        df.to_pickle(tmp_path)
+    os.replace(tmp_path, path)
+
+def read_frame(path):
+    """Read a frame written by write_frame.
+    
+    The frame is always copied into pandas-owned memory, so a load costs its
+    full size in RSS (Arrow-backed dtypes would change the types downstream
+    code expects). Arrow files are read memory-mapped only so that no second,
+    Arrow-allocated copy of the file stays resident after the conversion.
+    """
+    if path.endswith('.arrow'):
+        if feather is None:
+            raise ImportError("pyarrow is required to read Arrow cache files")
+        return feather.read_table(path, memory_map=True).to_pandas()
+    return pd.read_pickle(path)
+
+class DataCache:
+    def __init__(self, cache_dir='data/.cache', max_size_mb=1024):
+        self.cache_dir = cache_dir
+        self.max_size_bytes = max_size_mb * 1024**2
+        self.index_path = os.path.join(cache_dir, 'index.json')
+        os.makedirs(cache_dir, exist_ok=True)
+        self.index = self._read_index()
+    
+    def _read_index(self):
+        if os.path.exists(self.index_path):
+            try:
+                with open(self.index_path) as f:
+                    index = json.load(f)
+                if index.get('version') == CACHE_FORMAT_VERSION:
+                    return index
+            except (OSError, ValueError):
+                pass
+        return {'version': CACHE_FORMAT_VERSION, 'sources': {}, 'entries': {}}
+    
+    def _write_index(self):
+        tmp_path = f"{self.index_path}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(self.index, f, indent=2)
+        os.replace(tmp_path, self.index_path)
+    
+    def source_hash(self, path):
+        """Content hash of a source file, re-hashed only when size/mtime change"""
+        source = os.path.abspath(path)
+        stat = os.stat(path)
+        known = self.index['sources'].get(source)
+        if known and known['size'] == stat.st_size and known['mtime_ns'] == stat.st_mtime_ns:
+            return known['hash']
+        
+        content_hash = file_fingerprint(path)
+        if known and known['hash'] != content_hash:
+            self._drop_entries(lambda entry: entry['source'] == source)
+        self.index['sources'][source] = {
+            'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns, 'hash': content_hash
+        }
+        self._write_index()
+        return content_hash
+    
+    def cache_key(self, path, variant=''):
+        """Key derived from the source content and how it was parsed"""
+        payload = f"{CACHE_FORMAT_VERSION}:{self.source_hash(path)}:{variant}"
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+    
+    def get(self, path, variant=''):
+        """Return the cached frame for a source file, or None on a miss"""
+        key = self.cache_key(path, variant)
+        entry = self.index['entries'].get(key)
+        if entry is None:
+            return None
+        
+        cache_file = os.path.join(self.cache_dir, entry['file'])
+        if not os.path.exists(cache_file):
+            self._remove_entry(key)
+            self._write_index()
+            return None
+        
+        df = read_frame(cache_file)
+        entry['last_access'] = time.time()
+        self._write_index()
+        return df
+    
+    def put(self, path, df, variant=''):
+        """Store the parsed frame for a source file and enforce the size bound"""
+        key = self.cache_key(path, variant)
+        file_name = key + frame_extension()
+        cache_file = os.path.join(self.cache_dir, file_name)
+        write_frame(df, cache_file)
+        
+        self.index['entries'][key] = {
+            'file': file_name,
+            'source': os.path.abspath(path),
+            'variant': variant,
+            'size': os.path.getsize(cache_file),
+            'last_access': time.time()
+        }
+        self._evict()
+        self._write_index()
+    
+    def get_or_load(self, path, load_fn, variant=''):
+        """Serve a source file from the cache, parsing it with load_fn on a miss"""
+        start = time.perf_counter()
+        df = self.get(path, variant)
+        if df is not None:
+            print(f"⚡ Loaded {path} from cache in {(time.perf_counter() - start) * 1000:.0f} ms")
+            return df
+        
+        df = load_fn()
+        self.put(path, df, variant)
+        print(f"💾 Cached parsed {path} for future runs")
+        return df
+    
+    def _remove_entry(self, key):
+        entry = self.index['entries'].pop(key)
+        cache_file = os.path.join(self.cache_dir, entry['file'])
+        if os.path.exists(cache_file):
+            os.remove(cache_file)
+    
+    def _drop_entries(self, predicate):
+        for key, entry in list(self.index['entries'].items()):
+            if predicate(entry):
+                self._remove_entry(key)
+    
+    def _evict(self):
+        """Evict least recently used entries until the cache fits its bound"""
+        entries = sorted(self.index['entries'].items(), key=lambda item: item[1]['last_access'])
+        total = sum(entry['size'] for _, entry in entries)
+        for key, entry in entries:
+            if total <= self.max_size_bytes:
+                break
+            self._remove_entry(key)
+            total -= entry['size']
+    
+    def clear(self):
+        """Remove every cached frame"""
+        self._drop_entries(lambda entry: True)
+        self._write_index()
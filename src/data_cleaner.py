@@ -1,19 +1,106 @@
 # src/data_cleaner.py
 import pandas as pd
 import numpy as np
+from src.date_parser import date_parser
+from src.sketches import QuantileSketch
+
+def iqr_fences(q1, q3, k=1.5):
+    """Tukey fences: values outside [Q1 - k*IQR, Q3 + k*IQR] are outliers"""
+    iqr = q3 - q1
+    return q1 - k * iqr, q3 + k * iqr
+
+class OutlierSketch:
+    def __init__(self, column='Sales', group_by=None, compression=200):
+        """Quantile sketches of column (per group_by key) fed chunk by chunk"""
+        self.column = column
+        self.group_by = [group_by] if isinstance(group_by, str) else group_by
+        self.compression = compression
+        self.sketches = {}
+        # Missing values per key, left out of the sketches until impute() gives them a value
+        self.missing = {}
+    
+    def _add(self, key, values):
+        self.sketches.setdefault(key, QuantileSketch(self.compression)).update(values)
+        self.missing[key] = self.missing.get(key, 0) + int(np.isnan(values).sum())
+    
+    def update(self, chunk):
+        if self.group_by is None:
+            self._add(None, chunk[self.column].to_numpy(dtype=float))
+            return self
+        for key, values in chunk.groupby(self.group_by, observed=True, sort=False)[self.column]:
+            self._add(key, values.to_numpy(dtype=float))
+        return self
+    
+    def impute(self, value):
+        """Count every missing value seen so far as value, as if imputed before the fences"""
+        for key, count in self.missing.items():
+            if count:
+                self.sketches[key].update(np.full(count, value, dtype=float))
+        self.missing = {}
+        return self
+    
+    def bounds(self, k=1.5):
+        """(lower, upper), or a lower/upper frame indexed by the group_by keys"""
+        if self.group_by is None:
+            sketch = self.sketches.get(None)
+            q1, q3 = sketch.quantile([0.25, 0.75]) if sketch is not None else (np.nan, np.nan)
+            return iqr_fences(q1, q3, k)
+        keys = sorted(self.sketches)
+        quartiles = np.array([self.sketches[key].quantile([0.25, 0.75]) for key in keys]).reshape(-1, 2)
+        lower, upper = iqr_fences(quartiles[:, 0], quartiles[:, 1], k)
+        index = pd.MultiIndex.from_tuples(keys, names=self.group_by)
+        return pd.DataFrame({'lower': lower, 'upper': upper}, index=index)
+
+def streaming_outlier_bounds(chunks, column='Sales', group_by=None, k=1.5, compression=200):
+    """IQR fences over chunked input without materializing the column.
+    
+    Each chunk (or group within it) feeds a mergeable quantile sketch. Returns
+    (lower, upper) for the whole column, or a lower/upper frame indexed by the
+    group_by keys, ready for DataCleaner.remove_outliers(bounds=...).
+    """
+    sketch = OutlierSketch(column, group_by, compression)
+    rows = 0
+    for chunk in chunks:
+        rows += len(chunk)
+        sketch.update(chunk)
+    print(f"📐 Outlier bounds for {column} from {rows:,} streamed rows ({len(sketch.sketches)} sketch(es))")
+    return sketch.bounds(k)
+
+def outlier_bounds(df, column='Sales', group_by=None, k=1.5):
+    """Exact IQR fences of an in-memory frame, in the form streaming_outlier_bounds returns"""
+    if group_by is None:
+        return iqr_fences(*df[column].quantile([0.25, 0.75]), k)
+    group_by = [group_by] if isinstance(group_by, str) else group_by
+    # One grouped pass computes both quartiles of every group
+    quartiles = df.groupby(group_by, observed=True)[column].quantile([0.25, 0.75]).unstack()
+    lower, upper = iqr_fences(quartiles[0.25], quartiles[0.75], k)
+    index = pd.MultiIndex.from_frame(quartiles.index.to_frame(index=False))
+    return pd.DataFrame({'lower': lower.to_numpy(), 'upper': upper.to_numpy()}, index=index)
+
+def within_bounds(df, column, bounds, group_by=None):
+    """Boolean mask of rows inside precomputed fences; rows whose group has none are kept"""
+    values = df[column].to_numpy(dtype=float)
+    if group_by is None:
+        lower, upper = bounds
+        return (values >= lower) & (values <= upper)
+    group_by = [group_by] if isinstance(group_by, str) else group_by
+    codes = bounds.index.get_indexer(pd.MultiIndex.from_frame(df[group_by]))
+    lower = np.append(bounds['lower'].to_numpy(), -np.inf)[codes]
+    upper = np.append(bounds['upper'].to_numpy(), np.inf)[codes]
+    return (values >= lower) & (values <= upper)
 
 class DataCleaner:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, copy=True):
+        # copy=False takes ownership of df instead of defensively copying it
+        self.df = df.copy() if copy else df
     
     def clean_dates(self):
         """Clean date columns"""
         print("📅 Cleaning date columns...")
         date_columns = [col for col in self.df.columns if 'date' in col.lower()]
         
-        for col in date_columns:
-            self.df[col] = pd.to_datetime(self.df[col], errors='coerce')
-            invalid_dates = self.df[col].isnull().sum()
+        invalid = date_parser.parse_columns(self.df, date_columns)
+        for col, invalid_dates in invalid.items():
             if invalid_dates > 0:
                 print(f"   Fixed {invalid_dates} invalid dates in {col}")
         
@@ -23,34 +110,54 @@ class DataCleaner:
         """Handle missing values"""
         print("🔧 Handling missing values...")
         
-        for col in self.df.columns:
-            if self.df[col].isnull().sum() > 0:
-                if self.df[col].dtype in ['float64', 'int64']:
-                    self.df[col].fillna(self.df[col].median(), inplace=True)
-                else:
-                    self.df[col].fillna('Unknown', inplace=True)
+        null_counts = self.df.isnull().sum()
+        for col in null_counts[null_counts > 0].index:
+            # Column-wise assignment only rewrites the affected column
+            if pd.api.types.is_numeric_dtype(self.df[col]):
+                self.df[col] = self.df[col].fillna(self.df[col].median())
+            else:
+                if isinstance(self.df[col].dtype, pd.CategoricalDtype) and 'Unknown' not in self.df[col].cat.categories:
+                    self.df[col] = self.df[col].cat.add_categories('Unknown')
+                self.df[col] = self.df[col].fillna('Unknown')
         
         return self
     
-    def remove_outliers(self, column='Sales'):
-        """Remove outliers using IQR method"""
+    def remove_outliers(self, column='Sales', group_by=None, bounds=None, k=1.5):
+        """Remove outliers using IQR method.
+        
+        group_by computes the fences per group (e.g. Category/Sub-Category) so
+        categories with large tickets keep their large orders. bounds applies
+        precomputed fences, such as those from streaming_outlier_bounds.
+        """
         print(f"📊 Removing outliers from {column}...")
         
         if column in self.df.columns:
-            Q1 = self.df[column].quantile(0.25)
-            Q3 = self.df[column].quantile(0.75)
-            IQR = Q3 - Q1
-            lower_bound = Q1 - 1.5 * IQR
-            upper_bound = Q3 + 1.5 * IQR
+            group_by = [group_by] if isinstance(group_by, str) else group_by
+            if group_by is not None and not set(group_by).issubset(self.df.columns):
+                print(f"   ⚠️ Group columns {group_by} not found - using global bounds")
+                group_by = None
+                bounds = bounds if isinstance(bounds, tuple) else None
+            if bounds is None:
+                bounds = outlier_bounds(self.df, column, group_by, k)
             
             before = len(self.df)
-            self.df = self.df[(self.df[column] >= lower_bound) & (self.df[column] <= upper_bound)]
+            self.df = self.df[within_bounds(self.df, column, bounds, group_by)]
             after = len(self.df)
             
-            print(f"   Removed {before - after} outliers")
+            scope = f" (per {'/'.join(group_by)})" if group_by is not None else ""
+            print(f"   Removed {before - after} outliers{scope}")
         
         return self
     
+    def run_plan(self, plan):
+        """Clean with a CleaningPlan, fitting it on this frame first if needed"""
+        print("🧾 Running cleaning plan...")
+        if not plan.fitted:
+            plan.fit(self.df)
+        self.df = plan.transform(self.df)
+        plan.report()
+        return self
+    
     def generate_report(self):
         """Generate cleaning report"""
         print("✅ Data cleaning completed!")
@@ -1,39 +1,205 @@
 # src/data_detector.py
+import io
+import os
+import re
+import numpy as np
+import pandas as pd
+from src.date_parser import date_parser
+
+# Letters, a separator, then digits: CA-2016-152156, CG-12520, FUR-BO-10001798
+ID_PATTERN = re.compile(r'^[A-Za-z]{1,6}[-_][A-Za-z0-9-]*\d{3,}$')
+CURRENCY_SYMBOLS = '$€£¥₹'
+GEOGRAPHY_HINTS = ('region', 'state', 'city', 'area', 'country', 'territory', 'province')
+SALES_HINTS = ('sales', 'revenue', 'amount')
+# Strings at least this long on average are free text rather than labels
+TEXT_MIN_LENGTH = 30
+
+def sample_file(path, sample_bytes=256 * 1024, n_ranges=4, encoding='utf-8'):
+    """Header plus whole lines from n_ranges byte ranges spread over the file, parsed as strings"""
+    size = os.path.getsize(path)
+    with open(path, 'rb') as f:
+        header = f.readline()
+        if size <= sample_bytes * n_ranges:
+            body = f.read()
+        else:
+            blocks = []
+            for i in range(n_ranges):
+                start = len(header) + (size - len(header)) * i // n_ranges
+                f.seek(start)
+                if i:
+                    f.readline()  # skip the partial line the range starts in
+                block = f.read(sample_bytes)
+                # Keep whole lines only
+                blocks.append(block[:block.rfind(b'\n') + 1])
+            body = b''.join(blocks)
+    return pd.read_csv(io.BytesIO(header + body), dtype=str, encoding=encoding, on_bad_lines='skip')
+
+def _numeric_values(values):
+    """Values as floats once currency symbols and thousands separators are stripped, or None"""
+    text = values.str.strip()
+    has_symbol = text.str.contains(f'[{re.escape(CURRENCY_SYMBOLS)}]', regex=True).mean() > 0.5
+    cleaned = text.str.replace(f'[{re.escape(CURRENCY_SYMBOLS)},\\s]', '', regex=True)
+    numbers = pd.to_numeric(cleaned, errors='coerce')
+    if numbers.notna().mean() < 0.98:
+        return None, False
+    return numbers.dropna().to_numpy(dtype=float), has_symbol
+
+def infer_semantic_type(series):
+    """'date', 'id', 'currency', 'ratio', 'integer', 'code', 'categorical' or 'text' from a column's values"""
+    values = series.dropna()
+    if len(values) == 0:
+        return 'text'
+    if pd.api.types.is_datetime64_any_dtype(values):
+        return 'date'
+    if pd.api.types.is_bool_dtype(values):
+        return 'categorical'
+    if pd.api.types.is_numeric_dtype(values):
+        numbers, has_symbol = values.to_numpy(dtype=float), False
+        text = values.astype(str)
+    else:
+        text = values.astype(str)
+        numbers, has_symbol = _numeric_values(text)
+    
+    if numbers is not None:
+        integral = np.all(numbers == np.round(numbers))
+        if has_symbol:
+            return 'currency'
+        if integral:
+            if len(numbers) > 1 and np.mean(np.diff(numbers) > 0) >= 0.99:
+                return 'id'  # increasing like a row number (restarts where files were appended)
+            digits = text.str.strip().str.len()
+            if digits.min() >= 4 and digits.nunique() == 1 and numbers.min() >= 0:
+                return 'code'  # fixed-width numbers such as postal codes
+            return 'integer'
+        if numbers.min() >= 0 and numbers.max() <= 1:
+            return 'ratio'
+        return 'currency'
+    
+    unique = text.unique()
+    if len(unique) >= 2 and date_parser.infer_format(unique) is not None:
+        return 'date'
+    if pd.Series(unique).str.match(ID_PATTERN).mean() >= 0.95:
+        return 'id'
+    if text.str.len().mean() >= TEXT_MIN_LENGTH or len(unique) > 0.5 * len(text):
+        return 'text'
+    return 'categorical'
+
+def infer_semantic_types(df):
+    return {col: infer_semantic_type(df[col]) for col in df.columns}
+
 class DataColumnDetector:
-    def __init__(self, df):
+    def __init__(self, df, source=None, sample_rows=20000):
+        """Column roles inferred from values; df may be a loaded frame or a file sample"""
         self.df = df
+        self.source = source
+        self.sample_rows = sample_rows
         self.column_mapping = {}
+        self.semantic_types = None
+    
+    @classmethod
+    def from_file(cls, path, sample_bytes=256 * 1024, n_ranges=4, encoding='utf-8'):
+        """Detect from the header and a few sampled byte ranges, without parsing the whole file"""
+        sample = sample_file(path, sample_bytes, n_ranges, encoding)
+        print(f"🔎 Sampled {len(sample):,} rows of {path} for column detection")
+        return cls(sample, source=path)
+    
+    def infer_types(self):
+        """Semantic type of every column, from up to sample_rows rows"""
+        if self.semantic_types is None:
+            # Kept in file order: row numbers are recognised by (almost) always increasing
+            sample = (self.df if len(self.df) <= self.sample_rows
+                      else self.df.sample(self.sample_rows, random_state=0).sort_index())
+            self.semantic_types = infer_semantic_types(sample)
+        return self.semantic_types
+    
+    def _columns_of(self, *types):
+        return [col for col, kind in self.infer_types().items() if kind in types]
+    
+    def _pick_date(self, candidates):
+        """The earliest of several date columns (an order date precedes its ship date)"""
+        if len(candidates) < 2:
+            return candidates[0] if candidates else None
+        medians = {col: date_parser.parse(self.df[col]).median() for col in candidates}
+        return min(candidates, key=lambda col: (pd.isna(medians[col]), medians[col]))
+    
+    def _pick_sales(self, candidates):
+        named = [col for col in candidates if any(x in col.lower() for x in SALES_HINTS)]
+        if named or not candidates:
+            return named[0] if named else None
+        # Otherwise the largest never-negative amount (profit can go negative)
+        amounts = {col: _numeric_values(self.df[col].dropna().astype(str))[0] for col in candidates}
+        positive = [col for col in candidates if amounts[col] is not None and amounts[col].min() >= 0]
+        return max(positive or candidates, key=lambda col: np.mean(amounts[col]) if amounts[col] is not None else 0)
+    
+    def _cardinality(self, col):
+        return self.df[col].nunique()
     
     def detect_columns(self):
         """Automatically detect column types"""
         print("🔍 Detecting column types...")
+        types = self.infer_types()
         
-        detected_columns = {'date_columns': [], 'sales_columns': [], 'category_columns': [], 'region_columns': []}
-        
-        for col in self.df.columns:
-            col_lower = col.lower()
-            
-            if any(x in col_lower for x in ['date', 'time', 'year', 'month']):
-                detected_columns['date_columns'].append(col)
-                print(f"📅 Date column: {col}")
-            elif any(x in col_lower for x in ['sales', 'amount', 'revenue']):
-                detected_columns['sales_columns'].append(col)
-                print(f"💰 Sales column: {col}")
-            elif any(x in col_lower for x in ['category', 'type', 'segment']):
-                detected_columns['category_columns'].append(col)
-                print(f"🏷️ Category column: {col}")
-            elif any(x in col_lower for x in ['region', 'state', 'city', 'area']):
+        detected_columns = {
+            'date_columns': self._columns_of('date'),
+            'sales_columns': self._columns_of('currency'),
+            'id_columns': self._columns_of('id'),
+            'category_columns': [],
+            'region_columns': []
+        }
+        for col in self._columns_of('categorical'):
+            if self._cardinality(col) < 2:
+                continue  # a constant (e.g. a single Country) slices nothing
+            if any(x in col.lower() for x in GEOGRAPHY_HINTS):
                 detected_columns['region_columns'].append(col)
-                print(f"🌍 Region column: {col}")
+            else:
+                detected_columns['category_columns'].append(col)
+        
+        for col in detected_columns['date_columns']:
+            print(f"📅 Date column: {col}")
+        for col in detected_columns['sales_columns']:
+            print(f"💰 Amount column: {col}")
+        for col in detected_columns['id_columns']:
+            print(f"🔑 ID column: {col}")
+        for col in detected_columns['category_columns']:
+            print(f"🏷️ Category column: {col}")
+        for col in detected_columns['region_columns']:
+            print(f"🌍 Region column: {col}")
         
-        # Set default mappings
-        self.column_mapping['date'] = detected_columns['date_columns'][0] if detected_columns['date_columns'] else None
-        self.column_mapping['sales'] = detected_columns['sales_columns'][0] if detected_columns['sales_columns'] else None
-        self.column_mapping['category'] = detected_columns['category_columns'][0] if detected_columns['category_columns'] else None
-        self.column_mapping['region'] = detected_columns['region_columns'][0] if detected_columns['region_columns'] else None
+        categories = detected_columns['category_columns']
+        named_categories = [col for col in categories if 'category' in col.lower() and 'sub' not in col.lower()]
+        # Coarsest slices make the default dimensions: Category over Segment, Region over City
+        self.column_mapping['date'] = self._pick_date(detected_columns['date_columns'])
+        self.column_mapping['sales'] = self._pick_sales(detected_columns['sales_columns'])
+        self.column_mapping['category'] = (named_categories[0] if named_categories else
+                                           min(categories, key=self._cardinality, default=None))
+        self.column_mapping['region'] = min(detected_columns['region_columns'], key=self._cardinality, default=None)
         
         return detected_columns, self.column_mapping
     
+    def read_schema(self, columns=None):
+        """Typed read schema (columns, dtypes, per-column date formats) for DataLoader"""
+        types = self.infer_types()
+        columns = [col for col in (columns or self.df.columns) if col in types]
+        dtypes, date_formats = {}, {}
+        for col in columns:
+            kind = types[col]
+            if kind == 'date':
+                date_formats[col] = date_parser.infer_format(self.df[col].dropna().astype(str).unique())
+            elif kind in ('currency', 'ratio'):
+                dtypes[col] = 'float32'
+            elif kind in ('integer', 'id', 'code'):
+                numbers = pd.to_numeric(self.df[col], errors='coerce')
+                if kind != 'integer' and numbers[self.df[col].notna()].isna().any():
+                    dtypes[col] = 'category'  # string IDs and codes
+                else:
+                    # Sampled values: leave headroom before choosing a 32-bit integer
+                    small = numbers.abs().max() < 2**30
+                    dtypes[col] = 'float32' if numbers.isna().any() else ('int32' if small else 'int64')
+            else:
+                dtypes[col] = 'category'
+        return {'columns': columns, 'dtypes': dtypes, 'date_formats': date_formats, 'semantic_types':
+                {col: types[col] for col in columns}}
+    
     def manual_column_mapping(self):
         """Manual column mapping if auto-detection fails"""
         print("\n🎯 Manual Column Mapping Required")
@@ -50,4 +216,4 @@ class DataColumnDetector:
                 self.column_mapping['sales'] = sales_col
         
         print(f"✅ Final mappings: {self.column_mapping}")
-        return self.column_mapping
\ No newline at end of file
+        return self.column_mapping
@@ -2,57 +2,224 @@
 import pandas as pd
 import numpy as np
 import os
+import json
+from src.data_cache import DataCache
+from src.synthetic_data import SyntheticDataGenerator
+from src.date_parser import date_parser
+from src.memory_tracker import MemoryTracker
+
+# Columns used by the downstream phases (cleaning, features, forecasting,
+# Power BI export). Names and free-text fields are skipped on streaming loads.
+PIPELINE_COLUMNS = [
+    'Order ID', 'Order Date', 'Ship Date', 'Ship Mode', 'Segment', 'City',
+    'State', 'Region', 'Product ID', 'Category', 'Sub-Category',
+    'Sales', 'Quantity', 'Discount', 'Profit'
+]
+
+# Explicit read schema so pandas never has to infer object dtypes
+SUPERSTORE_SCHEMA = {
+    'Row ID': 'int32',
+    'Order ID': 'category',
+    'Ship Mode': 'category',
+    'Customer ID': 'category',
+    'Customer Name': 'category',
+    'Segment': 'category',
+    'Country': 'category',
+    'City': 'category',
+    'State': 'category',
+    'Postal Code': 'float32',
+    'Region': 'category',
+    'Product ID': 'category',
+    'Category': 'category',
+    'Sub-Category': 'category',
+    'Product Name': 'category',
+    'Sales': 'float32',
+    'Quantity': 'int32',
+    'Discount': 'float32',
+    'Profit': 'float32'
+}
+
+SUPERSTORE_DATE_COLUMNS = ['Order Date', 'Ship Date']
 
 class DataLoader:
-    def __init__(self):
+    def __init__(self, cache_dir='data/.cache', cache_size_mb=1024):
         self.data_path = "data/"
+        self.last_load_stats = {}
+        self.cache_dir = cache_dir
+        self.cache_size_mb = cache_size_mb
+        self._cache = None
         os.makedirs(self.data_path, exist_ok=True)
     
-    def load_local_superstore_data(self):
-        """Load Superstore dataset from local file"""
-        print("🔍 Searching for Superstore dataset...")
-        
+    @property
+    def cache(self):
+        """Columnar cache of parsed source files, created on first use"""
+        if self._cache is None:
+            self._cache = DataCache(self.cache_dir, self.cache_size_mb)
+        return self._cache
+    
+    def find_superstore_file(self):
+        """Return the first Superstore file found on disk, or None"""
         possible_paths = [
             "superstore.csv", "Superstore.csv", "Sample - Superstore.csv",
-            "data/superstore.csv", "data/Superstore.csv", 
+            "data/superstore.csv", "data/Superstore.csv",
             "superstore_sales.csv", "data/superstore_sales.csv"
         ]
         
         for path in possible_paths:
             if os.path.exists(path):
-                try:
-                    print(f"📁 Found: {path}")
+                return path
+        return None
+    
+    def detect_schema(self, path=None, columns=None):
+        """Sniff column roles and a typed read schema from a sample of the file.
+        
+        Returns (detector, schema), or (None, None) when there is no file.
+        """
+        from src.data_detector import DataColumnDetector
+        
+        path = path or self.find_superstore_file()
+        if path is None:
+            return None, None
+        detector = DataColumnDetector.from_file(path)
+        detected_columns, mappings = detector.detect_columns()
+        # Mapped columns are read even when they are not Superstore pipeline columns
+        columns = list(columns or PIPELINE_COLUMNS)
+        columns += [col for col in mappings.values() if col and col not in columns]
+        return detector, detector.read_schema(columns)
+    
+    def load_local_superstore_data(self, streaming=False, use_cache=False, **stream_options):
+        """Load Superstore dataset from local file"""
+        print("🔍 Searching for Superstore dataset...")
+        
+        path = self.find_superstore_file()
+        if path:
+            try:
+                print(f"📁 Found: {path}")
+                if use_cache:
+                    # The cache stores the typed frame produced by the streaming load
+                    schema = stream_options.get('schema')
+                    variant = json.dumps({'columns': sorted(stream_options.get('columns') or PIPELINE_COLUMNS),
+                                          'schema': schema or SUPERSTORE_SCHEMA}, sort_keys=True)
+                    df = self.cache.get_or_load(
+                        path, lambda: self.load_superstore_streaming(path, **stream_options), variant
+                    )
+                elif streaming:
+                    df = self.load_superstore_streaming(path, **stream_options)
+                else:
                     df = pd.read_csv(path, encoding='utf-8')
-                    print(f"✅ Loaded successfully! Shape: {df.shape}")
-                    return df
-                except Exception as e:
-                    print(f"❌ Error loading {path}: {e}")
-                    continue
+                print(f"✅ Loaded successfully! Shape: {df.shape}")
+                return df
+            except Exception as e:
+                print(f"❌ Error loading {path}: {e}")
         
         print("❌ No Superstore file found. Creating sample data...")
         return self.create_sample_data()
     
-    def create_sample_data(self):
+    def _resolve_chunksize(self, path, columns, dtypes, max_memory_mb, encoding):
+        """Estimate how many rows fit in the memory budget from a small sample"""
+        sample = pd.read_csv(path, encoding=encoding, nrows=5000,
+                             usecols=lambda c: c in columns, dtype=dtypes)
+        if len(sample) == 0:
+            return 1
+        bytes_per_row = sample.memory_usage(deep=True).sum() / len(sample)
+        # Parsed chunk plus roughly 2x headroom for the parser's own buffers
+        return max(1000, int(max_memory_mb * 1024**2 / (bytes_per_row * 3)))
+    
+    def stream_superstore_data(self, path=None, columns=None, chunksize=None,
+                               max_memory_mb=256, encoding='utf-8', schema=None):
+        """Yield typed chunks of the Superstore file within a memory budget.
+        
+        schema is a DataColumnDetector.read_schema() result; without one the
+        fixed Superstore schema is used.
+        """
+        path = path or self.find_superstore_file()
+        if path is None:
+            raise FileNotFoundError("No Superstore file found")
+        
+        if schema is not None:
+            columns = set(columns or schema['columns'])
+            dtypes = {col: dtype for col, dtype in schema['dtypes'].items() if col in columns}
+            date_formats = {col: fmt for col, fmt in schema['date_formats'].items() if col in columns}
+        else:
+            columns = set(columns or PIPELINE_COLUMNS)
+            dtypes = {col: dtype for col, dtype in SUPERSTORE_SCHEMA.items() if col in columns}
+            date_formats = {col: None for col in SUPERSTORE_DATE_COLUMNS if col in columns}
+        
+        if chunksize is None:
+            chunksize = self._resolve_chunksize(path, columns, dtypes, max_memory_mb, encoding)
+        
+        reader = pd.read_csv(path, encoding=encoding, usecols=lambda c: c in columns,
+                             dtype=dtypes, chunksize=chunksize)
+        for chunk in reader:
+            for col, date_format in date_formats.items():
+                date_parser.parse_columns(chunk, [col], date_format)
+            yield chunk
+    
+    def load_superstore_streaming(self, path=None, columns=None, chunksize=None,
+                                  max_memory_mb=256, encoding='utf-8', schema=None, measure_memory=False):
+        """Load the Superstore file chunk by chunk into one compact typed frame.
+        
+        max_memory_mb sizes each parsed chunk, not the whole load: the chunks
+        are concatenated into one frame, which can be far larger. With
+        measure_memory the real peak of Python/NumPy allocations is traced
+        (several times slower) alongside the estimate from the chunks' sizes.
+        """
+        print("🌊 Streaming Superstore data in typed chunks...")
+        
+        chunks = []
+        rows = 0
+        accumulated_bytes = 0
+        peak_bytes = 0
+        tracker = MemoryTracker(enabled=measure_memory)
+        with tracker.track('load'):
+            for chunk in self.stream_superstore_data(path, columns, chunksize, max_memory_mb, encoding, schema):
+                chunk_bytes = chunk.memory_usage(deep=True).sum()
+                peak_bytes = max(peak_bytes, accumulated_bytes + chunk_bytes)
+                accumulated_bytes += chunk_bytes
+                rows += len(chunk)
+                chunks.append(chunk)
+            
+            df = concat_typed_chunks(chunks)
+        final_bytes = df.memory_usage(deep=True).sum()
+        # Concatenation briefly holds the chunks and the combined frame
+        peak_bytes = max(peak_bytes, accumulated_bytes + final_bytes)
+        
+        self.last_load_stats = {
+            'rows': rows,
+            'chunks': len(chunks),
+            'frame_mb': final_bytes / 1024**2,
+            'estimated_peak_mb': peak_bytes / 1024**2,
+            'measured_peak_mb': tracker.phases[-1]['peak_mb'] if tracker.phases else None,
+            'max_memory_mb_per_chunk': max_memory_mb
+        }
+        measured = self.last_load_stats['measured_peak_mb']
+        print(f"   Read {rows:,} rows in {len(chunks)} chunks")
+        print(f"   Frame size: {self.last_load_stats['frame_mb']:.2f} MB, "
+              f"estimated peak: {self.last_load_stats['estimated_peak_mb']:.2f} MB"
+              + (f", measured peak: {measured:.2f} MB" if measured is not None else ""))
+        return df
+    
+    def create_sample_data(self, n_rows=7500, seed=42):
         """Create sample data if no file found"""
         print("📊 Creating sample retail data...")
         
-        dates = pd.date_range('2018-01-01', '2023-12-31', freq='D')
-        categories = ['Furniture', 'Office Supplies', 'Technology']
-        regions = ['West', 'East', 'Central', 'South']
-        
-        data = []
-        for date in dates:
-            if np.random.random() > 0.3:  # 70% chance of having data each day
-                for _ in range(np.random.randint(1, 5)):
-                    data.append({
-                        'Order Date': date,
-                        'Category': np.random.choice(categories),
-                        'Region': np.random.choice(regions),
-                        'Sales': np.random.normal(500, 150),
-                        'Quantity': np.random.randint(1, 5)
-                    })
-        
-        df = pd.DataFrame(data)
-        df.to_csv("data/sample_superstore.csv", index=False)
+        df = SyntheticDataGenerator(seed=seed).generate(n_rows)
+        df.to_csv("data/sample_superstore.csv", index=False, date_format='%m/%d/%Y')
         print(f"✅ Sample data created with {len(df)} records")
-        return df
\ No newline at end of file
+        return df
+
+def concat_typed_chunks(chunks):
+    """Concatenate chunks, unifying categoricals so they stay categorical"""
+    if not chunks:
+        return pd.DataFrame()
+    if len(chunks) == 1:
+        return chunks[0].reset_index(drop=True)
+    
+    combined = {}
+    for col in chunks[0].columns:
+        parts = [chunk[col] for chunk in chunks]
+        if isinstance(parts[0].dtype, pd.CategoricalDtype):
+            combined[col] = pd.Series(pd.api.types.union_categoricals(parts, ignore_order=True), name=col)
+        else:
+            combined[col] = pd.concat(parts, ignore_index=True)
+    return pd.DataFrame(combined)
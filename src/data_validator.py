@@ -1,5 +1,133 @@
 # src/data_validator.py
+import time
+import numpy as np
 import pandas as pd
+from src.date_parser import date_parser
+from src.sketches import BloomFilter, HyperLogLog, hash_values
+
+# Thresholds of the streaming checks
+MIN_RECORDS = 100
+MIN_DATE_RANGE_DAYS = 180
+MAX_NULL_RATE = 0.05
+MAX_DUPLICATE_RATE = 0.01
+MAX_NON_POSITIVE_SALES_RATE = 0.05
+MAX_MISSING_MONTH_RATE = 0.1
+
+class DataProfile:
+    def __init__(self, date_col=None, sales_col=None, duplicate_key=None, expected_rows=10_000_000,
+                 hll_precision=12):
+        """Mergeable one-pass statistics of a dataset, fed chunk by chunk.
+        
+        Counts and null rates are exact. Months seen are kept as a set (small
+        whatever the row count), cardinalities come from HyperLogLog sketches and
+        duplicate rows from a Bloom filter sized for expected_rows. Merging
+        profiles adds their duplicate counts; duplicates split across the merged
+        parts are not counted.
+        """
+        self.date_col = date_col
+        self.sales_col = sales_col
+        self.duplicate_key = duplicate_key
+        self.expected_rows = expected_rows
+        self.hll_precision = hll_precision
+        self.rows = 0
+        self.chunks = 0
+        self.nulls = {}
+        self.cardinality = {}
+        self.min_date = None
+        self.max_date = None
+        self.invalid_dates = 0
+        self.months = set()
+        self.duplicates = 0
+        self.seen_rows = BloomFilter(expected_rows)
+        self.negative_sales = 0
+        self.zero_sales = 0
+        self.total_sales = 0.0
+    
+    def update(self, chunk):
+        """Add one chunk's statistics; the chunk is not modified"""
+        self.rows += len(chunk)
+        self.chunks += 1
+        for col, nulls in chunk.isna().sum().items():
+            self.nulls[col] = self.nulls.get(col, 0) + int(nulls)
+            self.cardinality.setdefault(col, HyperLogLog(self.hll_precision)).update(chunk[col])
+        
+        key = [col for col in (self.duplicate_key or chunk.columns) if col in chunk.columns]
+        self.duplicates += int(self.seen_rows.add_hashes(hash_values(chunk[key])).sum())
+        
+        if self.date_col in chunk.columns:
+            dates = date_parser.parse(chunk[self.date_col])
+            self.invalid_dates += int(dates.isna().sum() - chunk[self.date_col].isna().sum())
+            dates = dates.dropna()
+            if len(dates):
+                self._add_dates(dates.min(), dates.max(), dates.dt.year * 12 + dates.dt.month - 1)
+        
+        if self.sales_col in chunk.columns:
+            sales = pd.to_numeric(chunk[self.sales_col], errors='coerce').to_numpy(dtype=float)
+            self.negative_sales += int(np.count_nonzero(sales < 0))
+            self.zero_sales += int(np.count_nonzero(sales == 0))
+            self.total_sales += float(np.nansum(sales))
+        return self
+    
+    def _add_dates(self, min_date, max_date, months):
+        self.min_date = min_date if self.min_date is None else min(self.min_date, min_date)
+        self.max_date = max_date if self.max_date is None else max(self.max_date, max_date)
+        self.months.update(np.unique(months).tolist())
+    
+    def merge(self, other):
+        """Fold another profile (e.g. of another file or partition) into this one"""
+        self.rows += other.rows
+        self.chunks += other.chunks
+        for col, nulls in other.nulls.items():
+            self.nulls[col] = self.nulls.get(col, 0) + nulls
+        for col, sketch in other.cardinality.items():
+            self.cardinality.setdefault(col, HyperLogLog(self.hll_precision)).merge(sketch)
+        if other.min_date is not None:
+            self._add_dates(other.min_date, other.max_date, list(other.months))
+        self.invalid_dates += other.invalid_dates
+        self.duplicates += other.duplicates
+        self.seen_rows.merge(other.seen_rows)
+        self.negative_sales += other.negative_sales
+        self.zero_sales += other.zero_sales
+        self.total_sales += other.total_sales
+        return self
+    
+    def missing_months(self):
+        """Months between the first and last date with no rows at all"""
+        if not self.months:
+            return []
+        return [pd.Period(year=m // 12, month=m % 12 + 1, freq='M')
+                for m in range(min(self.months), max(self.months) + 1) if m not in self.months]
+    
+    def to_dict(self):
+        """Compact JSON-friendly profile"""
+        rate = lambda count: round(count / self.rows, 6) if self.rows else 0.0
+        missing = self.missing_months()
+        span = max(self.months) - min(self.months) + 1 if self.months else 0
+        return {
+            'rows': self.rows,
+            'chunks': self.chunks,
+            'null_rates': {col: rate(nulls) for col, nulls in self.nulls.items()},
+            'cardinality': {col: int(round(sketch.estimate())) for col, sketch in self.cardinality.items()},
+            'date_column': self.date_col,
+            'min_date': None if self.min_date is None else str(self.min_date.date()),
+            'max_date': None if self.max_date is None else str(self.max_date.date()),
+            'date_range_days': 0 if self.min_date is None else int((self.max_date - self.min_date).days),
+            'invalid_date_rate': rate(self.invalid_dates),
+            'months': span,
+            'missing_months': [str(month) for month in missing],
+            'duplicate_rows': self.duplicates,
+            'duplicate_rate': rate(self.duplicates),
+            'duplicate_false_positive_rate': round(float(self.seen_rows.false_positive_rate()), 6),
+            'sales_column': self.sales_col,
+            'negative_sales': self.negative_sales,
+            'zero_sales': self.zero_sales,
+            'non_positive_sales_rate': rate(self.negative_sales + self.zero_sales),
+            'total_sales': round(self.total_sales, 2)
+        }
+
+def frame_chunks(df, chunk_rows=100_000):
+    for start in range(0, len(df), chunk_rows):
+        yield df.iloc[start:start + chunk_rows]
 
 class DataValidator:
     def __init__(self, df, column_mappings):
@@ -12,26 +140,26 @@ class DataValidator:
         
         requirements = {
             'has_date_column': False,
-            'has_sales_column': False, 
+            'has_sales_column': False,
             'sufficient_records': False,
             'sufficient_date_range': False
         }
         
-        # Check date column
+        # Check date column (parsed into a copy; the frame is left as it was)
         date_col = self.mappings.get('date')
         if date_col and date_col in self.df.columns:
             requirements['has_date_column'] = True
-            self.df[date_col] = pd.to_datetime(self.df[date_col], errors='coerce')
-            date_range = (self.df[date_col].max() - self.df[date_col].min()).days
-            requirements['sufficient_date_range'] = date_range >= 180
+            dates = date_parser.parse(self.df[date_col])
+            date_range = (dates.max() - dates.min()).days
+            requirements['sufficient_date_range'] = date_range >= MIN_DATE_RANGE_DAYS
         
-        # Check sales column  
+        # Check sales column
         sales_col = self.mappings.get('sales')
         if sales_col and sales_col in self.df.columns:
             requirements['has_sales_column'] = True
         
         # Check record count
-        requirements['sufficient_records'] = len(self.df) >= 100
+        requirements['sufficient_records'] = len(self.df) >= MIN_RECORDS
         
         # Calculate score
         met_requirements = sum(requirements.values())
@@ -41,4 +169,51 @@ class DataValidator:
         for req, met in requirements.items():
             print(f"   {'✅' if met else '❌'} {req}")
         
-        return requirements, suitability_score
\ No newline at end of file
+        return requirements, suitability_score
+    
+    def validate_streaming(self, chunks=None, duplicate_key=None, expected_rows=10_000_000, fail_fast=True):
+        """One-pass validation over chunks (or self.df in slices) into a mergeable DataProfile.
+        
+        With fail_fast, a first chunk missing the date or sales column stops the
+        pass at once. Returns (requirements, score, profile dict).
+        """
+        print("✅ Validating dataset in one streaming pass...")
+        start = time.perf_counter()
+        date_col, sales_col = self.mappings.get('date'), self.mappings.get('sales')
+        profile = DataProfile(date_col, sales_col, duplicate_key, expected_rows)
+        
+        for chunk in (chunks if chunks is not None else frame_chunks(self.df)):
+            if profile.chunks == 0 and fail_fast and not {date_col, sales_col} <= set(chunk.columns):
+                profile.update(chunk)
+                print(f"   ❌ Mapped date/sales columns missing from {list(chunk.columns)} - stopping early")
+                break
+            profile.update(chunk)
+        
+        summary = profile.to_dict()
+        columns = set(summary['null_rates'])
+        null_rates = [summary['null_rates'].get(col, 0) for col in (date_col, sales_col) if col in columns]
+        months = summary['months']
+        requirements = {
+            'has_date_column': date_col in columns,
+            'has_sales_column': sales_col in columns,
+            'sufficient_records': summary['rows'] >= MIN_RECORDS,
+            'sufficient_date_range': summary['date_range_days'] >= MIN_DATE_RANGE_DAYS,
+            'few_nulls': bool(null_rates) and max(null_rates) + summary['invalid_date_rate'] <= MAX_NULL_RATE,
+            'few_duplicates': summary['duplicate_rate'] <= MAX_DUPLICATE_RATE,
+            'positive_sales': sales_col in columns and summary['non_positive_sales_rate'] <= MAX_NON_POSITIVE_SALES_RATE,
+            'continuous_dates': months > 0 and len(summary['missing_months']) / months <= MAX_MISSING_MONTH_RATE
+        }
+        suitability_score = sum(requirements.values()) / len(requirements) * 100
+        summary['seconds'] = round(time.perf_counter() - start, 3)
+        
+        print(f"📋 Profile: {summary['rows']:,} rows in {summary['chunks']} chunks, "
+              f"{summary['min_date']} to {summary['max_date']}, {summary['duplicate_rows']:,} duplicate rows, "
+              f"{summary['negative_sales'] + summary['zero_sales']:,} non-positive sales ({summary['seconds']:.2f}s)")
+        if summary['missing_months']:
+            print(f"   ⚠️ Months without data: {', '.join(summary['missing_months'][:6])}"
+                  f"{' ...' if len(summary['missing_months']) > 6 else ''}")
+        print(f"📊 Suitability Score: {suitability_score:.1f}%")
+        for req, met in requirements.items():
+            print(f"   {'✅' if met else '❌'} {req}")
+        
+        return requirements, suitability_score, summary
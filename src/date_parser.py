@@ -0,0 +1,96 @@
+# src/date_parser.py
+import numpy as np
+import pandas as pd
+
+CANDIDATE_FORMATS = [
+    '%m/%d/%Y', '%Y-%m-%d', '%Y-%m-%d %H:%M:%S', '%d/%m/%Y',
+    '%m-%d-%Y', '%d-%m-%Y', '%Y/%m/%d', '%d.%m.%Y', '%m/%d/%Y %H:%M'
+]
+
+# DataFrame.attrs key listing columns that already hold parsed dates
+PARSED_DATES_ATTR = 'parsed_date_columns'
+
+class DateParser:
+    def __init__(self, sample_size=500):
+        self.sample_size = sample_size
+        self.formats = {}
+    
+    def infer_format(self, values):
+        """Pick the first candidate format that parses a sample of the values"""
+        sample = pd.Series(values).dropna().astype(str)
+        if len(sample) > self.sample_size:
+            sample = sample.sample(self.sample_size, random_state=0)
+        if len(sample) == 0:
+            return None
+        
+        best_format, best_ratio = None, 0.0
+        for fmt in CANDIDATE_FORMATS:
+            ratio = pd.to_datetime(sample, format=fmt, errors='coerce').notna().mean()
+            if ratio == 1.0:
+                return fmt
+            if ratio > best_ratio:
+                best_format, best_ratio = fmt, ratio
+        return best_format if best_ratio >= 0.9 else None
+    
+    def fits(self, values, date_format, sample_size=50):
+        """True if date_format parses every value of a small sample"""
+        sample = pd.Series(values).dropna().astype(str)
+        if len(sample) > sample_size:
+            sample = sample.sample(sample_size, random_state=0)
+        return bool(pd.to_datetime(sample, format=date_format, errors='coerce').notna().all())
+    
+    def parse(self, series, date_format=None):
+        """Parse a column by converting each distinct value only once"""
+        if pd.api.types.is_datetime64_any_dtype(series):
+            return series
+        
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            codes = series.cat.codes.values
+            uniques = series.cat.categories
+        else:
+            codes, uniques = pd.factorize(series)
+        
+        key = series.name
+        if date_format is None:
+            date_format = self.formats.get(key)
+            # The same column name can come from a file written with another format
+            if date_format is None or not self.fits(uniques, date_format):
+                date_format = self.infer_format(uniques)
+        if key is not None and date_format is not None:
+            self.formats[key] = date_format
+        
+        if date_format is not None:
+            parsed_uniques = pd.to_datetime(uniques.astype(str), format=date_format, errors='coerce')
+        else:
+            parsed_uniques = pd.to_datetime(uniques, errors='coerce')
+        
+        values = np.append(np.asarray(parsed_uniques, dtype='datetime64[ns]'), np.datetime64('NaT'))
+        # Missing values have code -1, which picks the trailing NaT
+        parsed = values[codes]
+        return pd.Series(parsed, index=series.index, name=series.name)
+    
+    def is_parsed(self, df, column):
+        """True if the column was already parsed by this service or is a datetime"""
+        return (column in df.attrs.get(PARSED_DATES_ATTR, ())
+                or pd.api.types.is_datetime64_any_dtype(df[column]))
+    
+    def parse_columns(self, df, columns, date_format=None):
+        """Parse date columns in place, skipping ones already parsed.
+        
+        Returns a dict of column -> number of values that failed to parse.
+        """
+        invalid = {}
+        for col in columns:
+            if col not in df.columns:
+                continue
+            if not self.is_parsed(df, col):
+                before = df[col].isnull().sum()
+                df[col] = self.parse(df[col], date_format)
+                invalid[col] = int(df[col].isnull().sum() - before)
+            parsed_columns = df.attrs.setdefault(PARSED_DATES_ATTR, [])
+            if col not in parsed_columns:
+                parsed_columns.append(col)
+        return invalid
+
+# Shared instance so formats inferred in one phase are reused by the next
+date_parser = DateParser()
@@ -1,37 +1,78 @@
 # src/feature_engineer.py
 import pandas as pd
 import numpy as np
+from src.feature_store import FeatureDefinition
+
+def time_features(frame):
+    """Calendar features of the (single) date column in frame"""
+    dates = frame.iloc[:, 0]
+    features = pd.DataFrame({
+        'year': dates.dt.year,
+        'month': dates.dt.month,
+        'quarter': dates.dt.quarter,
+        'day_of_week': dates.dt.dayofweek
+    })
+    features['is_weekend'] = (features['day_of_week'] >= 5).astype(int)
+    features['is_holiday_season'] = features['month'].isin([11, 12]).astype(int)
+    return features
+
+def monthly_aggregate_features(frame):
+    """Monthly Sales mean/std/count, broadcast back by group code instead of a merge"""
+    monthly = frame.groupby(['year', 'month'])
+    group_codes = monthly.ngroup().values
+    monthly_agg = monthly['Sales'].agg(['mean', 'std', 'count'])
+    return _broadcast_stats(monthly_agg, group_codes, frame.index)
+
+def _broadcast_stats(monthly_agg, group_codes, index):
+    features = pd.DataFrame(index=index)
+    has_missing_keys = (group_codes < 0).any()
+    for feature, stat in [('avg_monthly_sales', 'mean'), ('sales_std', 'std'), ('transaction_count', 'count')]:
+        values = monthly_agg[stat].values
+        if has_missing_keys:
+            # Rows without a year/month get code -1, which picks the trailing NaN
+            values = np.append(values, np.nan)
+        features[feature] = values[group_codes]
+    return features
 
 class FeatureEngineer:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, copy=True, feature_store=None):
+        # copy=False takes ownership of df instead of defensively copying it
+        self.df = df.copy() if copy else df
+        # Optional FeatureStore; unchanged features are read back instead of recomputed
+        self.feature_store = feature_store
+    
+    def _add_features(self, name, inputs, compute):
+        if self.feature_store is not None:
+            definition = FeatureDefinition(name, inputs, compute)
+            features = self.feature_store.materialize('transactions', self.df, [definition])
+        else:
+            features = compute(self.df[inputs])
+        for col in features.columns:
+            self.df[col] = features[col].values
     
     def create_time_features(self):
         """Create time-based features"""
         print("⏰ Creating time features...")
         
         date_col = [col for col in self.df.columns if 'date' in col.lower()][0]
-        
-        self.df['year'] = self.df[date_col].dt.year
-        self.df['month'] = self.df[date_col].dt.month
-        self.df['quarter'] = self.df[date_col].dt.quarter
-        self.df['day_of_week'] = self.df[date_col].dt.dayofweek
-        self.df['is_weekend'] = (self.df['day_of_week'] >= 5).astype(int)
-        self.df['is_holiday_season'] = self.df['month'].isin([11, 12]).astype(int)
+        self._add_features('time_features', [date_col], time_features)
         
         return self
     
-    def create_aggregate_features(self):
+    def create_aggregate_features(self, store=None):
         """Create aggregate features"""
         print("📈 Creating aggregate features...")
         
-        # Monthly aggregates
-        monthly_agg = self.df.groupby(['year', 'month']).agg({
-            'Sales': ['mean', 'std', 'count']
-        }).reset_index()
-        monthly_agg.columns = ['year', 'month', 'avg_monthly_sales', 'sales_std', 'transaction_count']
-        
-        self.df = self.df.merge(monthly_agg, on=['year', 'month'], how='left')
+        if store is not None:
+            # Monthly statistics maintained incrementally by the aggregate store, over all its groups
+            monthly_agg = store.period_stats(by_group=False)
+            period_keys = monthly_agg.index.year * 12 + monthly_agg.index.month
+            group_codes = pd.Index(period_keys).get_indexer(self.df['year'] * 12 + self.df['month'])
+            features = _broadcast_stats(monthly_agg, group_codes, self.df.index)
+            for col in features.columns:
+                self.df[col] = features[col].values
+        else:
+            self._add_features('monthly_aggregates', ['year', 'month', 'Sales'], monthly_aggregate_features)
         
         return self
     
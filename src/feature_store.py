@@ -0,0 +1,118 @@
+# src/feature_store.py
+import hashlib
+import json
+import os
+from datetime import datetime
+import pandas as pd
+from src.data_cache import write_frame, read_frame, frame_extension
+from src.pipeline import code_hash
+
+FEATURE_STORE_VERSION = 1
+
+class FeatureDefinition:
+    def __init__(self, name, inputs, compute):
+        """A named feature set: compute(df[inputs]) returns a frame of feature columns"""
+        self.name = name
+        self.inputs = list(inputs)
+        self.compute = compute
+    
+    def definition_hash(self):
+        """Changes whenever the name, inputs, compute function or the project modules it uses change"""
+        payload = json.dumps([FEATURE_STORE_VERSION, self.name, self.inputs, code_hash(self.compute)])
+        return hashlib.sha256(payload.encode()).hexdigest()[:16]
+
+class FeatureStore:
+    def __init__(self, root='data/.features', max_versions=3):
+        """Materialized feature columns keyed by input data fingerprint and definition"""
+        self.root = root
+        self.max_versions = max_versions
+        os.makedirs(root, exist_ok=True)
+    
+    def _manifest_path(self, feature_set):
+        return os.path.join(self.root, feature_set, 'manifest.json')
+    
+    def manifest(self, feature_set):
+        path = self._manifest_path(feature_set)
+        if not os.path.exists(path):
+            return {'features': {}}
+        with open(path) as f:
+            return json.load(f)
+    
+    def _write_manifest(self, feature_set, manifest):
+        path = self._manifest_path(feature_set)
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, path)
+    
+    @staticmethod
+    def _column_hashes(df, columns):
+        """Fingerprint of each input column, hashed once however many features use it"""
+        return {col: hashlib.sha256(pd.util.hash_pandas_object(df[col], index=False).values.tobytes()).hexdigest()
+                for col in columns}
+    
+    def materialize(self, feature_set, df, definitions):
+        """Feature columns for df, read from the store where inputs and definitions are unchanged.
+        
+        Returns one frame aligned to df's rows with every definition's columns;
+        only definitions whose inputs or code changed are recomputed and written.
+        """
+        os.makedirs(os.path.join(self.root, feature_set), exist_ok=True)
+        manifest = self.manifest(feature_set)
+        column_hashes = self._column_hashes(df, {col for d in definitions for col in d.inputs})
+        
+        frames = []
+        for definition in definitions:
+            input_hash = hashlib.sha256(''.join(column_hashes[col] for col in definition.inputs).encode()).hexdigest()[:16]
+            key = f"{definition.definition_hash()}-{input_hash}"
+            entry = manifest['features'].setdefault(definition.name, {'versions': {}, 'latest': None})
+            version = entry['versions'].get(key)
+            path = os.path.join(self.root, feature_set, version['file']) if version else None
+            
+            if path is not None and os.path.exists(path):
+                features = read_frame(path)
+                print(f"♻️ Feature set '{definition.name}' unchanged - read from store")
+            else:
+                features = definition.compute(df[definition.inputs])
+                features = features.to_frame() if isinstance(features, pd.Series) else features
+                file_name = f"{definition.name}-{key}{frame_extension()}"
+                write_frame(features, os.path.join(self.root, feature_set, file_name))
+                entry['versions'][key] = {
+                    'file': file_name,
+                    'columns': list(features.columns),
+                    'rows': len(features),
+                    'created': datetime.now().isoformat(timespec='seconds')
+                }
+                print(f"🧮 Computed feature set '{definition.name}' ({len(features.columns)} columns)")
+            entry['latest'] = key
+            entry['versions'][key]['last_used'] = datetime.now().isoformat(timespec='seconds')
+            self._prune(feature_set, entry)
+            frames.append(features.set_axis(df.index, axis=0))
+        
+        self._write_manifest(feature_set, manifest)
+        return pd.concat(frames, axis=1) if frames else pd.DataFrame(index=df.index)
+    
+    def _prune(self, feature_set, entry):
+        """Keep only the most recently used versions of a feature set"""
+        versions = sorted(entry['versions'].items(), key=lambda item: item[1]['last_used'], reverse=True)
+        for key, version in versions[self.max_versions:]:
+            if key == entry['latest']:
+                continue
+            path = os.path.join(self.root, feature_set, version['file'])
+            if os.path.exists(path):
+                os.remove(path)
+            del entry['versions'][key]
+    
+    def read(self, feature_set, names=None):
+        """Latest materialized values of the named feature sets, for serving.
+        
+        These are the exact files the last training run computed or read.
+        """
+        features = self.manifest(feature_set)['features']
+        frames = []
+        for name in names or sorted(features):
+            if name not in features or features[name]['latest'] is None:
+                raise KeyError(f"Feature set '{name}' has not been materialized in '{feature_set}'")
+            version = features[name]['versions'][features[name]['latest']]
+            frames.append(read_frame(os.path.join(self.root, feature_set, version['file'])))
+        return pd.concat(frames, axis=1)
@@ -0,0 +1,367 @@
+# src/forecast_server.py - python cli.py serve (or python -m src.forecast_server) from the project root
+import json
+import os
+import queue
+import threading
+import time
+from collections import OrderedDict, deque
+from concurrent.futures import Future
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+import numpy as np
+import pandas as pd
+from src.model_registry import ModelRegistry, data_fingerprint
+
+SERVING_SUFFIX = '_serving'
+
+def publish_recursive_model(registry, values, dates, series_ids, model='xgboost'):
+    """Fit a pooled recursive model over every series and register it for serving.
+    
+    The registered bundle carries the series history it forecasts from, so the
+    server needs nothing but the registry. Refitting is skipped while the
+    history is unchanged.
+    """
+    from src.xgboost_model import MLForecaster
+    
+    name = model + SERVING_SUFFIX
+    history = pd.DataFrame(np.asarray(values, dtype=float), columns=list(series_ids))
+    fingerprint = data_fingerprint(history.assign(ds=pd.DatetimeIndex(dates)), {'model': model})
+    if registry.lookup(name, fingerprint) is not None:
+        print(f"♻️ Serving model '{name}' is up to date")
+        return name
+    
+    forecaster = MLForecaster()
+    forecaster.fit_recursive(history.values, dates, model)
+    bundle = {
+        'kind': 'recursive',
+        'model': model,
+        'forecaster': forecaster,
+        'values': history.values,
+        'dates': pd.DatetimeIndex(dates),
+        'series_ids': list(series_ids)
+    }
+    registry.save(name, bundle, fingerprint, {'model': model, 'series': len(series_ids)})
+    return name
+
+def _file_stamp(path):
+    """Identity of the file at path; the registry replaces model files rather than rewriting them"""
+    try:
+        stat = os.stat(path)
+    except OSError:
+        return None
+    return stat.st_ino, stat.st_mtime_ns, stat.st_size
+
+class ModelCache:
+    def __init__(self, registry, max_memory_mb=256):
+        """LRU cache of deserialized models, bounded by their size on disk.
+        
+        Every lookup checks the cached model's file is still the one in the
+        registry, so a republished model is served without a restart.
+        """
+        self.registry = registry
+        self.max_bytes = max_memory_mb * 1024 * 1024
+        self.entries = OrderedDict()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.reloads = 0
+        self.lock = threading.Lock()
+    
+    def resolve(self, model):
+        """Registry name serving model: its published recursive bundle, or a fitted Prophet model.
+        
+        Other registry entries (e.g. the XGBoost/RF test-set models) need lag
+        features the server does not have, so they are not servable.
+        """
+        if self.registry.metadata(model + SERVING_SUFFIX) is not None:
+            return model + SERVING_SUFFIX
+        metadata = self.registry.metadata(model)
+        if metadata is not None and metadata.get('serializer') == 'prophet':
+            return model
+        raise KeyError(f"Model '{model}' is not servable from {self.registry.root}")
+    
+    def servable(self):
+        """Model names resolve() accepts"""
+        models = set()
+        for name in self.registry.names():
+            if name.endswith(SERVING_SUFFIX):
+                models.add(name[:-len(SERVING_SUFFIX)])
+            elif self.registry.metadata(name).get('serializer') == 'prophet':
+                models.add(name)
+        return sorted(models)
+    
+    def get(self, name):
+        with self.lock:
+            if name in self.entries:
+                model, size, path, stamp = self.entries[name]
+                if _file_stamp(path) == stamp:
+                    self.entries.move_to_end(name)
+                    self.hits += 1
+                    return model
+                # Republished (or removed) since it was loaded
+                del self.entries[name]
+                self.total_bytes -= size
+                self.reloads += 1
+            self.misses += 1
+            
+            entry = self.registry.lookup(name)
+            # Stamped before reading, so a replacement during the load is picked up next time
+            stamp = _file_stamp(entry.path) if entry is not None else None
+            if stamp is None:
+                raise KeyError(f"No fitted model '{name}' in {self.registry.root}")
+            model = entry.get()
+            size = stamp[2]
+            self.entries[name] = (model, size, entry.path, stamp)
+            self.total_bytes += size
+            # Always keep the model just loaded, even if it alone exceeds the budget
+            while self.total_bytes > self.max_bytes and len(self.entries) > 1:
+                _, (_, evicted_size, _, _) = self.entries.popitem(last=False)
+                self.total_bytes -= evicted_size
+                self.evictions += 1
+            return model
+    
+    def stats(self):
+        with self.lock:
+            return {
+                'models': list(self.entries),
+                'memory_mb': round(self.total_bytes / 1024 / 1024, 2),
+                'max_memory_mb': round(self.max_bytes / 1024 / 1024, 2),
+                'hits': self.hits,
+                'misses': self.misses,
+                'evictions': self.evictions,
+                'reloads': self.reloads
+            }
+
+class ServingMetrics:
+    def __init__(self, window=1000):
+        """Request latency and throughput counters"""
+        self.started = time.time()
+        self.requests = 0
+        self.errors = 0
+        self.batches = 0
+        self.batched_requests = 0
+        self.latencies = deque(maxlen=window)
+        self.completed = deque(maxlen=window)
+        self.lock = threading.Lock()
+    
+    def record(self, latency, ok=True):
+        with self.lock:
+            self.requests += 1
+            self.errors += 0 if ok else 1
+            self.latencies.append(latency)
+            self.completed.append(time.time())
+    
+    def record_batch(self, size):
+        with self.lock:
+            self.batches += 1
+            self.batched_requests += size
+    
+    def snapshot(self):
+        with self.lock:
+            now = time.time()
+            latencies_ms = np.array(self.latencies) * 1000
+            recent = [t for t in self.completed if now - t <= 60]
+            return {
+                'uptime_seconds': round(now - self.started, 1),
+                'requests': self.requests,
+                'errors': self.errors,
+                'requests_per_second': round(self.requests / max(now - self.started, 1e-9), 2),
+                'requests_per_second_last_minute': round(len(recent) / 60, 2),
+                'batches': self.batches,
+                'mean_batch_size': round(self.batched_requests / self.batches, 2) if self.batches else 0,
+                'latency_ms': {
+                    'p50': round(float(np.percentile(latencies_ms, 50)), 2) if len(latencies_ms) else None,
+                    'p95': round(float(np.percentile(latencies_ms, 95)), 2) if len(latencies_ms) else None,
+                    'p99': round(float(np.percentile(latencies_ms, 99)), 2) if len(latencies_ms) else None,
+                    'max': round(float(latencies_ms.max()), 2) if len(latencies_ms) else None
+                }
+            }
+
+class ForecastBatcher:
+    def __init__(self, cache, metrics, batch_window_ms=5, max_batch=256):
+        """Coalesce concurrent requests per model into one batched prediction"""
+        self.cache = cache
+        self.metrics = metrics
+        self.batch_window = batch_window_ms / 1000
+        self.max_batch = max_batch
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self._loop, name='forecast-batcher', daemon=True)
+        self.thread.start()
+    
+    def submit(self, model, series, horizon):
+        future = Future()
+        self.requests.put((model, series, horizon, future))
+        return future
+    
+    def _loop(self):
+        while True:
+            batch = [self.requests.get()]
+            deadline = time.perf_counter() + self.batch_window
+            while len(batch) < self.max_batch:
+                remaining = deadline - time.perf_counter()
+                if remaining <= 0:
+                    break
+                try:
+                    batch.append(self.requests.get(timeout=remaining))
+                except queue.Empty:
+                    break
+            
+            by_model = {}
+            for request in batch:
+                by_model.setdefault(request[0], []).append(request)
+            for model, requests in by_model.items():
+                self._predict(model, requests)
+    
+    def _predict(self, model, requests):
+        try:
+            name = self.cache.resolve(model)
+            bundle = self.cache.get(name)
+            horizon = max(request[2] for request in requests)
+            if name.endswith(SERVING_SUFFIX):
+                dates, forecasts = self._predict_recursive(bundle, requests, horizon)
+            else:
+                dates, forecasts = self._predict_prophet(bundle, requests, horizon)
+            self.metrics.record_batch(len(requests))
+        except Exception as error:
+            for *_, future in requests:
+                future.set_exception(error)
+            return
+        
+        for _, series, h, future in requests:
+            if series in forecasts:
+                future.set_result({'model': model, 'series': series,
+                                   'ds': [d.strftime('%Y-%m-%d') for d in dates[:h]],
+                                   'yhat': [float(v) for v in forecasts[series][:h]]})
+            else:
+                future.set_exception(KeyError(f"Unknown series '{series}' for model '{model}'"))
+    
+    def _predict_recursive(self, bundle, requests, horizon):
+        """Every requested series of the batch in one recursive forecast"""
+        index = {series_id: i for i, series_id in enumerate(bundle['series_ids'])}
+        wanted = sorted({request[1] for request in requests if request[1] in index})
+        forecasts = {}
+        if wanted:
+            columns = [index[series_id] for series_id in wanted]
+            predicted = bundle['forecaster'].forecast_recursive(
+                bundle['values'][:, columns], bundle['dates'], horizon, bundle['model']
+            )
+            forecasts = {series_id: predicted[:, i] for i, series_id in enumerate(wanted)}
+        last_period = bundle['dates'][-1].to_period('M')
+        future = pd.period_range(last_period + 1, periods=horizon, freq='M')
+        return future.to_timestamp(how='end').normalize(), forecasts
+    
+    def _predict_prophet(self, model, requests, horizon):
+        """Prophet models the total series only, forecast from the end of its training data"""
+        future = model.make_future_dataframe(periods=horizon, freq='M', include_history=False)
+        forecast = model.predict(future)
+        return pd.DatetimeIndex(forecast['ds']), {'Total': forecast['yhat'].values}
+
+class ForecastRequestHandler(BaseHTTPRequestHandler):
+    server_version = 'ForecastServer/1.0'
+    
+    def _send_json(self, status, payload):
+        body = json.dumps(payload).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+    
+    def do_GET(self):
+        url = urlparse(self.path)
+        service = self.server.service
+        if url.path == '/metrics':
+            self._send_json(200, {**service.metrics.snapshot(), 'cache': service.cache.stats()})
+        elif url.path == '/models':
+            self._send_json(200, {'models': service.cache.servable()})
+        elif url.path == '/forecast':
+            self._forecast(parse_qs(url.query))
+        else:
+            self._send_json(404, {'error': f"Unknown path {url.path}"})
+    
+    def _forecast(self, query):
+        service = self.server.service
+        start = time.perf_counter()
+        try:
+            series = query.get('series', ['Total'])[0]
+            model = query.get('model', ['xgboost'])[0]
+            horizon = int(query.get('horizon', ['12'])[0])
+            if not 1 <= horizon <= service.max_horizon:
+                raise ValueError(f"horizon must be between 1 and {service.max_horizon}")
+        except ValueError as error:
+            service.metrics.record(time.perf_counter() - start, ok=False)
+            self._send_json(400, {'error': str(error)})
+            return
+        
+        try:
+            result = service.batcher.submit(model, series, horizon).result(timeout=service.timeout)
+            status = 200
+        except KeyError as error:
+            result, status = {'error': error.args[0]}, 404
+        except Exception as error:
+            result, status = {'error': str(error)}, 500
+        service.metrics.record(time.perf_counter() - start, ok=status == 200)
+        self._send_json(status, result)
+    
+    def log_message(self, format, *args):
+        # Per-request access logs would dominate the console under load; /metrics has the counts
+        pass
+
+class ForecastServer:
+    def __init__(self, models_dir='models', host='127.0.0.1', port=8050, cache_mb=256,
+                 batch_window_ms=5, max_horizon=36, timeout=30):
+        self.registry = ModelRegistry(models_dir)
+        self.cache = ModelCache(self.registry, cache_mb)
+        self.metrics = ServingMetrics()
+        self.batcher = ForecastBatcher(self.cache, self.metrics, batch_window_ms)
+        self.max_horizon = max_horizon
+        self.timeout = timeout
+        self.httpd = ThreadingHTTPServer((host, port), ForecastRequestHandler)
+        self.httpd.daemon_threads = True
+        self.httpd.service = self
+    
+    @property
+    def address(self):
+        host, port = self.httpd.server_address[:2]
+        return f"http://{host}:{port}"
+    
+    def warm(self, models):
+        """Load models into the cache before the first request"""
+        for model in models:
+            self.cache.get(self.cache.resolve(model))
+            print(f"🔥 Loaded {model}")
+    
+    def serve_forever(self):
+        print(f"🚀 Serving forecasts on {self.address} (GET /forecast, /metrics, /models)")
+        try:
+            self.httpd.serve_forever()
+        finally:
+            self.httpd.server_close()
+    
+    def shutdown(self):
+        self.httpd.shutdown()
+
+def add_arguments(parser):
+    """Server options, shared with cli.py serve"""
+    parser.add_argument('--models-dir', default='models')
+    parser.add_argument('--host', default='127.0.0.1')
+    parser.add_argument('--port', type=int, default=8050)
+    parser.add_argument('--cache-mb', type=int, default=256)
+    parser.add_argument('--batch-window-ms', type=float, default=5)
+    parser.add_argument('--warm', nargs='*', default=[], help='models to load at startup')
+    return parser
+
+def serve(args):
+    server = ForecastServer(args.models_dir, args.host, args.port, args.cache_mb, args.batch_window_ms)
+    server.warm(args.warm)
+    server.serve_forever()
+
+def main(argv=None):
+    import argparse
+    
+    parser = argparse.ArgumentParser(description='Serve forecasts from fitted models in the model registry')
+    serve(add_arguments(parser).parse_args(argv))
+
+if __name__ == '__main__':
+    main()
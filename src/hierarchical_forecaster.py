@@ -0,0 +1,78 @@
+# src/hierarchical_forecaster.py
+import numpy as np
+import pandas as pd
+from src.parallel_fitting import ParallelFitEngine, FIT_FUNCTIONS
+
+# Per-series models fitted by ParallelFitEngine, plus pooled recursive models over every node
+MODELS = list(FIT_FUNCTIONS) + ['xgboost_recursive', 'random_forest_recursive']
+
+def seasonal_naive_forecast(values, periods, season_length=12):
+    """Repeat the last observed season for every series at once.
+    
+    values has shape (n_periods, n_series); returns (periods, n_series).
+    """
+    values = np.asarray(values, dtype=float)
+    if len(values) >= season_length:
+        last_season = values[-season_length:]
+    else:
+        last_season = np.repeat(values[-1:], season_length, axis=0)
+    repeats = int(np.ceil(periods / season_length))
+    return np.tile(last_season, (repeats, 1))[:periods]
+
+class HierarchicalForecaster:
+    def __init__(self, hierarchy, model='prophet', max_workers=None):
+        if model not in MODELS:
+            raise ValueError(f"Unknown model: {model} (expected one of {', '.join(MODELS)})")
+        self.hierarchy = hierarchy
+        self.model = model
+        self.engine = ParallelFitEngine(max_workers=max_workers)
+        self.base_forecasts = None
+        self.reconciled_forecasts = None
+        self.future_dates = None
+    
+    def fit_forecast(self, periods=12):
+        """Forecast every node of the hierarchy"""
+        n_series = self.hierarchy.n_series
+        print(f"🌳 Forecasting {n_series} series with {self.model}...")
+        
+        values = self.hierarchy.values
+        if self.model == 'seasonal_naive':
+            self.base_forecasts = seasonal_naive_forecast(values, periods)
+        elif self.model in ('xgboost_recursive', 'random_forest_recursive'):
+            # One pooled model for every node, predicted in a single call per step
+            from src.xgboost_model import MLForecaster
+            
+            ml_model = self.model[:-len('_recursive')]
+            forecaster = MLForecaster()
+            forecaster.fit_recursive(values, self.hierarchy.dates, ml_model)
+            self.base_forecasts = forecaster.forecast_recursive(values, self.hierarchy.dates, periods, ml_model)
+        else:
+            tasks = [(i, self.model, {'periods': periods}) for i in range(n_series)]
+            results = self.engine.fit_all(self.hierarchy.dates, values, tasks)
+            self.base_forecasts = np.column_stack([result['forecast'] for result in results])
+        
+        frequency = self.hierarchy.frequency
+        last_period = self.hierarchy.dates[-1].to_period(frequency)
+        future_periods = pd.period_range(last_period + 1, periods=periods, freq=frequency)
+        self.future_dates = future_periods.to_timestamp(how='end').normalize()
+        print(f"✅ Base forecasts ready for {n_series} series")
+        return self.base_forecasts
+    
+    def reconcile(self, method='wls'):
+        """Reconcile base forecasts and return them as a long frame"""
+        self.reconciled_forecasts = self.hierarchy.reconcile(self.base_forecasts, method)
+        print(f"✅ Forecasts reconciled ({method})")
+        return self.to_frame()
+    
+    def to_frame(self):
+        """Base and reconciled forecasts as series_id/ds/yhat rows"""
+        horizon = len(self.future_dates)
+        ids = self.hierarchy.series_ids
+        frame = pd.DataFrame({
+            'series_id': np.repeat(ids, horizon),
+            'ds': np.tile(self.future_dates, len(ids)),
+            'yhat_base': self.base_forecasts.T.ravel()
+        })
+        if self.reconciled_forecasts is not None:
+            frame['yhat'] = self.reconciled_forecasts.T.ravel()
+        return frame
@@ -0,0 +1,109 @@
+# src/hierarchy.py
+import numpy as np
+import pandas as pd
+
+HIERARCHY_LEVELS = ['Category', 'Sub-Category', 'Region', 'Segment']
+SERIES_SEPARATOR = ' | '
+
+class SeriesHierarchy:
+    def __init__(self, dates, bottom_keys, bottom_values, levels, frequency='M'):
+        """Every node of a hierarchy built from its bottom-level series.
+        
+        dates: DatetimeIndex of periods, bottom_keys: DataFrame with one row per
+        bottom series and one column per level, bottom_values: array of shape
+        (n_periods, n_bottom).
+        """
+        self.dates = dates
+        self.frequency = frequency
+        self.levels = list(levels)
+        self.bottom_keys = bottom_keys.reset_index(drop=True)
+        self.bottom_values = np.asarray(bottom_values, dtype=float)
+        self._build_summing_matrix()
+        self.values = self.bottom_values @ self.summing_matrix.T
+    
+    @classmethod
+    def from_transactions(cls, df, levels=None, date_col=None, value_col='Sales', frequency='M'):
+        """Aggregate every bottom-level series in a single groupby pass"""
+        levels = list(levels or HIERARCHY_LEVELS)
+        date_col = date_col or [col for col in df.columns if 'date' in col.lower()][0]
+        
+        periods = df[date_col].dt.to_period(frequency).rename('period')
+        bottom = df.groupby([periods] + [df[level] for level in levels], observed=True)[value_col].sum()
+        wide = bottom.unstack(levels, fill_value=0.0)
+        
+        # Months without any sales for a series are zeros, not gaps
+        full_range = pd.period_range(wide.index.min(), wide.index.max(), freq=frequency)
+        wide = wide.reindex(full_range, fill_value=0.0)
+        
+        bottom_keys = wide.columns.to_frame(index=False)
+        for level in levels:
+            bottom_keys[level] = bottom_keys[level].astype(str)
+        dates = full_range.to_timestamp(how='end').normalize()
+        return cls(dates, bottom_keys, wide.values, levels, frequency)
+    
+    def _build_summing_matrix(self):
+        """Rows map each node (Total, then every level prefix) onto bottom series"""
+        n_bottom = len(self.bottom_keys)
+        ids = ['Total']
+        depths = [0]
+        rows = [np.ones(n_bottom)]
+        
+        for depth in range(1, len(self.levels) + 1):
+            prefix = self.bottom_keys[self.levels[:depth]].agg(SERIES_SEPARATOR.join, axis=1)
+            codes, uniques = pd.factorize(prefix, sort=True)
+            block = np.zeros((len(uniques), n_bottom))
+            block[codes, np.arange(n_bottom)] = 1.0
+            # Row of each bottom series within the full node list
+            node_index = len(ids) + codes
+            rows.extend(block)
+            ids.extend(uniques)
+            depths.extend([depth] * len(uniques))
+        
+        self.summing_matrix = np.vstack(rows)
+        self.series_ids = list(ids)
+        self.series_depths = np.array(depths)
+        self.bottom_index = node_index
+    
+    @property
+    def n_series(self):
+        return len(self.series_ids)
+    
+    def level_name(self, depth):
+        return 'Total' if depth == 0 else ' x '.join(self.levels[:depth])
+    
+    def series(self, series_id):
+        """One node as a Prophet-style ds/y frame"""
+        column = self.series_ids.index(series_id)
+        return pd.DataFrame({'ds': self.dates, 'y': self.values[:, column]})
+    
+    def to_long(self):
+        """All series stacked as series_id/level/ds/y rows"""
+        n_periods = len(self.dates)
+        return pd.DataFrame({
+            'series_id': np.repeat(self.series_ids, n_periods),
+            'level': np.repeat([self.level_name(d) for d in self.series_depths], n_periods),
+            'ds': np.tile(self.dates, self.n_series),
+            'y': self.values.T.ravel()
+        })
+    
+    def reconcile(self, base_forecasts, method='wls'):
+        """Make forecasts coherent so every parent equals the sum of its children.
+        
+        base_forecasts has shape (horizon, n_series) in series_ids order.
+        method: 'bottom_up', 'ols', or 'wls' (structural scaling, weights by
+        the number of bottom series under each node).
+        """
+        S = self.summing_matrix
+        base_forecasts = np.asarray(base_forecasts, dtype=float)
+        
+        if method == 'bottom_up':
+            bottom = base_forecasts[:, self.bottom_index]
+        elif method in ('ols', 'wls'):
+            weights = 1.0 / S.sum(axis=1) if method == 'wls' else np.ones(len(S))
+            StW = S.T * weights
+            # G = (S'WS)^-1 S'W, solved rather than inverted
+            bottom = np.linalg.solve(StW @ S, StW @ base_forecasts.T).T
+        else:
+            raise ValueError(f"Unknown reconciliation method: {method}")
+        
+        return bottom @ S.T
@@ -0,0 +1,167 @@
+# src/hyperparameter_search.py
+import hashlib
+import io
+import itertools
+import json
+import os
+from contextlib import redirect_stdout
+import numpy as np
+import pandas as pd
+from src.time_series_preparer import lag_feature_matrix
+from src.parallel_fitting import process_pool
+
+SEARCH_SPACES = {
+    'xgboost': {
+        'max_depth': [2, 3, 4, 6],
+        'learning_rate': [0.03, 0.1, 0.3],
+        'subsample': [0.7, 1.0],
+        'min_child_weight': [1, 3]
+    },
+    'random_forest': {
+        'max_depth': [None, 4, 8],
+        'min_samples_leaf': [1, 2, 4],
+        'max_features': [1.0, 0.6]
+    }
+}
+
+def _evaluate_trial(task):
+    """Mean absolute error of one configuration on one time-ordered fold"""
+    model, params, resource, X, y, cutoff, test_size, threads = task
+    from src.xgboost_model import MLForecaster
+    
+    forecaster = MLForecaster(n_jobs=threads)
+    X_train, y_train = X[:cutoff], y[:cutoff]
+    X_test, y_test = X[cutoff:cutoff + test_size], y[cutoff:cutoff + test_size]
+    
+    with redirect_stdout(io.StringIO()):
+        if model == 'xgboost':
+            # Early stopping on the tail of the training window, never on the test fold
+            inner = max(1, len(X_train) - test_size)
+            estimator = forecaster.make_estimator(
+                model, {**params, 'n_estimators': resource, 'early_stopping_rounds': 20}
+            )
+            estimator.fit(X_train[:inner], y_train[:inner],
+                          eval_set=[(X_train[inner:], y_train[inner:])], verbose=False)
+        else:
+            estimator = forecaster.make_estimator(model, {**params, 'n_estimators': resource})
+            estimator.fit(X_train, y_train)
+    return float(np.mean(np.abs(estimator.predict(X_test) - y_test)))
+
+class HyperparameterSearch:
+    def __init__(self, model='xgboost', search_space=None, n_candidates=24, min_train=24,
+                 test_size=3, n_splits=4, min_resource=25, max_resource=400, eta=3,
+                 cpu_budget=None, threads_per_trial=1, cache_dir='models/tuning', seed=42):
+        self.model = model
+        self.search_space = search_space or SEARCH_SPACES[model]
+        self.n_candidates = n_candidates
+        self.min_train = min_train
+        self.test_size = test_size
+        self.n_splits = n_splits
+        self.min_resource = min_resource
+        self.max_resource = max_resource
+        self.eta = eta
+        self.threads_per_trial = threads_per_trial
+        self.max_workers = max(1, (cpu_budget or os.cpu_count() or 1) // threads_per_trial)
+        self.cache_path = os.path.join(cache_dir, f'{model}_trials.json')
+        self.seed = seed
+        self.trials = []
+        os.makedirs(cache_dir, exist_ok=True)
+        self.cache = self._load_cache()
+    
+    def _load_cache(self):
+        if os.path.exists(self.cache_path):
+            with open(self.cache_path) as f:
+                return json.load(f)
+        return {}
+    
+    def _save_cache(self):
+        tmp_path = self.cache_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.cache, f)
+        os.replace(tmp_path, self.cache_path)
+    
+    def candidates(self):
+        """Random sample of the grid, reproducible for a given seed"""
+        names = sorted(self.search_space)
+        grid = [dict(zip(names, values)) for values in itertools.product(*(self.search_space[n] for n in names))]
+        rng = np.random.default_rng(self.seed)
+        order = rng.permutation(len(grid))[:self.n_candidates]
+        return [grid[i] for i in order]
+    
+    def folds(self, n_rows):
+        """Anchored cutoffs so appending data leaves earlier folds (and their cache keys) intact"""
+        cutoffs = list(range(self.min_train, n_rows - self.test_size + 1, self.test_size))
+        return cutoffs[-self.n_splits:]
+    
+    def _fold_key(self, X, y, cutoff):
+        end = cutoff + self.test_size
+        digest = hashlib.sha256(np.ascontiguousarray(X[:end]).tobytes())
+        digest.update(np.ascontiguousarray(y[:end]).tobytes())
+        return digest.hexdigest()[:24]
+    
+    def _trial_key(self, params, resource, fold_key):
+        payload = json.dumps([self.model, params, resource, fold_key], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()[:32]
+    
+    def run(self, time_series_data):
+        """Successive halving over time-ordered folds; returns the best parameters"""
+        data = time_series_data.sort_values('ds')
+        dates = pd.DatetimeIndex(data['ds'])
+        features = lag_feature_matrix(data['y'].to_numpy(dtype=float), dates.month.values, 1)
+        valid = ~np.isnan(features).any(axis=1)
+        X, y = features[valid], data['y'].to_numpy(dtype=float)[valid]
+        
+        folds = self.folds(len(X))
+        if not folds:
+            raise ValueError("Not enough history for time-series cross-validation")
+        fold_keys = [self._fold_key(X, y, cutoff) for cutoff in folds]
+        
+        survivors = self.candidates()
+        resource = self.min_resource
+        print(f"🎛️ Tuning {self.model}: {len(survivors)} candidates, {len(folds)} folds, "
+              f"{self.max_workers} concurrent trials")
+        
+        with process_pool(self.max_workers) as executor:
+            while True:
+                scores = self._run_rung(executor, survivors, resource, X, y, folds, fold_keys)
+                ranked = sorted(range(len(survivors)), key=lambda i: scores[i])
+                print(f"   Rung n_estimators={resource}: best MAE ${scores[ranked[0]]:,.2f} "
+                      f"({len(survivors)} candidates)")
+                if resource >= self.max_resource or len(survivors) == 1:
+                    break
+                # Keep the top 1/eta and give them eta times the budget
+                keep = max(1, len(survivors) // self.eta)
+                survivors = [survivors[i] for i in ranked[:keep]]
+                resource = min(self.max_resource, resource * self.eta)
+        
+        best = {**survivors[ranked[0]], 'n_estimators': resource}
+        print(f"✅ Best {self.model} parameters: {best}")
+        return best
+    
+    def _run_rung(self, executor, candidates, resource, X, y, folds, fold_keys):
+        """Mean fold MAE for each candidate, reusing cached trials"""
+        pending = {}
+        for params in candidates:
+            for cutoff, fold_key in zip(folds, fold_keys):
+                key = self._trial_key(params, resource, fold_key)
+                if key not in self.cache:
+                    task = (self.model, params, resource, X, y, cutoff, self.test_size, self.threads_per_trial)
+                    pending[key] = executor.submit(_evaluate_trial, task)
+        
+        for key, future in pending.items():
+            self.cache[key] = future.result()
+        self._save_cache()
+        reused = len(candidates) * len(folds) - len(pending)
+        if reused:
+            print(f"   ♻️ Reused {reused} cached trials")
+        
+        scores = []
+        for params in candidates:
+            fold_scores = [self.cache[self._trial_key(params, resource, fold_key)] for fold_key in fold_keys]
+            self.trials.append({**params, 'n_estimators': resource, 'MAE': float(np.mean(fold_scores))})
+            scores.append(float(np.mean(fold_scores)))
+        return scores
+    
+    def results(self):
+        """Every evaluated configuration and its mean fold MAE"""
+        return pd.DataFrame(self.trials).sort_values('MAE').reset_index(drop=True)
@@ -0,0 +1,177 @@
+# src/incremental_aggregates.py
+import hashlib
+import io
+import json
+import os
+import numpy as np
+import pandas as pd
+from src.data_cache import write_frame, read_frame, frame_extension, file_fingerprint
+from src.date_parser import date_parser
+
+# Bytes hashed at each end of the ingested region to tell an append from a rewrite
+CHECKSUM_WINDOW = 64 * 1024
+
+def ingested_checksum(f, start, end):
+    """Hash of the first and last CHECKSUM_WINDOW bytes between start and end of an open file"""
+    digest = hashlib.sha256()
+    f.seek(start)
+    digest.update(f.read(min(CHECKSUM_WINDOW, end - start)))
+    tail_start = max(start, end - CHECKSUM_WINDOW)
+    f.seek(tail_start)
+    digest.update(f.read(end - tail_start))
+    return digest.hexdigest()
+
+class IncrementalAggregateStore:
+    def __init__(self, path='data/.aggregates', group_by=(), value_col='Sales',
+                 date_col='Order Date', frequency='M'):
+        """Mergeable per-period (and per-group) sum, count and sum of squares"""
+        self.path = path
+        self.group_by = list(group_by)
+        self.value_col = value_col
+        self.date_col = date_col
+        self.frequency = frequency
+        self.keys = ['period'] + self.group_by
+        self.partials_path = os.path.join(path, 'partials' + frame_extension())
+        self.state_path = os.path.join(path, 'state.json')
+        os.makedirs(path, exist_ok=True)
+        self._load()
+    
+    def _empty_partials(self):
+        # Typed even when empty, so the first update keeps a period (not object) level
+        periods = pd.PeriodIndex([], freq=self.frequency, name='period')
+        if len(self.keys) == 1:
+            index = periods
+        else:
+            index = pd.MultiIndex.from_arrays([periods] + [[] for _ in self.group_by], names=self.keys)
+        return pd.DataFrame({'sum': [], 'count': [], 'sumsq': []}, index=index)
+    
+    def _load(self):
+        self.state = {'sources': {}}
+        self.partials = self._empty_partials()
+        if not (os.path.exists(self.state_path) and os.path.exists(self.partials_path)):
+            return
+        try:
+            with open(self.state_path) as f:
+                state = json.load(f)
+        except ValueError:
+            print(f"⚠️ Unreadable {self.state_path} - rebuilding aggregates from scratch")
+            return
+        # A store built for a different grouping cannot be merged into
+        if state.get('keys') != self.keys:
+            return
+        # Partials saved without their state (e.g. a crash in between) would double-count the next ingest
+        if state.get('partials_checksum') != file_fingerprint(self.partials_path):
+            print(f"⚠️ {self.partials_path} does not match its ingest offsets - rebuilding aggregates from scratch")
+            return
+        self.state = state
+        stored = read_frame(self.partials_path)
+        stored['period'] = pd.PeriodIndex(stored['period'], freq=self.frequency)
+        self.partials = stored.set_index(self.keys)
+    
+    def save(self):
+        """Write the partials, then the offsets and checksum that vouch for them, each atomically"""
+        stored = self.partials.reset_index()
+        stored['period'] = stored['period'].astype(str)
+        write_frame(stored, self.partials_path)
+        self.state['keys'] = self.keys
+        self.state['partials_checksum'] = file_fingerprint(self.partials_path)
+        tmp_path = self.state_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(self.state, f, indent=2)
+        os.replace(tmp_path, self.state_path)
+    
+    def reset(self):
+        self.state = {'sources': {}}
+        self.partials = self._empty_partials()
+    
+    def _partial_aggregates(self, rows):
+        """Partial aggregates for a batch of rows"""
+        date_parser.parse_columns(rows, [self.date_col])
+        values = rows[self.value_col].astype('float64')
+        keys = [rows[self.date_col].dt.to_period(self.frequency).rename('period')]
+        keys += [rows[col].astype(str) for col in self.group_by]
+        frame = pd.DataFrame({'sum': values, 'count': values.notna().astype('float64'),
+                              'sumsq': values ** 2})
+        return frame.groupby(keys).sum()
+    
+    def update(self, new_rows):
+        """Fold newly arrived rows in, touching only the periods/groups they hit"""
+        if len(new_rows) == 0:
+            return self
+        delta = self._partial_aggregates(new_rows)
+        
+        existing = delta.index.intersection(self.partials.index)
+        if len(existing):
+            self.partials.loc[existing] += delta.loc[existing]
+        new_keys = delta.index.difference(self.partials.index)
+        if len(new_keys):
+            self.partials = pd.concat([self.partials, delta.loc[new_keys]]).sort_index()
+        
+        print(f"➕ Aggregated {len(new_rows):,} new rows into {len(delta)} period/group cells")
+        return self
+    
+    def ingest_file(self, path, transform=None, encoding='utf-8'):
+        """Read only the bytes appended to path since the last ingest.
+        
+        transform, if given, is applied to the new rows before aggregating
+        (e.g. the same cleaning the full pipeline applies).
+        """
+        source = os.path.abspath(path)
+        known = self.state['sources'].get(source)
+        size = os.path.getsize(path)
+        
+        with open(path, 'rb') as f:
+            header = f.readline()
+            body_start = f.tell()
+            offset = known['offset'] if known else body_start
+            # An append leaves the header and every byte already ingested untouched
+            if known and (known['header'] != header.decode(encoding) or size < offset
+                          or known.get('checksum') != ingested_checksum(f, body_start, offset)):
+                # The file was rewritten rather than appended to: rebuild from scratch
+                print(f"🔄 {path} was rewritten - rebuilding aggregates")
+                self.reset()
+                offset = body_start
+            f.seek(offset)
+            tail = f.read()
+            
+            # Only consume complete lines; a partially written last line waits for next time
+            complete = tail[:tail.rfind(b'\n') + 1]
+            checksum = ingested_checksum(f, body_start, offset + len(complete))
+        
+        if complete:
+            new_rows = pd.read_csv(io.BytesIO(header + complete), encoding=encoding)
+            if transform is not None:
+                new_rows = transform(new_rows)
+            self.update(new_rows)
+        
+        self.state['sources'][source] = {'offset': offset + len(complete), 'header': header.decode(encoding),
+                                         'checksum': checksum}
+        self.save()
+        return self
+    
+    def period_stats(self, by_group=True):
+        """Mean, sample std and count per period (and group, unless by_group is False)"""
+        totals = self.partials
+        if not by_group and self.group_by:
+            # Sums, counts and sums of squares add up across groups
+            totals = totals.groupby(level='period').sum()
+        count = totals['count']
+        mean = totals['sum'] / count
+        variance = (totals['sumsq'] - totals['sum'] ** 2 / count) / (count - 1)
+        return pd.DataFrame({
+            'mean': mean,
+            'std': np.sqrt(variance.clip(lower=0)).where(count > 1),
+            'count': count.astype('int64')
+        })
+    
+    def time_series(self):
+        """Total per period as a Prophet-style ds/y frame"""
+        totals = self.partials['sum'].groupby(level='period').sum().sort_index()
+        if len(totals):
+            # Periods without any rows are zero sales, as with pd.Grouper
+            full_range = pd.period_range(totals.index.min(), totals.index.max(), freq=self.frequency)
+            totals = totals.reindex(full_range, fill_value=0.0)
+        return pd.DataFrame({
+            'ds': totals.index.to_timestamp(how='end').normalize(),
+            'y': totals.values
+        })
@@ -0,0 +1,298 @@
+# src/instrumentation.py
+import cProfile
+import functools
+import inspect
+import json
+import os
+import platform
+import pstats
+import resource
+import sys
+import threading
+import time
+from collections import Counter
+from contextlib import contextmanager, nullcontext
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+# Set by Instrumentation.activate(); instrumented methods are no-ops while it is None
+_active = None
+
+def _proc_fields(path, fields):
+    try:
+        with open(path) as f:
+            values = {}
+            for line in f:
+                key, _, value = line.partition(':')
+                if key in fields:
+                    values[key] = int(value.split()[0])
+            return values
+    except OSError:
+        return {}
+
+def rss_bytes():
+    """Current and peak resident set size of this process"""
+    status = _proc_fields('/proc/self/status', ('VmRSS', 'VmHWM'))
+    if status:
+        return status.get('VmRSS', 0) * 1024, status.get('VmHWM', 0) * 1024
+    # ru_maxrss is KB on Linux, bytes on macOS; no current RSS without /proc
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    peak = peak if sys.platform == 'darwin' else peak * 1024
+    return peak, peak
+
+def reset_peak_rss():
+    """Reset the kernel's peak RSS to the current RSS; False where that is not supported"""
+    try:
+        with open('/proc/self/clear_refs', 'w') as f:
+            f.write('5')
+        return True
+    except OSError:
+        return False
+
+def io_bytes():
+    """Bytes this process has read and written through read/write syscalls, cached or not"""
+    counters = _proc_fields('/proc/self/io', ('rchar', 'wchar'))
+    return counters.get('rchar', 0), counters.get('wchar', 0)
+
+def cpu_seconds():
+    """User + system CPU of this process, its threads and its reaped worker processes"""
+    t = os.times()
+    return t.user + t.system + t.children_user + t.children_system
+
+def count_rows(value):
+    """Rows in a frame-like value, or in the frames a tuple/list/dict holds; None if there are none"""
+    if isinstance(value, (pd.DataFrame, pd.Series, np.ndarray)):
+        return len(value)
+    if isinstance(value, dict):
+        value = list(value.values())
+    if isinstance(value, (list, tuple)):
+        counts = [len(v) for v in value if isinstance(v, (pd.DataFrame, pd.Series, np.ndarray))]
+        return sum(counts) if counts else None
+    return None
+
+class StackSampler:
+    def __init__(self, thread_id, interval=0.005):
+        """Samples one thread's Python stack from a background thread (collapsed-stack output)"""
+        self.thread_id = thread_id
+        self.interval = interval
+        self.samples = Counter()
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+    
+    def _run(self):
+        while not self._stop.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                code = frame.f_code
+                stack.append(f"{os.path.basename(code.co_filename)}:{code.co_name}")
+                frame = frame.f_back
+            if stack:
+                self.samples[';'.join(reversed(stack))] += 1
+    
+    def start(self):
+        self._thread.start()
+        return self
+    
+    def stop(self):
+        self._stop.set()
+        self._thread.join()
+        return self
+    
+    def write(self, path):
+        """One 'frame;frame;frame count' line per stack, as flame graph tools read"""
+        with open(path, 'w') as f:
+            for stack, count in self.samples.most_common():
+                f.write(f"{stack} {count}\n")
+
+class Instrumentation:
+    def __init__(self, output_dir='reports/runs', profile_stage=None, profile_mode='cprofile',
+                 memory_tracker=None):
+        """Per-stage wall time, CPU time, peak RSS, rows and bytes read/written for one run.
+        
+        profile_stage names a stage (or instrumented method) to profile with
+        cProfile ('cprofile') or a stack sampler ('sample'). With a MemoryTracker,
+        top-level stages also record their peak Python allocation.
+        """
+        self.output_dir = output_dir
+        self.profile_stage = profile_stage
+        self.profile_mode = profile_mode
+        self.memory_tracker = memory_tracker
+        self.run_id = datetime.now().strftime('%Y%m%d-%H%M%S')
+        self.started = time.perf_counter()
+        self.records = []
+        self.profiles = []
+        self._local = threading.local()
+        self._lock = threading.Lock()
+        self._open = Counter()
+        self.peak_reset = reset_peak_rss()
+    
+    def activate(self):
+        """Route instrumented class methods to this run"""
+        global _active
+        _active = self
+        return self
+    
+    def deactivate(self):
+        global _active
+        if _active is self:
+            _active = None
+    
+    def _stack(self):
+        if not hasattr(self._local, 'stack'):
+            self._local.stack = []
+        return self._local.stack
+    
+    @contextmanager
+    def stage(self, name, rows_in=None):
+        """Measure the enclosed block; set record['rows_out'] inside it to report output rows"""
+        stack = self._stack()
+        thread_id = threading.get_ident()
+        with self._lock:
+            # Peak RSS is per process: reset it only when no other thread is being measured
+            overlapping = any(count for t, count in self._open.items() if t != thread_id)
+            if not overlapping and not stack and self.peak_reset:
+                reset_peak_rss()
+            self._open[thread_id] += 1
+        record = {
+            'stage': name, 'parent': stack[-1]['stage'] if stack else None, 'depth': len(stack),
+            'thread': threading.current_thread().name, 'rows_in': rows_in, 'rows_out': None,
+            'started_s': round(time.perf_counter() - self.started, 4)
+        }
+        stack.append(record)
+        rss_start, _ = rss_bytes()
+        read_start, written_start = io_bytes()
+        cpu_start, wall_start = cpu_seconds(), time.perf_counter()
+        # tracemalloc is process-wide, so Python allocations are only traced for stages running alone
+        tracing = self.memory_tracker is not None and not record['depth'] and not overlapping
+        track = self.memory_tracker.track(name) if tracing else nullcontext()
+        profiler = self._start_profile(name)
+        try:
+            with track:
+                yield record
+            record['status'] = 'ok'
+        except BaseException as exc:
+            record['status'] = f'failed: {type(exc).__name__}'
+            raise
+        finally:
+            self._stop_profile(name, profiler)
+            rss_end, rss_peak = rss_bytes()
+            read_end, written_end = io_bytes()
+            record.update({
+                'wall_s': round(time.perf_counter() - wall_start, 4),
+                'cpu_s': round(cpu_seconds() - cpu_start, 4),
+                'rss_start_mb': round(rss_start / 1024**2, 1),
+                'rss_end_mb': round(rss_end / 1024**2, 1),
+                'peak_rss_mb': round(rss_peak / 1024**2, 1),
+                'bytes_read': read_end - read_start,
+                'bytes_written': written_end - written_start,
+                'ended_s': round(time.perf_counter() - self.started, 4)
+            })
+            if tracing and self.memory_tracker.phases:
+                record['python_peak_mb'] = round(self.memory_tracker.phases[-1]['peak_mb'], 2)
+            stack.pop()
+            with self._lock:
+                self._open[thread_id] -= 1
+                self.records.append(record)
+    
+    def _start_profile(self, name):
+        if name != self.profile_stage:
+            return None
+        if self.profile_mode == 'sample':
+            return StackSampler(threading.get_ident()).start()
+        profiler = cProfile.Profile()
+        profiler.enable()
+        return profiler
+    
+    def _stop_profile(self, name, profiler):
+        if profiler is None:
+            return
+        os.makedirs(self.output_dir, exist_ok=True)
+        base = os.path.join(self.output_dir, f"{self.run_id}-{name.replace('.', '_')}")
+        if isinstance(profiler, StackSampler):
+            path = base + '.folded'
+            profiler.stop().write(path)
+        else:
+            profiler.disable()
+            path = base + '.prof'
+            profiler.dump_stats(path)
+            with open(base + '.txt', 'w') as f:
+                pstats.Stats(profiler, stream=f).sort_stats('cumulative').print_stats(30)
+        self.profiles.append(path)
+        print(f"🔬 Profile of '{name}' saved to {path}")
+    
+    def _mark_overlaps(self):
+        """Flag records whose process-wide counters include stages of other threads"""
+        top_level = [r for r in self.records if r['depth'] == 0]
+        for record in self.records:
+            record['overlapping'] = any(
+                other['thread'] != record['thread'] and other['started_s'] < record['ended_s']
+                and record['started_s'] < other['ended_s'] for other in top_level)
+        return sorted(self.records, key=lambda r: r['started_s'])
+    
+    def summary(self):
+        """Print the top-level stages of the run"""
+        stages = [r for r in self.records if r['depth'] == 0]
+        print(f"⏱️ Run {self.run_id}: {len(self.records)} measurements")
+        for r in sorted(stages, key=lambda r: r['started_s']):
+            rows = f", rows {r['rows_in']} -> {r['rows_out']}" if r['rows_in'] is not None or r['rows_out'] is not None else ''
+            print(f"   • {r['stage']}: {r['wall_s']:.2f}s wall, {r['cpu_s']:.2f}s CPU, "
+                  f"peak RSS {r['peak_rss_mb']:.0f} MB, read {r['bytes_read'] / 1024**2:.1f} MB, "
+                  f"wrote {r['bytes_written'] / 1024**2:.1f} MB{rows}")
+        return stages
+    
+    def write(self, path=None):
+        """Save the run's measurements as JSON"""
+        path = path or os.path.join(self.output_dir, f"run-{self.run_id}.json")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        payload = {
+            'run_id': self.run_id,
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'cpu_count': os.cpu_count(),
+            'wall_s': round(time.perf_counter() - self.started, 4),
+            # Without a resettable peak, peak_rss_mb is the process peak so far
+            'peak_rss_scope': 'stage' if self.peak_reset else 'process',
+            'profiles': self.profiles,
+            'records': self._mark_overlaps()
+        }
+        tmp_path = path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(payload, f, indent=2, default=str)
+        os.replace(tmp_path, path)
+        print(f"📝 Run metrics saved to {path}")
+        return path
+
+def _instrumented(name, method):
+    @functools.wraps(method)
+    def wrapper(self, *args, **kwargs):
+        instrumentation = _active
+        if instrumentation is None:
+            return method(self, *args, **kwargs)
+        # Input rows: the first frame passed in, else the frame the object holds
+        rows_in = next((count_rows(a) for a in args if count_rows(a) is not None), None)
+        if rows_in is None:
+            rows_in = count_rows(getattr(self, 'df', None))
+        with instrumentation.stage(name, rows_in=rows_in) as record:
+            result = method(self, *args, **kwargs)
+            rows_out = count_rows(result)
+            record['rows_out'] = rows_out if rows_out is not None else count_rows(getattr(self, 'df', None))
+        return result
+    wrapper.__instrumented__ = True
+    return wrapper
+
+def instrument_class(cls, methods=None):
+    """Measure every public method of cls (or the named ones) while an Instrumentation is active.
+    
+    Generator methods are left alone: their work happens as they are iterated.
+    """
+    for attr, value in list(vars(cls).items()):
+        if methods is not None and attr not in methods:
+            continue
+        if attr.startswith('_') or not inspect.isfunction(value) or getattr(value, '__instrumented__', False):
+            continue
+        if inspect.isgeneratorfunction(value):
+            continue
+        setattr(cls, attr, _instrumented(f"{cls.__name__}.{attr}", value))
+    return cls
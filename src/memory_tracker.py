@@ -0,0 +1,49 @@
+# src/memory_tracker.py
+import tracemalloc
+from contextlib import contextmanager
+
+def frame_nbytes(df):
+    """Memory held by a DataFrame, including object/category payloads"""
+    return int(df.memory_usage(deep=True).sum())
+
+class MemoryTracker:
+    def __init__(self, enabled=True):
+        self.enabled = enabled
+        self.phases = []
+    
+    @contextmanager
+    def track(self, phase):
+        """Record the peak Python/NumPy allocation while a phase runs"""
+        if not self.enabled:
+            yield
+            return
+        
+        started_here = not tracemalloc.is_tracing()
+        if started_here:
+            tracemalloc.start()
+        tracemalloc.reset_peak()
+        baseline, _ = tracemalloc.get_traced_memory()
+        try:
+            yield
+        finally:
+            current, peak = tracemalloc.get_traced_memory()
+            self.phases.append({
+                'phase': phase,
+                'peak_mb': (peak - baseline) / 1024**2,
+                'retained_mb': (current - baseline) / 1024**2
+            })
+            if started_here:
+                tracemalloc.stop()
+    
+    def report(self, frame_bytes):
+        """Print per-phase peaks relative to the size of one copy of the frame"""
+        if not self.phases:
+            return []
+        
+        frame_mb = frame_bytes / 1024**2
+        print(f"🧠 Memory report (one frame = {frame_mb:.2f} MB)")
+        for entry in self.phases:
+            entry['frame_copies'] = entry['peak_mb'] / frame_mb if frame_mb else 0.0
+            print(f"   • {entry['phase']}: peak +{entry['peak_mb']:.2f} MB "
+                  f"({entry['frame_copies']:.1f}x frame), retained +{entry['retained_mb']:.2f} MB")
+        return self.phases
@@ -0,0 +1,113 @@
+# src/model_registry.py
+import hashlib
+import json
+import os
+import pickle
+from datetime import datetime
+import pandas as pd
+
+REGISTRY_FORMAT_VERSION = 1
+
+def data_fingerprint(data, params=None):
+    """Hash of the training data values plus the hyperparameters"""
+    digest = hashlib.sha256()
+    digest.update(str(REGISTRY_FORMAT_VERSION).encode())
+    if data is not None:
+        digest.update(','.join(map(str, data.columns)).encode())
+        digest.update(pd.util.hash_pandas_object(data, index=False).values.tobytes())
+    digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode())
+    return digest.hexdigest()
+
+class LazyModel:
+    def __init__(self, path, serializer, metadata):
+        """Handle to a registered model, deserialized the first time it is used.
+        
+        Attributes it lacks (predict, make_future_dataframe, ...) are looked up
+        on the model, so the handle stands in for the model itself.
+        """
+        self.path = path
+        self.serializer = serializer
+        self.metadata = metadata
+        self._model = None
+    
+    def get(self):
+        """Deserialize the model on first use"""
+        if self._model is None:
+            if self.serializer == 'prophet':
+                from prophet.serialize import model_from_json
+                
+                with open(self.path) as f:
+                    self._model = model_from_json(f.read())
+            else:
+                with open(self.path, 'rb') as f:
+                    self._model = pickle.load(f)
+        return self._model
+    
+    def __getattr__(self, name):
+        # Private names are never delegated, which also keeps unpickling from recursing
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.get(), name)
+
+class ModelRegistry:
+    def __init__(self, root='models'):
+        self.root = root
+        os.makedirs(root, exist_ok=True)
+    
+    def _paths(self, name, serializer):
+        extension = '.json' if serializer == 'prophet' else '.pkl'
+        return os.path.join(self.root, name + extension), os.path.join(self.root, name + '.meta.json')
+    
+    def save(self, name, model, fingerprint, params=None, serializer='pickle'):
+        """Persist a fitted model with the fingerprint it was trained under"""
+        model_path, meta_path = self._paths(name, serializer)
+        tmp_path = model_path + '.tmp'
+        if serializer == 'prophet':
+            from prophet.serialize import model_to_json
+            
+            with open(tmp_path, 'w') as f:
+                f.write(model_to_json(model))
+        else:
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(model, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, model_path)
+        
+        metadata = {
+            'name': name,
+            'file': os.path.basename(model_path),
+            'serializer': serializer,
+            'fingerprint': fingerprint,
+            'params': params or {},
+            'saved_at': datetime.now().isoformat(timespec='seconds')
+        }
+        with open(meta_path, 'w') as f:
+            json.dump(metadata, f, indent=2, default=str)
+        print(f"💾 Saved model '{name}' to {model_path}")
+    
+    def metadata(self, name):
+        """Metadata for a registered model, or None"""
+        meta_path = os.path.join(self.root, name + '.meta.json')
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+    
+    def lookup(self, name, fingerprint=None):
+        """LazyModel for name if it exists (and matches fingerprint, when given)"""
+        metadata = self.metadata(name)
+        if metadata is None:
+            return None
+        if fingerprint is not None and metadata['fingerprint'] != fingerprint:
+            return None
+        model_path = os.path.join(self.root, metadata['file'])
+        if not os.path.exists(model_path):
+            return None
+        return LazyModel(model_path, metadata['serializer'], metadata)
+    
+    def load(self, name, fingerprint=None):
+        """Lazy handle to a registered model, or None if missing or trained on other data"""
+        return self.lookup(name, fingerprint)
+    
+    def names(self):
+        """Names of all registered models"""
+        return sorted(f[:-len('.meta.json')] for f in os.listdir(self.root) if f.endswith('.meta.json'))
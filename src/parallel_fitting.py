@@ -0,0 +1,169 @@
+# src/parallel_fitting.py
+import io
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from contextlib import redirect_stdout
+from multiprocessing import shared_memory
+import numpy as np
+import pandas as pd
+
+# Native thread pools that would otherwise each grab every core in every worker
+THREAD_ENV_VARS = [
+    'OMP_NUM_THREADS', 'OPENBLAS_NUM_THREADS', 'MKL_NUM_THREADS',
+    'VECLIB_MAXIMUM_THREADS', 'NUMEXPR_NUM_THREADS'
+]
+
+# Pools are created from pipeline worker threads, and forking a multithreaded process
+# can copy locks other threads hold (BLAS, logging, xgboost); workers start clean instead
+POOL_START_METHOD = 'forkserver' if 'forkserver' in multiprocessing.get_all_start_methods() else 'spawn'
+
+_worker_state = {}
+
+def process_pool(max_workers, initializer=None, initargs=()):
+    """ProcessPoolExecutor whose workers are never forked from the calling process"""
+    context = multiprocessing.get_context(POOL_START_METHOD)
+    if POOL_START_METHOD == 'forkserver':
+        # Imported once in the server instead of in every worker
+        context.set_forkserver_preload(['numpy', 'pandas'])
+    return ProcessPoolExecutor(max_workers=max_workers, mp_context=context,
+                               initializer=initializer, initargs=initargs)
+
+def _init_worker(shm_name, shape, dtype, dates, threads):
+    """Attach to the shared series matrix and cap native threads in this worker"""
+    for var in THREAD_ENV_VARS:
+        os.environ[var] = str(threads)
+    try:
+        # Env vars are ignored by BLAS pools already started (e.g. by a preloaded numpy)
+        from threadpoolctl import threadpool_limits
+        _worker_state['thread_limits'] = threadpool_limits(threads)
+    except ImportError:
+        pass
+    shm = shared_memory.SharedMemory(name=shm_name)
+    _worker_state['shm'] = shm
+    _worker_state['values'] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+    _worker_state['dates'] = dates
+    _worker_state['threads'] = threads
+
+def _series_frame(dates, y):
+    return pd.DataFrame({'ds': dates, 'y': y})
+
+def fit_seasonal_naive(dates, y, options, threads):
+    from src.hierarchical_forecaster import seasonal_naive_forecast
+    
+    periods = options.get('periods', 12)
+    return {'forecast': seasonal_naive_forecast(y[:, None], periods)[:, 0]}
+
+def fit_prophet(dates, y, options, threads):
+    from src.prophet_model import ProphetForecaster
+    
+    periods = options.get('periods', 12)
+    if np.count_nonzero(y) < options.get('min_observations', 24):
+        return fit_seasonal_naive(dates, y, options, threads)
+    
+    forecaster = ProphetForecaster()
+    forecaster.build_model(_series_frame(dates, y))
+    forecast = forecaster.make_forecast(None, periods=periods)
+    return {'forecast': forecast['yhat'].values[-periods:], 'model': forecaster.model}
+
+def _fit_ml(dates, y, options, threads, model):
+    """Test-set predictions and metrics, plus a forecast from a refit on the whole series"""
+    from src.time_series_preparer import TimeSeriesPreparer
+    from src.xgboost_model import MLForecaster
+    
+    periods = options.get('periods', 12)
+    if np.count_nonzero(y) < options.get('min_observations', 24):
+        # Too little history for lag features and a test split
+        return fit_seasonal_naive(dates, y, options, threads)
+    
+    preparer = TimeSeriesPreparer(pd.DataFrame(), copy=False)
+    preparer.time_series_data = _series_frame(dates, y)
+    preparer.create_features_for_ml()
+    train_data, test_data = preparer.split_data(test_size=options.get('test_size', 0.2))
+    
+    forecaster = MLForecaster(n_jobs=threads)
+    if model == 'xgboost':
+        results = forecaster.build_xgboost_model(train_data, test_data)
+        fitted = forecaster.xgb_model
+    else:
+        results = forecaster.build_random_forest_model(train_data, test_data)
+        fitted = forecaster.rf_model
+    forecast = forecaster.make_forecast(_series_frame(dates, y), periods=periods, model=model)
+    return {'forecast': forecast['yhat'].values, 'predictions': results['test_predictions'],
+            'metrics': results['test_metrics'], 'model': fitted}
+
+def fit_xgboost(dates, y, options, threads):
+    return _fit_ml(dates, y, options, threads, 'xgboost')
+
+def fit_random_forest(dates, y, options, threads):
+    return _fit_ml(dates, y, options, threads, 'random_forest')
+
+FIT_FUNCTIONS = {
+    'prophet': fit_prophet,
+    'xgboost': fit_xgboost,
+    'random_forest': fit_random_forest,
+    'seasonal_naive': fit_seasonal_naive
+}
+
+def _run_task(task):
+    """Fit one (series column, model) pair inside a worker"""
+    column, model, options = task
+    y = np.array(_worker_state['values'][:, column])
+    start = time.perf_counter()
+    # Per-fit status lines would interleave across workers; the engine reports progress
+    with redirect_stdout(io.StringIO()):
+        result = FIT_FUNCTIONS[model](_worker_state['dates'], y, options, _worker_state['threads'])
+    if not options.get('return_model', False):
+        result.pop('model', None)
+    result.update({
+        'column': column,
+        'model_name': model,
+        'fit_seconds': time.perf_counter() - start,
+        'worker': os.getpid()
+    })
+    return result
+
+class ParallelFitEngine:
+    def __init__(self, max_workers=None, threads_per_worker=1):
+        self.max_workers = max_workers or max(1, (os.cpu_count() or 1) // threads_per_worker)
+        self.threads_per_worker = threads_per_worker
+        self.timings = []
+    
+    def iter_fits(self, dates, values, tasks):
+        """Fit tasks across a process pool, yielding results as they complete.
+        
+        values: array (n_periods, n_series) placed in shared memory once.
+        tasks: iterable of (series column, model name, options dict).
+        """
+        tasks = list(tasks)
+        values = np.ascontiguousarray(values, dtype=np.float64)
+        shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+        try:
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[:] = values
+            init_args = (shm.name, values.shape, values.dtype.str, dates, self.threads_per_worker)
+            
+            print(f"⚙️ Fitting {len(tasks)} models on {self.max_workers} workers "
+                  f"({self.threads_per_worker} thread(s) each)...")
+            start = time.perf_counter()
+            with process_pool(self.max_workers, _init_worker, init_args) as executor:
+                futures = [executor.submit(_run_task, task) for task in tasks]
+                for done, future in enumerate(as_completed(futures), 1):
+                    result = future.result()
+                    self.timings.append((result['model_name'], result['column'], result['fit_seconds']))
+                    if done == len(tasks) or done % max(1, len(tasks) // 20) == 0:
+                        print(f"   [{done}/{len(tasks)}] {result['model_name']} series {result['column']} "
+                              f"in {result['fit_seconds']:.2f}s ({time.perf_counter() - start:.1f}s elapsed)")
+                    yield result
+        finally:
+            shm.close()
+            shm.unlink()
+    
+    def fit_all(self, dates, values, tasks):
+        """Fit every task and return the results in task order"""
+        tasks = list(tasks)
+        order = {(column, model): i for i, (column, model, _) in enumerate(tasks)}
+        results = [None] * len(tasks)
+        for result in self.iter_fits(dates, values, tasks):
+            results[order[(result['column'], result['model_name'])]] = result
+        return results
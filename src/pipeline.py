@@ -0,0 +1,306 @@
+# src/pipeline.py
+import glob
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import sys
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait, FIRST_COMPLETED
+from contextlib import nullcontext
+from datetime import datetime
+import numpy as np
+import pandas as pd
+from src.instrumentation import count_rows
+
+PIPELINE_FORMAT_VERSION = 2
+
+def _update_value_hash(digest, value, active=None):
+    if isinstance(value, pd.DataFrame):
+        digest.update(json.dumps([[str(c), str(t)] for c, t in value.dtypes.items()]).encode())
+        digest.update(pd.util.hash_pandas_object(value, index=True).values.tobytes())
+    elif isinstance(value, (pd.Series, pd.Index)):
+        digest.update(str(value.dtype).encode())
+        digest.update(pd.util.hash_pandas_object(value).values.tobytes())
+    elif isinstance(value, np.ndarray) and value.dtype != object:
+        digest.update(f"{value.dtype}{value.shape}".encode())
+        digest.update(np.ascontiguousarray(value).tobytes())
+    elif isinstance(value, (str, bytes, int, float, bool, type(None), np.generic, pd.Timestamp)):
+        digest.update(repr(value).encode())
+    elif isinstance(value, (dict, list, tuple)) or hasattr(value, '__dict__'):
+        # Containers on the current path: a back-reference hashes as a marker instead of recursing
+        active = set() if active is None else active
+        if id(value) in active:
+            digest.update(b'<cycle>')
+            return
+        active.add(id(value))
+        if isinstance(value, dict):
+            for key in sorted(value, key=str):
+                digest.update(repr(key).encode())
+                _update_value_hash(digest, value[key], active)
+        elif isinstance(value, (list, tuple)):
+            digest.update(f"{type(value).__name__}{len(value)}".encode())
+            for item in value:
+                _update_value_hash(digest, item, active)
+        else:
+            digest.update(type(value).__qualname__.encode())
+            _update_value_hash(digest, vars(value), active)
+        active.discard(id(value))
+    else:
+        digest.update(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+
+def value_hash(value):
+    """Content hash of a stage output (frames, arrays, dicts, lists and plain objects)"""
+    digest = hashlib.sha256()
+    try:
+        _update_value_hash(digest, value)
+    except (TypeError, RecursionError, pickle.PicklingError):
+        # e.g. frames holding unhashable cells, or object graphs nested too deeply to walk
+        try:
+            digest = hashlib.sha256(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+        except (TypeError, RecursionError, pickle.PicklingError, AttributeError):
+            # Nothing stable to hash: count the output as changed so dependent stages rerun
+            digest = hashlib.sha256(os.urandom(32))
+    return digest.hexdigest()
+
+def _referenced_modules(func, package='src'):
+    """Project modules a function uses, followed transitively through their own imports"""
+    def project_modules(namespace, names=None):
+        found = set()
+        for name, obj in namespace.items():
+            if names is not None and name not in names:
+                continue
+            module = obj.__name__ if inspect.ismodule(obj) else getattr(obj, '__module__', None)
+            if isinstance(module, str) and (module == package or module.startswith(package + '.')):
+                found.add(module)
+        return found
+    
+    names = set(func.__code__.co_names)
+    for const in func.__code__.co_consts:
+        # Names used inside nested functions and comprehensions
+        if inspect.iscode(const):
+            names |= set(const.co_names)
+    pending = project_modules(func.__globals__, names)
+    seen = set()
+    while pending:
+        module = pending.pop()
+        if module in seen or module not in sys.modules:
+            continue
+        seen.add(module)
+        pending |= project_modules(vars(sys.modules[module])) - seen
+    return sorted(seen)
+
+def code_hash(func):
+    """Hash of a stage function's source and of every project module it depends on"""
+    try:
+        code = inspect.getsource(func)
+    except (OSError, TypeError):
+        code = func.__code__.co_code.hex()
+    digest = hashlib.sha256(code.encode())
+    for module in _referenced_modules(func):
+        path = getattr(sys.modules[module], '__file__', None)
+        if path and os.path.exists(path):
+            with open(path, 'rb') as f:
+                digest.update(f.read())
+    return digest.hexdigest()
+
+def output_files(patterns):
+    """Size and mtime of every file matching patterns; a directory stands for the files below it"""
+    files = {}
+    for pattern in patterns:
+        for path in glob.glob(pattern):
+            if os.path.isdir(path):
+                paths = [os.path.join(root, f) for root, dirs, names in os.walk(path) for f in names
+                         if not f.startswith('.')]
+            else:
+                paths = [path]
+            for file_path in paths:
+                stat = os.stat(file_path)
+                files[file_path] = [stat.st_size, stat.st_mtime_ns]
+    return files
+
+def files_unchanged(files):
+    """True if every recorded file still exists with the recorded size and mtime"""
+    for path, (size, mtime_ns) in files.items():
+        try:
+            stat = os.stat(path)
+        except OSError:
+            return False
+        if stat.st_size != size or stat.st_mtime_ns != mtime_ns:
+            return False
+    return True
+
+class Stage:
+    def __init__(self, name, func, inputs=(), config=None, cache=True, outputs=()):
+        """func(*upstream outputs, **config); cache=False reruns the stage every time.
+        
+        outputs lists the files the stage writes, as paths or glob patterns
+        (directories count recursively) that may use {config} fields. The stage
+        reruns when any file it wrote is missing or was modified since.
+        """
+        self.name = name
+        self.func = func
+        self.inputs = list(inputs)
+        self.config = dict(config or {})
+        self.cache = cache
+        self.outputs = [pattern.format(**self.config) for pattern in outputs]
+
+class Pipeline:
+    def __init__(self, cache_dir='data/.pipeline', max_workers=3, instrumentation=None):
+        """Stage DAG whose outputs are persisted and keyed by inputs, code and config"""
+        self.cache_dir = cache_dir
+        self.max_workers = max_workers
+        self.instrumentation = instrumentation
+        self.stages = {}
+        self.results = {}
+        self.timings = {}
+        os.makedirs(cache_dir, exist_ok=True)
+    
+    def add(self, name, func, inputs=(), config=None, cache=True, outputs=()):
+        if name in self.stages:
+            raise ValueError(f"Stage '{name}' already defined")
+        self.stages[name] = Stage(name, func, inputs, config, cache, outputs)
+        return func
+    
+    def stage(self, name=None, inputs=(), config=None, cache=True, outputs=()):
+        """Decorator form of add()"""
+        def register(func):
+            return self.add(name or func.__name__, func, inputs, config, cache, outputs)
+        return register
+    
+    def _required(self, targets):
+        """Stages needed for targets, in dependency order"""
+        order, visiting, done = [], set(), set()
+        
+        def visit(name):
+            if name in done:
+                return
+            if name not in self.stages:
+                raise KeyError(f"Unknown stage '{name}'")
+            if name in visiting:
+                raise ValueError(f"Dependency cycle through stage '{name}'")
+            visiting.add(name)
+            for dependency in self.stages[name].inputs:
+                visit(dependency)
+            visiting.discard(name)
+            done.add(name)
+            order.append(name)
+        
+        for target in targets:
+            visit(target)
+        return order
+    
+    def _paths(self, name):
+        return os.path.join(self.cache_dir, f'{name}.pkl'), os.path.join(self.cache_dir, f'{name}.json')
+    
+    def _metadata(self, name):
+        _, meta_path = self._paths(name)
+        if not os.path.exists(meta_path):
+            return None
+        with open(meta_path) as f:
+            return json.load(f)
+    
+    def _stage_key(self, stage, input_hashes):
+        payload = json.dumps([PIPELINE_FORMAT_VERSION, stage.name, code_hash(stage.func),
+                              stage.config, input_hashes], sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode()).hexdigest()
+    
+    def _value(self, name):
+        """Output of a finished stage, loaded from disk the first time it is needed"""
+        with self._load_lock:
+            if name not in self.results:
+                output_path, _ = self._paths(name)
+                with open(output_path, 'rb') as f:
+                    self.results[name] = pickle.load(f)
+            return self.results[name]
+    
+    def _execute(self, name, output_hashes, force):
+        stage = self.stages[name]
+        key = self._stage_key(stage, [output_hashes[d] for d in stage.inputs])
+        output_path, meta_path = self._paths(name)
+        metadata = self._metadata(name)
+        if (stage.cache and name not in force and metadata is not None
+                and metadata['key'] == key and os.path.exists(output_path)):
+            if files_unchanged(metadata.get('files', {})):
+                print(f"♻️ Stage '{name}' unchanged - using cached output")
+                return metadata['output_hash'], 'cached', 0.0
+            print(f"🗑️ Files written by stage '{name}' are missing or modified")
+        
+        print(f"▶️ Running stage '{name}'...")
+        start = time.perf_counter()
+        inputs = [self._value(d) for d in stage.inputs]
+        measure = (self.instrumentation.stage(name, rows_in=count_rows(inputs[0]) if inputs else None)
+                   if self.instrumentation is not None else nullcontext({}))
+        with measure as record:
+            output = stage.func(*inputs, **stage.config)
+            record['rows_out'] = count_rows(output)
+        del inputs
+        seconds = time.perf_counter() - start
+        with self._load_lock:
+            self.results[name] = output
+        output_hash = value_hash(output)
+        
+        if stage.cache:
+            tmp_path = output_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(output, f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, output_path)
+            with open(meta_path, 'w') as f:
+                json.dump({'stage': name, 'key': key, 'output_hash': output_hash, 'seconds': round(seconds, 3),
+                           'finished': datetime.now().isoformat(timespec='seconds'),
+                           'files': output_files(stage.outputs)}, f, indent=2)
+        print(f"✅ Stage '{name}' finished in {seconds:.1f}s")
+        return output_hash, 'ran', seconds
+    
+    def run(self, targets=None, force=()):
+        """Run the stages targets need, skipping those whose key is unchanged.
+        
+        Stages whose inputs are all available run concurrently. If a stage
+        fails, running stages finish and are persisted before the error is
+        raised, so the next run resumes from the failed stage.
+        """
+        targets = list(targets or self.stages)
+        order = self._required(targets)
+        force = set(force)
+        self._load_lock = threading.RLock()
+        self.results = {}
+        output_hashes, status = {}, {}
+        # Outputs are released once every stage that reads them has finished
+        consumers = {name: sum(name in self.stages[s].inputs for s in order) for name in order}
+        pending = list(order)
+        running = {}
+        error = None
+        
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            while pending or running:
+                if error is None:
+                    for name in [n for n in pending if all(d in output_hashes for d in self.stages[n].inputs)]:
+                        pending.remove(name)
+                        running[executor.submit(self._execute, name, output_hashes, force)] = name
+                if not running:
+                    break
+                done, _ = wait(running, return_when=FIRST_COMPLETED)
+                for future in done:
+                    name = running.pop(future)
+                    try:
+                        output_hashes[name], status[name], self.timings[name] = future.result()
+                    except Exception as exc:
+                        print(f"❌ Stage '{name}' failed: {exc}")
+                        status[name] = 'failed'
+                        error = error or exc
+                        continue
+                    for dependency in self.stages[name].inputs:
+                        consumers[dependency] -= 1
+                        if consumers[dependency] == 0 and dependency not in targets:
+                            self.results.pop(dependency, None)
+        
+        self.status = status
+        ran = sum(s == 'ran' for s in status.values())
+        cached = sum(s == 'cached' for s in status.values())
+        print(f"🧩 Pipeline: {ran} stage(s) ran, {cached} cached, "
+              f"{len(order) - ran - cached} not run")
+        if error is not None:
+            raise error
+        return {name: self._value(name) for name in targets}
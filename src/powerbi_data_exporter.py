@@ -1,21 +1,108 @@
 # src/powerbi_data_exporter.py
-import pandas as pd
+import hashlib
+import itertools
+import json
 import os
+from datetime import datetime
+import numpy as np
+import pandas as pd
+
+try:
+    import pyarrow  # noqa: F401 - parquet engine
+    PARTITION_FORMAT = 'parquet'
+except ImportError:  # pyarrow is optional, fall back to gzip-compressed CSV partitions
+    PARTITION_FORMAT = 'csv.gz'
+
+def partition_checksum(df):
+    """Content hash of a partition: column names, dtypes and every value"""
+    digest = hashlib.sha256()
+    digest.update(json.dumps([[col, str(dtype)] for col, dtype in df.dtypes.items()]).encode())
+    digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return digest.hexdigest()
+
+CUBE_DIMENSIONS = ['Category', 'Sub-Category', 'Region', 'Segment', 'State', 'Ship Mode']
+CUBE_GRAINS = {'M': 'monthly', 'Q': 'quarterly', 'Y': 'yearly'}
+ALL_MEMBER = 'All'
+
+def aggregation_cube(df, dimensions=None, grains=('M', 'Q', 'Y'), max_dimensions=2, combinations=None, date_col=None):
+    """Sales/Profit/Quantity/transaction/discount aggregates for every dimension combination and grain.
+    
+    The raw rows are grouped once, at month x every requested dimension; every
+    other cell is rolled up from the smallest already-aggregated parent, as with
+    SQL grouping sets. Returns one fact table per grain in which dimensions that
+    are rolled up hold 'All' and Grouping names the dimensions kept.
+    """
+    dimensions = [d for d in (dimensions or CUBE_DIMENSIONS) if d in df.columns]
+    date_col = date_col or [col for col in df.columns if 'date' in col.lower()][0]
+    if combinations is None:
+        combinations = [c for n in range(max_dimensions + 1) for c in itertools.combinations(dimensions, n)]
+    combinations = [tuple(c) for c in combinations]
+    needed = [d for d in dimensions if any(d in c for c in combinations)]
+    
+    values = {'Transactions': np.ones(len(df))}
+    for measure in ('Sales', 'Profit', 'Quantity'):
+        if measure in df.columns:
+            values[measure] = df[measure].to_numpy(dtype=float)
+    if 'Sales' in df.columns and 'Discount' in df.columns:
+        # Sum of Sales x Discount rolls up; the weighted average discount is derived at the end
+        values['Discounted_Sales'] = values['Sales'] * df['Discount'].to_numpy(dtype=float)
+    
+    rows = pd.DataFrame({'period': df[date_col].dt.to_period('M'), **{d: df[d] for d in needed}, **values})
+    base = rows.groupby(['period'] + needed, observed=True, dropna=False, sort=False).sum()
+    
+    tables = {}
+    for grain in grains:
+        if grain == 'M':
+            finest = base
+        else:
+            # Coarser grains roll up from the monthly cells, never from the raw rows
+            periods = base.index.get_level_values('period').asfreq(grain).rename('period')
+            keys = [periods] + [base.index.get_level_values(d) for d in needed]
+            finest = base.groupby(keys, observed=True, dropna=False, sort=False).sum()
+        
+        # Largest groupings first, so each cuboid rolls up from the smallest computed parent
+        computed = {tuple(needed): finest}
+        parts = []
+        for combo in sorted(combinations, key=len, reverse=True):
+            if combo not in computed:
+                parent = min((c for c in computed if set(combo) <= set(c)), key=lambda c: len(computed[c]))
+                computed[combo] = computed[parent].groupby(level=['period', *combo], observed=True,
+                                                          dropna=False, sort=False).sum()
+            part = computed[combo].reset_index()
+            for d in needed:
+                if d not in combo:
+                    part[d] = ALL_MEMBER
+                else:
+                    part[d] = part[d].astype(object)
+            part['Grouping'] = ' x '.join(combo) if combo else 'Total'
+            parts.append(part)
+        
+        table = pd.concat(parts, ignore_index=True)
+        table.insert(0, 'Date', table.pop('period').dt.to_timestamp())
+        if 'Discounted_Sales' in table.columns:
+            table['Avg_Discount'] = table['Discounted_Sales'] / table['Sales'].replace(0, np.nan)
+        if 'Profit' in table.columns and 'Sales' in table.columns:
+            table['Profit_Margin'] = table['Profit'] / table['Sales'].replace(0, np.nan)
+        for col in needed + ['Grouping']:
+            table[col] = table[col].astype('category')
+        table['Transactions'] = table['Transactions'].astype('int64')
+        tables[f'fact_sales_{CUBE_GRAINS[grain]}'] = table.sort_values(['Grouping', 'Date'], ignore_index=True)
+    return tables
 
 class PowerBIDataExporter:
-    def __init__(self, original_df, time_series_data, prophet_forecast, train_data, test_data):
+    def __init__(self, original_df, time_series_data, prophet_forecast, train_data, test_data,
+                 hierarchical_forecast=None):
         self.original_df = original_df
         self.time_series_data = time_series_data
         self.prophet_forecast = prophet_forecast
         self.train_data = train_data
         self.test_data = test_data
+        self.hierarchical_forecast = hierarchical_forecast
         
         os.makedirs('powerbi', exist_ok=True)
     
-    def export_all_datasets(self):
-        """Export all datasets for Power BI"""
-        print("📊 Preparing Power BI datasets...")
-        
+    def build_datasets(self):
+        """Assemble the Power BI datasets without writing them"""
         # Main forecast data
         historical = self.time_series_data[['ds', 'y']].copy()
         historical['Type'] = 'Actual'
@@ -25,18 +112,126 @@ class PowerBIDataExporter:
         future['Type'] = 'Forecast'
         
         combined_data = pd.concat([historical, future])
-        combined_data.to_csv('powerbi/forecast_data.csv', index=False)
         
         # Category data
         date_col = [col for col in self.original_df.columns if 'date' in col.lower()][0]
-        category_data = self.original_df.groupby([pd.Grouper(key=date_col, freq='M'), 'Category'])['Sales'].sum().reset_index()
-        category_data.to_csv('powerbi/category_data.csv', index=False)
+        category_data = self.original_df.groupby([pd.Grouper(key=date_col, freq='M'), 'Category'], observed=True)['Sales'].sum().reset_index()
         
-        print("✅ Power BI datasets exported!")
-        print("   • powerbi/forecast_data.csv")
-        print("   • powerbi/category_data.csv")
-        
-        return {
+        datasets = {
             'forecast_data': combined_data,
             'category_data': category_data
-        }
\ No newline at end of file
+        }
+        
+        # Reconciled per-segment forecasts
+        if self.hierarchical_forecast is not None:
+            datasets['hierarchical_forecast'] = self.hierarchical_forecast
+        return datasets
+    
+    def export_all_datasets(self):
+        """Export all datasets for Power BI"""
+        print("📊 Preparing Power BI datasets...")
+        
+        datasets = self.build_datasets()
+        for name, data in datasets.items():
+            data.to_csv(f'powerbi/{name}.csv', index=False)
+        
+        print("✅ Power BI datasets exported!")
+        for name in datasets:
+            print(f"   • powerbi/{name}.csv")
+        
+        return datasets
+    
+    def export_partitioned(self, root='powerbi/partitioned', partition_by_category=False, datasets=None):
+        """Export datasets as compressed partitions, rewriting only partitions that changed.
+        
+        Layout is <root>/<dataset>/month=YYYY-MM[/Category=...]/part.parquet.
+        <root>/manifest.json lists every partition with its checksum, row count
+        and last update, so a refresh only needs to reload changed partitions.
+        """
+        print(f"📦 Exporting partitioned Power BI datasets ({PARTITION_FORMAT})...")
+        datasets = datasets if datasets is not None else self.build_datasets()
+        os.makedirs(root, exist_ok=True)
+        manifest_path = os.path.join(root, 'manifest.json')
+        previous = {}
+        if os.path.exists(manifest_path):
+            with open(manifest_path) as f:
+                previous = json.load(f).get('datasets', {})
+        
+        manifest = {'format': PARTITION_FORMAT, 'datasets': {}}
+        written = unchanged = removed = 0
+        for name, data in datasets.items():
+            date_col = 'ds' if 'ds' in data.columns else [col for col in data.columns if 'date' in col.lower()][0]
+            keys = [pd.to_datetime(data[date_col]).dt.strftime('%Y-%m').rename('month')]
+            if partition_by_category and 'Category' in data.columns:
+                keys.append(data['Category'].astype(str).rename('Category'))
+            
+            old_partitions = previous.get(name, {}).get('partitions', {})
+            partitions = {}
+            for key, part in data.groupby(keys, sort=True):
+                key = key if isinstance(key, tuple) else (key,)
+                directory = os.path.join(*[f"{k.name}={value}" for k, value in zip(keys, key)])
+                relative_path = os.path.join(name, directory, f'part.{PARTITION_FORMAT}')
+                part = part.reset_index(drop=True)
+                checksum = partition_checksum(part)
+                path = os.path.join(root, relative_path)
+                
+                old = old_partitions.get(relative_path)
+                if old is not None and old['checksum'] == checksum and os.path.exists(path):
+                    partitions[relative_path] = old
+                    unchanged += 1
+                    continue
+                
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                tmp_path = path + '.tmp'
+                if PARTITION_FORMAT == 'parquet':
+                    part.to_parquet(tmp_path, compression='zstd', index=False)
+                else:
+                    part.to_csv(tmp_path, index=False, compression='gzip')
+                os.replace(tmp_path, path)
+                partitions[relative_path] = {
+                    'checksum': checksum,
+                    'rows': len(part),
+                    'bytes': os.path.getsize(path),
+                    'keys': {k.name: value for k, value in zip(keys, key)},
+                    'updated': datetime.now().isoformat(timespec='seconds')
+                }
+                written += 1
+            
+            # Partitions that no longer have rows are deleted
+            for relative_path in set(old_partitions) - set(partitions):
+                path = os.path.join(root, relative_path)
+                if os.path.exists(path):
+                    os.remove(path)
+                directory = os.path.dirname(path)
+                while directory != root and os.path.isdir(directory) and not os.listdir(directory):
+                    os.rmdir(directory)
+                    directory = os.path.dirname(directory)
+                removed += 1
+            
+            manifest['datasets'][name] = {
+                'columns': list(data.columns),
+                'rows': len(data),
+                'partition_by': [k.name for k in keys],
+                'partitions': partitions
+            }
+        
+        manifest['generated'] = datetime.now().isoformat(timespec='seconds')
+        tmp_path = manifest_path + '.tmp'
+        with open(tmp_path, 'w') as f:
+            json.dump(manifest, f, indent=2)
+        os.replace(tmp_path, manifest_path)
+        
+        print(f"✅ Partitions: {written} written, {unchanged} unchanged, {removed} removed")
+        print(f"   • {manifest_path}")
+        return manifest
+    
+    def export_aggregation_cube(self, dimensions=None, grains=('M', 'Q', 'Y'), max_dimensions=2,
+                                root='powerbi/cube'):
+        """Materialize the aggregation cube as fact tables, one per date grain"""
+        print("🧊 Building aggregation cube...")
+        tables = aggregation_cube(self.original_df, dimensions, grains, max_dimensions)
+        for name, table in tables.items():
+            print(f"   {name}: {len(table):,} rows, {table['Grouping'].nunique()} groupings")
+        # Written as partitions so a refresh only reloads periods whose aggregates changed
+        self.export_partitioned(root=root, datasets=tables)
+        return tables
@@ -1,29 +1,44 @@
 # src/prophet_model.py
-from prophet import Prophet
-import matplotlib.pyplot as plt
 import numpy as np
-from sklearn.metrics import mean_absolute_error, mean_squared_error
+from src.model_registry import data_fingerprint
+from src.chart_renderer import draw_forecast
+
+PROPHET_PARAMS = {
+    'yearly_seasonality': True,
+    'weekly_seasonality': False,
+    'daily_seasonality': False,
+    'changepoint_prior_scale': 0.05
+}
 
 class ProphetForecaster:
     def __init__(self):
         self.model = None
         self.forecast = None
     
-    def build_model(self, train_data):
+    def build_model(self, train_data, registry=None, name='prophet'):
         """Build and train Prophet model"""
         print("🔮 Building Prophet model...")
         
         prophet_train = train_data[['ds', 'y']].copy()
         
-        self.model = Prophet(
-            yearly_seasonality=True,
-            weekly_seasonality=False,
-            daily_seasonality=False,
-            changepoint_prior_scale=0.05
-        )
+        if registry is not None:
+            fingerprint = data_fingerprint(prophet_train, PROPHET_PARAMS)
+            cached = registry.load(name, fingerprint)
+            if cached is not None:
+                self.model = cached
+                print("♻️ Training data unchanged - loaded Prophet model from registry")
+                return self.model
+        
+        # Imported on first fit: prophet (and its Stan backend) is slow to import
+        from prophet import Prophet
+        
+        self.model = Prophet(**PROPHET_PARAMS)
         
         self.model.fit(prophet_train)
         print("✅ Prophet model trained!")
+        
+        if registry is not None:
+            registry.save(name, self.model, fingerprint, PROPHET_PARAMS, serializer='prophet')
         return self.model
     
     def make_forecast(self, train_data, periods=12):
@@ -39,6 +54,8 @@ class ProphetForecaster:
             self.forecast[['ds', 'yhat']], on='ds'
         )
         
+        from sklearn.metrics import mean_absolute_error, mean_squared_error
+        
         mae = mean_absolute_error(evaluation_data['y'], evaluation_data['yhat'])
         rmse = np.sqrt(mean_squared_error(evaluation_data['y'], evaluation_data['yhat']))
         
@@ -46,24 +63,23 @@ class ProphetForecaster:
         print(f"📊 Model Performance - MAE: ${mae:,.2f}, RMSE: ${rmse:,.2f}")
         return metrics
     
-    def plot_forecast(self, train_data, test_data):
-        """Plot forecast results"""
-        plt.figure(figsize=(12, 6))
-        
-        # Plot historical data
-        plt.plot(train_data['ds'], train_data['y'], 'b-', label='Historical', linewidth=2)
-        plt.plot(test_data['ds'], test_data['y'], 'g-', label='Actual Test', linewidth=2)
-        
-        # Plot forecast
+    def plot_forecast(self, train_data, test_data, show=True, renderer=None):
+        """Plot forecast results; with a ChartRenderer the chart is queued for batch rendering"""
         future_forecast = self.forecast[self.forecast['ds'] > train_data['ds'].max()]
-        plt.plot(future_forecast['ds'], future_forecast['yhat'], 'r--', label='Forecast', linewidth=2)
+        data = {
+            'train_ds': train_data['ds'].to_numpy(), 'train_y': train_data['y'].to_numpy(),
+            'test_ds': test_data['ds'].to_numpy(), 'test_y': test_data['y'].to_numpy(),
+            'forecast_ds': future_forecast['ds'].to_numpy(), 'forecast_y': future_forecast['yhat'].to_numpy()
+        }
+        if renderer is not None:
+            return renderer.add('forecast', 'prophet_forecast.png', data, figsize=(12, 6), dpi=300)
         
-        plt.title('Sales Forecast with Prophet', fontsize=14, fontweight='bold')
-        plt.ylabel('Sales ($)', fontsize=12)
-        plt.legend()
-        plt.grid(True, alpha=0.3)
-        plt.xticks(rotation=45)
+        import matplotlib.pyplot as plt
         
-        plt.tight_layout()
-        plt.savefig('reports/prophet_forecast.png', dpi=300, bbox_inches='tight')
-        plt.show()
\ No newline at end of file
+        fig = plt.figure(figsize=(12, 6))
+        draw_forecast(fig, data)
+        fig.tight_layout()
+        fig.savefig('reports/prophet_forecast.png', dpi=300, bbox_inches='tight')
+        if show:
+            plt.show()
+        plt.close(fig)
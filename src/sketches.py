@@ -0,0 +1,175 @@
+# src/sketches.py
+import numpy as np
+import pandas as pd
+
+class QuantileSketch:
+    def __init__(self, compression=200, buffer_size=None):
+        """Mergeable approximate quantiles in bounded memory (a merging t-digest).
+        
+        Values are summarised as weighted centroids: small near the tails, where
+        IQR fences and extreme quantiles need precision, and large in the
+        middle. Sketches built over separate chunks merge into one.
+        """
+        self.compression = compression
+        self.buffer_size = buffer_size or 10 * compression
+        self.means = np.empty(0)
+        self.weights = np.empty(0)
+        self.buffer = []
+        self.buffered = 0
+        self.count = 0.0
+        self.min = np.inf
+        self.max = -np.inf
+    
+    def update(self, values):
+        """Add a batch of values (NaNs are ignored)"""
+        values = np.asarray(values, dtype=float).ravel()
+        values = values[~np.isnan(values)]
+        if len(values) == 0:
+            return self
+        self.buffer.append((values, np.ones(len(values))))
+        self.buffered += len(values)
+        self.count += len(values)
+        self.min = min(self.min, values.min())
+        self.max = max(self.max, values.max())
+        if self.buffered >= self.buffer_size:
+            self._compress()
+        return self
+    
+    def merge(self, other):
+        """Fold another sketch's centroids into this one"""
+        other._compress()
+        if other.count:
+            self.buffer.append((other.means, other.weights))
+            self.buffered += len(other.means)
+            self.count += other.count
+            self.min = min(self.min, other.min)
+            self.max = max(self.max, other.max)
+            self._compress()
+        return self
+    
+    def _compress(self):
+        if not self.buffer:
+            return
+        means = np.concatenate([self.means] + [m for m, _ in self.buffer])
+        weights = np.concatenate([self.weights] + [w for _, w in self.buffer])
+        self.buffer = []
+        self.buffered = 0
+        
+        order = np.argsort(means, kind='stable')
+        means, weights = means[order], weights[order]
+        cumulative = np.cumsum(weights)
+        q = (cumulative - weights / 2) / cumulative[-1]
+        # Points that share one unit of the k1 scale function collapse into a centroid
+        k = np.floor(self.compression / (2 * np.pi) * np.arcsin(2 * q - 1))
+        starts = np.flatnonzero(np.r_[True, k[1:] != k[:-1]])
+        self.weights = np.add.reduceat(weights, starts)
+        self.means = np.add.reduceat(means * weights, starts) / self.weights
+    
+    def quantile(self, q):
+        """Approximate quantile(s) q in [0, 1]"""
+        self._compress()
+        if self.count == 0:
+            return np.full(np.shape(q), np.nan) if np.ndim(q) else np.nan
+        centers = np.cumsum(self.weights) - self.weights / 2
+        positions = np.concatenate([[0.0], centers, [self.count]])
+        values = np.concatenate([[self.min], self.means, [self.max]])
+        return np.interp(np.asarray(q, dtype=float) * self.count, positions, values)
+    
+    def __len__(self):
+        return int(self.count)
+
+def hash_values(values):
+    """64-bit hashes of a Series, array or DataFrame (one hash per row)"""
+    if isinstance(values, (pd.Series, pd.DataFrame)):
+        return pd.util.hash_pandas_object(values, index=False).to_numpy()
+    return pd.util.hash_array(np.asarray(values))
+
+class HyperLogLog:
+    def __init__(self, precision=12):
+        """Mergeable distinct-count estimate in 2**precision one-byte registers.
+        
+        The relative error is about 1.04 / sqrt(2**precision): 1.6% at the
+        default 4 KB. Precision must keep the hash remainder within a float's
+        53-bit mantissa so leading zeros can be counted exactly.
+        """
+        if not 11 <= precision <= 18:
+            raise ValueError("precision must be between 11 and 18")
+        self.precision = precision
+        self.registers = np.zeros(2 ** precision, dtype=np.uint8)
+    
+    def update(self, values):
+        """Add a batch of values (anything hash_values accepts; NaNs count as one value)"""
+        return self.update_hashes(hash_values(values))
+    
+    def update_hashes(self, hashes):
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return self
+        tail_bits = 64 - self.precision
+        index = (hashes >> np.uint64(tail_bits)).astype(np.intp)
+        remainder = hashes & np.uint64((1 << tail_bits) - 1)
+        # Rank = position of the first set bit in the remainder (tail_bits + 1 when it is zero)
+        bit_length = np.frexp(remainder.astype(float))[1]
+        ranks = (tail_bits - bit_length + 1).astype(np.uint8)
+        np.maximum.at(self.registers, index, ranks)
+        return self
+    
+    def merge(self, other):
+        if other.precision != self.precision:
+            raise ValueError("Cannot merge HyperLogLogs of different precision")
+        np.maximum(self.registers, other.registers, out=self.registers)
+        return self
+    
+    def estimate(self):
+        """Approximate number of distinct values added"""
+        m = len(self.registers)
+        alpha = 0.7213 / (1 + 1.079 / m)
+        raw = alpha * m * m / np.sum(np.ldexp(1.0, -self.registers.astype(int)))
+        empty = np.count_nonzero(self.registers == 0)
+        if raw <= 2.5 * m and empty:
+            return m * np.log(m / empty)  # linear counting is better for small sets
+        return raw
+
+class BloomFilter:
+    def __init__(self, capacity, error_rate=0.01):
+        """Set membership with no false negatives and about error_rate false positives up to capacity items"""
+        self.capacity = max(1, int(capacity))
+        self.error_rate = error_rate
+        self.n_bits = int(np.ceil(-self.capacity * np.log(error_rate) / np.log(2) ** 2))
+        self.n_hashes = max(1, int(round(self.n_bits / self.capacity * np.log(2))))
+        self.bits = np.zeros((self.n_bits + 7) // 8, dtype=np.uint8)
+        self.count = 0
+    
+    def _positions(self, hashes):
+        # Double hashing: k positions from the two 32-bit halves of one 64-bit hash
+        low = (hashes & np.uint64(0xFFFFFFFF)).astype(np.uint64)
+        high = (hashes >> np.uint64(32)) | np.uint64(1)
+        steps = np.arange(self.n_hashes, dtype=np.uint64)
+        return (low[:, None] + steps[None, :] * high[:, None]) % np.uint64(self.n_bits)
+    
+    def add_hashes(self, hashes):
+        """Add hashed items; returns a mask of those probably added before (earlier in the batch included)"""
+        hashes = np.asarray(hashes, dtype=np.uint64)
+        if len(hashes) == 0:
+            return np.zeros(0, dtype=bool)
+        seen = pd.Series(hashes).duplicated().to_numpy()
+        positions = self._positions(hashes[~seen])
+        byte, bit = positions >> np.uint64(3), np.left_shift(1, positions & np.uint64(7)).astype(np.uint8)
+        seen[~seen] = np.all(self.bits[byte] & bit, axis=1)
+        np.bitwise_or.at(self.bits, byte.ravel(), bit.ravel())
+        self.count += len(hashes)
+        return seen
+    
+    def add(self, values):
+        return self.add_hashes(hash_values(values))
+    
+    def merge(self, other):
+        if other.n_bits != self.n_bits or other.n_hashes != self.n_hashes:
+            raise ValueError("Cannot merge Bloom filters of different sizes")
+        np.bitwise_or(self.bits, other.bits, out=self.bits)
+        self.count += other.count
+        return self
+    
+    def false_positive_rate(self):
+        """Expected false-positive rate at the current fill"""
+        return (1 - np.exp(-self.n_hashes * self.count / self.n_bits)) ** self.n_hashes
@@ -0,0 +1,173 @@
+# src/synthetic_data.py
+import os
+import pandas as pd
+import numpy as np
+
+CATEGORY_TREE = {
+    'Furniture': {'Bookcases': 280, 'Chairs': 230, 'Furnishings': 45, 'Tables': 320},
+    'Office Supplies': {'Appliances': 110, 'Art': 12, 'Binders': 20, 'Envelopes': 22,
+                        'Fasteners': 6, 'Labels': 8, 'Paper': 18, 'Storage': 95, 'Supplies': 25},
+    'Technology': {'Accessories': 70, 'Copiers': 900, 'Machines': 450, 'Phones': 170}
+}
+
+# Typical profit margin per category before discounts
+CATEGORY_MARGIN = {'Furniture': 0.10, 'Office Supplies': 0.22, 'Technology': 0.18}
+
+LOCATIONS = {
+    'West': {'California': ['Los Angeles', 'San Francisco'], 'Washington': ['Seattle'],
+             'Oregon': ['Portland'], 'Colorado': ['Denver']},
+    'East': {'New York': ['New York City'], 'Pennsylvania': ['Philadelphia'],
+             'Ohio': ['Columbus'], 'Massachusetts': ['Boston']},
+    'Central': {'Texas': ['Houston', 'Dallas'], 'Illinois': ['Chicago'],
+                'Michigan': ['Detroit'], 'Minnesota': ['Minneapolis']},
+    'South': {'Florida': ['Miami', 'Jacksonville'], 'Georgia': ['Atlanta'],
+              'Virginia': ['Richmond'], 'Kentucky': ['Louisville']}
+}
+
+REGION_MIX = {'West': 0.32, 'East': 0.28, 'Central': 0.23, 'South': 0.17}
+SEGMENT_MIX = {'Consumer': 0.52, 'Corporate': 0.30, 'Home Office': 0.18}
+SHIP_MODES = {'Standard Class': (0.60, 5), 'Second Class': (0.19, 3),
+              'First Class': (0.16, 2), 'Same Day': (0.05, 0)}
+DISCOUNT_LEVELS = np.array([0.0, 0.1, 0.2, 0.3, 0.5])
+
+class SyntheticDataGenerator:
+    def __init__(self, seed=42, start_date='2018-01-01', end_date='2023-12-31',
+                 n_products=1800, n_customers=800, annual_growth=0.12):
+        self.seed = seed
+        self.dates = pd.date_range(start_date, end_date, freq='D')
+        self.n_customers = n_customers
+        self.annual_growth = annual_growth
+        rng = np.random.default_rng(seed)
+        
+        self.day_weights = self._day_weights()
+        self._build_catalog(rng, n_products)
+        self._build_locations()
+    
+    def _day_weights(self):
+        """Order-date distribution: growth trend x yearly x weekly seasonality"""
+        years = (self.dates - self.dates[0]).days.values / 365.25
+        trend = (1 + self.annual_growth) ** years
+        day_of_year = self.dates.dayofyear.values
+        yearly = 1 + 0.25 * np.sin(2 * np.pi * (day_of_year - 80) / 365.25)
+        yearly = yearly + 0.45 * np.isin(self.dates.month.values, [11, 12])
+        weekly = np.where(self.dates.dayofweek.values >= 5, 0.75, 1.0)
+        weights = trend * yearly * weekly
+        return weights / weights.sum()
+    
+    def _build_catalog(self, rng, n_products):
+        """Products with long-tailed popularity and limited selling windows"""
+        sub_categories = [(cat, sub, price) for cat, subs in CATEGORY_TREE.items()
+                          for sub, price in subs.items()]
+        self.categories = list(CATEGORY_TREE)
+        self.sub_categories = [sub for _, sub, _ in sub_categories]
+        sub_to_category = np.array([self.categories.index(cat) for cat, _, _ in sub_categories])
+        base_price = np.array([price for _, _, price in sub_categories], dtype=float)
+        
+        self.product_sub = rng.integers(0, len(sub_categories), n_products)
+        self.product_category = sub_to_category[self.product_sub]
+        self.product_price = base_price[self.product_sub] * rng.lognormal(0, 0.35, n_products)
+        self.product_ids = np.array([
+            f"{self.categories[c][:3].upper()}-{self.sub_categories[s][:2].upper()}-{10000000 + i}"
+            for i, (c, s) in enumerate(zip(self.product_category, self.product_sub))
+        ])
+        
+        # Zipf-like popularity: a few best sellers, many rarely ordered products
+        popularity = 1.0 / np.arange(1, n_products + 1) ** 1.1
+        self.product_popularity = rng.permutation(popularity / popularity.sum())
+        
+        # Tail products are only sold for part of the history (launches/retirements),
+        # which makes product-level demand intermittent
+        n_days = len(self.dates)
+        core = self.product_popularity >= np.quantile(self.product_popularity, 0.8)
+        launch = rng.integers(0, n_days, n_products)
+        lifetime = rng.integers(n_days // 8, n_days, n_products)
+        self.product_start = np.where(core, 0, launch)
+        self.product_end = np.where(core, n_days, launch + lifetime)
+        self.core_products = np.flatnonzero(core)
+        core_popularity = self.product_popularity[self.core_products]
+        self.core_popularity = core_popularity / core_popularity.sum()
+    
+    def _build_locations(self):
+        rows = [(region, state, city) for region, states in LOCATIONS.items()
+                for state, cities in states.items() for city in cities]
+        self.cities = [c for _, _, c in rows]
+        self.regions, self.location_region = np.unique([r for r, _, _ in rows], return_inverse=True)
+        self.states, self.location_state = np.unique([s for _, s, _ in rows], return_inverse=True)
+        region_names = self.regions[self.location_region]
+        region_sizes = pd.Series(region_names).value_counts()
+        weights = np.array([REGION_MIX[r] / region_sizes[r] for r in region_names])
+        self.location_weights = weights / weights.sum()
+    
+    def generate(self, n_rows, chunk_index=0, row_offset=0):
+        """Generate n_rows of Superstore-shaped transactions in one vectorized pass"""
+        rng = np.random.default_rng([self.seed, chunk_index])
+        
+        # Consecutive rows share an order (two lines per order), so order-level
+        # attributes are drawn once per order and broadcast to its lines
+        order_number = (row_offset + np.arange(n_rows)) // 2
+        line_order = order_number - row_offset // 2
+        n_orders = line_order[-1] + 1 if n_rows else 0
+        
+        day = rng.choice(len(self.dates), size=n_orders, p=self.day_weights)[line_order]
+        location = rng.choice(len(self.cities), size=n_orders, p=self.location_weights)[line_order]
+        segment = rng.choice(len(SEGMENT_MIX), size=n_orders, p=list(SEGMENT_MIX.values()))[line_order]
+        customer = rng.integers(0, self.n_customers, n_orders)[line_order]
+        ship_mode_names = list(SHIP_MODES)
+        ship_mode = rng.choice(len(SHIP_MODES), size=n_orders, p=[p for p, _ in SHIP_MODES.values()])
+        ship_days = np.array([days for _, days in SHIP_MODES.values()])[ship_mode]
+        ship_days = (ship_days + rng.integers(0, 2, n_orders))[line_order]
+        ship_mode = ship_mode[line_order]
+        
+        product = rng.choice(len(self.product_popularity), size=n_rows, p=self.product_popularity)
+        inactive = (day < self.product_start[product]) | (day >= self.product_end[product])
+        product[inactive] = rng.choice(self.core_products, size=inactive.sum(), p=self.core_popularity)
+        
+        category = self.product_category[product]
+        quantity = 1 + rng.poisson(2.8, n_rows)
+        discount = DISCOUNT_LEVELS[rng.choice(len(DISCOUNT_LEVELS), size=n_rows,
+                                              p=[0.48, 0.10, 0.30, 0.06, 0.06])]
+        sales = self.product_price[product] * quantity * (1 - discount) * rng.lognormal(0, 0.1, n_rows)
+        margin = np.array([CATEGORY_MARGIN[c] for c in self.categories])[category]
+        profit = sales * (margin - 1.6 * discount + rng.normal(0, 0.05, n_rows))
+        
+        order_dates = self.dates[day]
+        
+        return pd.DataFrame({
+            'Row ID': row_offset + np.arange(1, n_rows + 1),
+            'Order ID': 'CA-' + pd.Series(order_dates.year).astype(str) + '-' + pd.Series(100000 + order_number).astype(str),
+            'Order Date': order_dates,
+            'Ship Date': order_dates + pd.to_timedelta(ship_days, unit='D'),
+            'Ship Mode': pd.Categorical.from_codes(ship_mode, ship_mode_names),
+            'Customer ID': pd.Categorical.from_codes(
+                customer, [f"CU-{10000 + i}" for i in range(self.n_customers)]
+            ),
+            'Segment': pd.Categorical.from_codes(segment, list(SEGMENT_MIX)),
+            'Country': 'United States',
+            'City': pd.Categorical.from_codes(location, self.cities),
+            'State': pd.Categorical.from_codes(self.location_state[location], self.states),
+            'Region': pd.Categorical.from_codes(self.location_region[location], self.regions),
+            'Product ID': pd.Categorical.from_codes(product, self.product_ids),
+            'Category': pd.Categorical.from_codes(category, self.categories),
+            'Sub-Category': pd.Categorical.from_codes(self.product_sub[product], self.sub_categories),
+            'Sales': np.round(sales, 2),
+            'Quantity': quantity,
+            'Discount': discount,
+            'Profit': np.round(profit, 4)
+        })
+    
+    def iter_chunks(self, n_rows, chunksize=1_000_000):
+        """Yield the dataset in chunks; output depends only on seed and chunksize"""
+        for chunk_index, start in enumerate(range(0, n_rows, chunksize)):
+            yield self.generate(min(chunksize, n_rows - start), chunk_index, row_offset=start)
+    
+    def write_csv(self, path, n_rows, chunksize=1_000_000):
+        """Stream a dataset straight to disk without holding it in memory"""
+        print(f"🏭 Generating {n_rows:,} synthetic rows to {path}...")
+        os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+        
+        for i, chunk in enumerate(self.iter_chunks(n_rows, chunksize)):
+            chunk.to_csv(path, mode='w' if i == 0 else 'a', header=(i == 0),
+                         index=False, date_format='%m/%d/%Y')
+        
+        print(f"✅ Synthetic dataset written: {path}")
+        return path
@@ -1,17 +1,66 @@
 # src/time_series_preparer.py
 import pandas as pd
 import numpy as np
-from sklearn.model_selection import train_test_split
+from src.hierarchy import SeriesHierarchy
+from src.feature_store import FeatureDefinition
+
+def lag_feature_matrix(values, months, horizon=1):
+    """Direct-horizon ML features for a series, as a NumPy array.
+    
+    Row t describes target values[t] using only data up to the forecast
+    origin t - horizon: lag_1/lag_3/lag_6 are the values 0/2/5 periods before
+    the origin, rolling_mean_3 averages the three periods ending at the
+    origin, and month is the target's month. Columns follow FEATURES order in
+    src/xgboost_model.py; rows without enough history are NaN.
+    """
+    values = np.asarray(values, dtype=float)
+    n = len(values)
+    features = np.full((n, 5), np.nan)
+    padded = np.concatenate([np.full(5 + horizon, np.nan), values])
+    # padded[k + 5 + horizon] == values[k]; origin of row t is t - horizon
+    origin = np.arange(n) + 5
+    features[:, 0] = padded[origin]
+    features[:, 1] = padded[origin - 2]
+    features[:, 2] = padded[origin - 5]
+    features[:, 3] = (padded[origin] + padded[origin - 1] + padded[origin - 2]) / 3
+    features[:, 4] = months
+    return features
+
+def ml_features(frame):
+    """Lag, rolling and calendar features of a ds/y series"""
+    y = frame['y']
+    return pd.DataFrame({
+        # Lag features
+        'lag_1': y.shift(1),
+        'lag_3': y.shift(3),
+        'lag_6': y.shift(6),
+        # Rolling statistics over the three periods before the target, never including it
+        'rolling_mean_3': y.shift(1).rolling(3).mean(),
+        'rolling_std_3': y.shift(1).rolling(3).std(),
+        # Time features
+        'month': frame['ds'].dt.month,
+        'year': frame['ds'].dt.year
+    })
 
 class TimeSeriesPreparer:
-    def __init__(self, df):
-        self.df = df.copy()
+    def __init__(self, df, copy=True, feature_store=None):
+        # copy=False takes ownership of df instead of defensively copying it
+        self.df = df.copy() if copy else df
+        # Optional FeatureStore; unchanged features are read back instead of recomputed
+        self.feature_store = feature_store
         self.time_series_data = None
+        self.hierarchy = None
     
-    def create_aggregate_time_series(self, frequency='M'):
+    def create_aggregate_time_series(self, frequency='M', store=None):
         """Create aggregated time series"""
         print("📈 Creating time series data...")
         
+        if store is not None:
+            # Maintained incrementally, so no pass over the full history
+            self.time_series_data = store.time_series()
+            print(f"✅ Time series created with {len(self.time_series_data)} periods")
+            return self.time_series_data
+        
         date_col = [col for col in self.df.columns if 'date' in col.lower()][0]
         
         self.time_series_data = self.df.groupby(pd.Grouper(key=date_col, freq=frequency)).agg({
@@ -22,22 +71,25 @@ class TimeSeriesPreparer:
         print(f"✅ Time series created with {len(self.time_series_data)} periods")
         return self.time_series_data
     
+    def create_hierarchical_time_series(self, levels=None, frequency='M'):
+        """Create every series of the Category/Sub-Category/Region/Segment hierarchy"""
+        print("🌳 Creating hierarchical time series...")
+        
+        self.hierarchy = SeriesHierarchy.from_transactions(self.df, levels=levels, frequency=frequency)
+        print(f"✅ {self.hierarchy.n_series} series created over {len(self.hierarchy.dates)} periods")
+        return self.hierarchy
+    
     def create_features_for_ml(self):
         """Create features for ML models"""
         print("🔧 Creating ML features...")
         
-        # Lag features
-        self.time_series_data['lag_1'] = self.time_series_data['y'].shift(1)
-        self.time_series_data['lag_3'] = self.time_series_data['y'].shift(3)
-        self.time_series_data['lag_6'] = self.time_series_data['y'].shift(6)
-        
-        # Rolling statistics
-        self.time_series_data['rolling_mean_3'] = self.time_series_data['y'].rolling(3).mean()
-        self.time_series_data['rolling_std_3'] = self.time_series_data['y'].rolling(3).std()
-        
-        # Time features
-        self.time_series_data['month'] = self.time_series_data['ds'].dt.month
-        self.time_series_data['year'] = self.time_series_data['ds'].dt.year
+        if self.feature_store is not None:
+            definition = FeatureDefinition('ml_features', ['ds', 'y'], ml_features)
+            features = self.feature_store.materialize('time_series', self.time_series_data, [definition])
+        else:
+            features = ml_features(self.time_series_data)
+        for col in features.columns:
+            self.time_series_data[col] = features[col].values
         
         # Remove NaN
         self.time_series_data = self.time_series_data.dropna()
@@ -1,31 +1,110 @@
 # src/xgboost_model.py
-import xgboost as xgb
-from sklearn.ensemble import RandomForestRegressor
-from sklearn.metrics import mean_absolute_error, mean_squared_error
 import numpy as np
-import matplotlib.pyplot as plt
+import pandas as pd
+from src.model_registry import data_fingerprint
+from src.chart_renderer import draw_model_comparison
+from src.time_series_preparer import lag_feature_matrix
+
+FEATURES = ['lag_1', 'lag_3', 'lag_6', 'rolling_mean_3', 'month']
+XGB_PARAMS = {'n_estimators': 100, 'random_state': 42}
+RF_PARAMS = {'n_estimators': 100, 'random_state': 42}
+# Periods of history the lag features reach back over
+MAX_LAG = 6
+
+def _as_matrix(values):
+    """(n_periods, n_series) float array; a single series becomes one column"""
+    values = np.asarray(values, dtype=float)
+    return values[:, None] if values.ndim == 1 else values
+
+def series_scales(values):
+    """Mean absolute level per series so one pooled model serves series of any size"""
+    scales = np.abs(_as_matrix(values)).mean(axis=0)
+    return np.where(scales > 0, scales, 1.0)
+
+def future_months(dates, periods):
+    """Calendar month of each of the next periods monthly steps"""
+    last_month = pd.DatetimeIndex(dates)[-1].month
+    return (last_month - 1 + np.arange(1, periods + 1)) % 12 + 1
+
+def pooled_training_set(values, dates, horizon=1, scale=True):
+    """Stack horizon-h lag features of every series into one training set"""
+    values = _as_matrix(values)
+    scales = series_scales(values) if scale else np.ones(values.shape[1])
+    months = pd.DatetimeIndex(dates).month.values
+    X_parts, y_parts = [], []
+    for j in range(values.shape[1]):
+        series = values[:, j] / scales[j]
+        X = lag_feature_matrix(series, months, horizon)
+        valid = ~np.isnan(X).any(axis=1)
+        X_parts.append(X[valid])
+        y_parts.append(series[valid])
+    return np.concatenate(X_parts), np.concatenate(y_parts)
+
+def _error_metrics(y_true, y_pred):
+    """MAE and RMSE (same values as sklearn.metrics, without importing it)"""
+    errors = np.asarray(y_true, dtype=float) - np.asarray(y_pred, dtype=float)
+    return float(np.mean(np.abs(errors))), float(np.sqrt(np.mean(errors ** 2)))
 
 class MLForecaster:
-    def __init__(self):
+    def __init__(self, n_jobs=None):
         self.xgb_model = None
         self.rf_model = None
+        # Threads per model fit; None keeps each library's default
+        self.n_jobs = n_jobs
+        self.tuned_params = {}
+        # Pooled multi-step models: name -> (estimator, scale) / ({horizon: estimator}, scale)
+        self.recursive_models = {}
+        self.direct_models = {}
     
-    def build_xgboost_model(self, train_data, test_data):
+    def tune_hyperparameters(self, train_data, model='xgboost', **search_options):
+        """Search hyperparameters with time-ordered CV; later builds use the result"""
+        from src.hyperparameter_search import HyperparameterSearch
+        
+        search = HyperparameterSearch(model=model, **search_options)
+        self.tuned_params[model] = search.run(train_data)
+        return self.tuned_params[model], search.results()
+    
+    def make_estimator(self, name, params=None):
+        """Unfitted 'xgboost' or 'random_forest' estimator"""
+        # Estimator libraries are imported only when a model is actually built
+        if name == 'xgboost':
+            import xgboost as xgb
+            return xgb.XGBRegressor(**{**XGB_PARAMS, **(params or {})}, n_jobs=self.n_jobs)
+        if name == 'random_forest':
+            from sklearn.ensemble import RandomForestRegressor
+            return RandomForestRegressor(**{**RF_PARAMS, **(params or {})}, n_jobs=self.n_jobs)
+        raise ValueError(f"Unknown model: {name}")
+    
+    def _fit_or_load(self, name, params, X_train, y_train, registry):
+        """Fit an estimator, or reuse the registry's copy if data and params match"""
+        if registry is not None:
+            training_data = X_train.assign(y=y_train.values)
+            fingerprint = data_fingerprint(training_data, params)
+            cached = registry.load(name, fingerprint)
+            if cached is not None:
+                print(f"♻️ Training data unchanged - loaded {name} model from registry")
+                return cached
+        
+        model = self.make_estimator(name, params)
+        model.fit(X_train, y_train)
+        
+        if registry is not None:
+            registry.save(name, model, fingerprint, params)
+        return model
+    
+    def build_xgboost_model(self, train_data, test_data, registry=None):
         """Build XGBoost model"""
         print("🌳 Building XGBoost model...")
         
-        features = ['lag_1', 'lag_3', 'lag_6', 'rolling_mean_3', 'month']
-        X_train = train_data[features]
+        X_train = train_data[FEATURES]
         y_train = train_data['y']
-        X_test = test_data[features]
+        X_test = test_data[FEATURES]
         y_test = test_data['y']
         
-        self.xgb_model = xgb.XGBRegressor(n_estimators=100, random_state=42)
-        self.xgb_model.fit(X_train, y_train)
+        self.xgb_model = self._fit_or_load('xgboost', {**XGB_PARAMS, **self.tuned_params.get('xgboost', {})}, X_train, y_train, registry)
         
         y_pred = self.xgb_model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        mae, rmse = _error_metrics(y_test, y_pred)
         
         print(f"✅ XGBoost - MAE: ${mae:,.2f}, RMSE: ${rmse:,.2f}")
         
@@ -34,22 +113,19 @@ class MLForecaster:
             'test_metrics': {'MAE': mae, 'RMSE': rmse}
         }
     
-    def build_random_forest_model(self, train_data, test_data):
+    def build_random_forest_model(self, train_data, test_data, registry=None):
         """Build Random Forest model"""
         print("🌲 Building Random Forest model...")
         
-        features = ['lag_1', 'lag_3', 'lag_6', 'rolling_mean_3', 'month']
-        X_train = train_data[features]
+        X_train = train_data[FEATURES]
         y_train = train_data['y']
-        X_test = test_data[features]
+        X_test = test_data[FEATURES]
         y_test = test_data['y']
         
-        self.rf_model = RandomForestRegressor(n_estimators=100, random_state=42)
-        self.rf_model.fit(X_train, y_train)
+        self.rf_model = self._fit_or_load('random_forest', {**RF_PARAMS, **self.tuned_params.get('random_forest', {})}, X_train, y_train, registry)
         
         y_pred = self.rf_model.predict(X_test)
-        mae = mean_absolute_error(y_test, y_pred)
-        rmse = np.sqrt(mean_squared_error(y_test, y_pred))
+        mae, rmse = _error_metrics(y_test, y_pred)
         
         print(f"✅ Random Forest - MAE: ${mae:,.2f}, RMSE: ${rmse:,.2f}")
         
@@ -58,29 +134,115 @@ class MLForecaster:
             'test_metrics': {'MAE': mae, 'RMSE': rmse}
         }
     
-    def plot_model_comparison(self, train_data, test_data, xgb_results, rf_results):
-        """Compare model performances"""
-        fig, (ax1, ax2) = plt.subplots(1, 2, figsize=(15, 5))
-        
-        # Test set comparison
-        ax1.plot(test_data['ds'], test_data['y'], 'k-', label='Actual', linewidth=2)
-        ax1.plot(test_data['ds'], xgb_results['test_predictions'], 'r--', label='XGBoost')
-        ax1.plot(test_data['ds'], rf_results['test_predictions'], 'b--', label='Random Forest')
-        ax1.set_title('Model Comparison: Test Set', fontweight='bold')
-        ax1.legend()
-        ax1.grid(True, alpha=0.3)
-        
-        # Performance comparison
-        models = ['XGBoost', 'Random Forest']
-        mae_scores = [xgb_results['test_metrics']['MAE'], rf_results['test_metrics']['MAE']]
-        
-        ax2.bar(models, mae_scores, color=['red', 'blue'], alpha=0.7)
-        ax2.set_title('Model Performance (MAE)', fontweight='bold')
-        ax2.set_ylabel('MAE ($)')
-        
-        for i, v in enumerate(mae_scores):
-            ax2.text(i, v, f'${v:,.0f}', ha='center', va='bottom', fontweight='bold')
-        
-        plt.tight_layout()
-        plt.savefig('reports/model_comparison.png', dpi=300, bbox_inches='tight')
-        plt.show()
\ No newline at end of file
+    def fit_recursive(self, values, dates, model='xgboost', scale=True):
+        """Fit one pooled one-step-ahead model over every series (columns of values)"""
+        X, y = pooled_training_set(values, dates, 1, scale)
+        estimator = self.make_estimator(model, self.tuned_params.get(model))
+        estimator.fit(X, y)
+        self.recursive_models[model] = (estimator, scale)
+        return estimator
+    
+    def forecast_recursive(self, values, dates, periods=12, model='xgboost'):
+        """Roll the lag features forward, predicting all series in one call per step.
+        
+        values has shape (n_periods, n_series) (or is a single series);
+        returns (periods, n_series).
+        """
+        estimator, scale = self.recursive_models[model]
+        values = _as_matrix(values)
+        if len(values) < MAX_LAG:
+            raise ValueError(f"Recursive forecasting needs at least {MAX_LAG} periods of history")
+        n_series = values.shape[1]
+        scales = series_scales(values) if scale else np.ones(n_series)
+        months = future_months(dates, periods)
+        
+        # Columns 0..MAX_LAG-1 hold the latest history, step s writes column MAX_LAG + s
+        path = np.empty((n_series, MAX_LAG + periods))
+        path[:, :MAX_LAG] = (values[-MAX_LAG:] / scales).T
+        X = np.empty((n_series, len(FEATURES)))
+        for step in range(periods):
+            t = MAX_LAG + step
+            X[:, 0] = path[:, t - 1]
+            X[:, 1] = path[:, t - 3]
+            X[:, 2] = path[:, t - 6]
+            X[:, 3] = path[:, t - 3:t].mean(axis=1)
+            X[:, 4] = months[step]
+            path[:, t] = estimator.predict(X)
+        return (path[:, MAX_LAG:] * scales[:, None]).T
+    
+    def fit_direct(self, values, dates, horizons=range(1, 13), model='xgboost', scale=True):
+        """Fit one pooled model per horizon, each predicting h steps from the origin"""
+        estimators = {}
+        for h in horizons:
+            X, y = pooled_training_set(values, dates, h, scale)
+            estimators[h] = self.make_estimator(model, self.tuned_params.get(model))
+            estimators[h].fit(X, y)
+        self.direct_models[model] = (estimators, scale)
+        return estimators
+    
+    def forecast_direct(self, values, dates, periods=12, model='xgboost'):
+        """Predict every horizon straight from the last observed period; returns (periods, n_series)"""
+        estimators, scale = self.direct_models[model]
+        missing = sorted(set(range(1, periods + 1)) - set(estimators))
+        if missing:
+            raise ValueError(f"No direct model fitted for horizons {missing}")
+        values = _as_matrix(values)
+        if len(values) < MAX_LAG:
+            raise ValueError(f"Direct forecasting needs at least {MAX_LAG} periods of history")
+        n_series = values.shape[1]
+        scales = series_scales(values) if scale else np.ones(n_series)
+        months = future_months(dates, periods)
+        
+        # Every horizon shares the origin's lags; only the target month differs
+        history = values[-MAX_LAG:] / scales
+        X = np.empty((n_series, len(FEATURES)))
+        X[:, 0] = history[-1]
+        X[:, 1] = history[-3]
+        X[:, 2] = history[-6]
+        X[:, 3] = history[-3:].mean(axis=0)
+        forecasts = np.empty((periods, n_series))
+        for h in range(1, periods + 1):
+            X[:, 4] = months[h - 1]
+            forecasts[h - 1] = estimators[h].predict(X)
+        return forecasts * scales
+    
+    def make_forecast(self, time_series_data, periods=12, model='xgboost', strategy='recursive'):
+        """Fit on a ds/y series and forecast the next periods months as a ds/yhat frame"""
+        data = time_series_data.sort_values('ds')
+        dates = pd.DatetimeIndex(data['ds'])
+        values = data['y'].to_numpy(dtype=float)
+        
+        if strategy == 'recursive':
+            self.fit_recursive(values, dates, model)
+            yhat = self.forecast_recursive(values, dates, periods, model)[:, 0]
+        elif strategy == 'direct':
+            self.fit_direct(values, dates, range(1, periods + 1), model)
+            yhat = self.forecast_direct(values, dates, periods, model)[:, 0]
+        else:
+            raise ValueError(f"Unknown strategy: {strategy}")
+        
+        last_period = dates[-1].to_period('M')
+        future = pd.period_range(last_period + 1, periods=periods, freq='M')
+        print(f"✅ {model} {strategy} forecast generated for {periods} periods")
+        return pd.DataFrame({'ds': future.to_timestamp(how='end').normalize(), 'yhat': yhat})
+    
+    def plot_model_comparison(self, train_data, test_data, xgb_results, rf_results, show=True, renderer=None):
+        """Compare model performances; with a ChartRenderer the chart is queued for batch rendering"""
+        data = {
+            'test_ds': test_data['ds'].to_numpy(), 'test_y': test_data['y'].to_numpy(),
+            'xgb_predictions': np.asarray(xgb_results['test_predictions']),
+            'rf_predictions': np.asarray(rf_results['test_predictions']),
+            'xgb_mae': xgb_results['test_metrics']['MAE'], 'rf_mae': rf_results['test_metrics']['MAE']
+        }
+        if renderer is not None:
+            return renderer.add('model_comparison', 'model_comparison.png', data, figsize=(15, 5), dpi=300)
+        
+        import matplotlib.pyplot as plt
+        
+        fig = plt.figure(figsize=(15, 5))
+        draw_model_comparison(fig, data)
+        fig.tight_layout()
+        fig.savefig('reports/model_comparison.png', dpi=300, bbox_inches='tight')
+        if show:
+            plt.show()
+        plt.close(fig)
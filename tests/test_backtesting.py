@@ -0,0 +1,34 @@
+# tests/test_backtesting.py
+import numpy as np
+import pandas as pd
+from src.backtesting import Backtester, rolling_origin_splits
+
+def test_expanding_and_sliding_splits():
+    assert list(rolling_origin_splits(6, min_train=3)) == [(0, 2), (0, 3), (0, 4)]
+    assert list(rolling_origin_splits(6, min_train=3, window='sliding', window_size=2)) == [(1, 2), (2, 3), (3, 4)]
+
+def test_baselines_never_look_past_the_cutoff():
+    # Each value is its own position, so a prediction shows which period it was read from
+    n = 60
+    series = pd.DataFrame({'ds': pd.date_range('2019-01-31', periods=n, freq='ME'), 'y': np.arange(n, dtype=float)})
+    backtester = Backtester(series, models=('naive', 'seasonal_naive'), horizons=(1, 6, 12, 13, 24),
+                            min_train=24, max_workers=1)
+    backtester.run()
+    results = backtester.results
+    
+    assert (results['y_pred'] <= results['cutoff']).all()
+    seasonal = results[results['model'] == 'seasonal_naive']
+    assert set(seasonal['horizon']) == {1, 6, 12, 13, 24}
+    # h and h + 12 repeat the same month of the last observed season
+    expected = seasonal['cutoff'] - 12 + (seasonal['horizon'] - 1) % 12 + 1
+    assert (seasonal['y_pred'] == expected).all()
+    assert (results.loc[results['model'] == 'naive', 'y_pred'] == results.loc[results['model'] == 'naive', 'cutoff']).all()
+
+def test_metrics_table_scores_each_model_and_horizon():
+    series = pd.DataFrame({'ds': pd.date_range('2019-01-31', periods=36, freq='ME'),
+                           'y': 100 + 10 * np.sin(np.arange(36) * np.pi / 6)})
+    table = Backtester(series, models=('naive', 'seasonal_naive'), horizons=(1, 12), min_train=24, max_workers=1).run()
+    
+    assert set(zip(table['model'], table['horizon'])) == {(m, h) for m in ('naive', 'seasonal_naive') for h in (1, 12)}
+    # A pure 12-month cycle is forecast exactly by last season's value
+    assert np.allclose(table.loc[table['model'] == 'seasonal_naive', 'MAE'], 0)
@@ -0,0 +1,70 @@
+# tests/test_cleaning_plan.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.cleaning_plan import CleaningPlan
+from src.data_cleaner import DataCleaner, outlier_bounds, streaming_outlier_bounds
+from src.data_validator import frame_chunks
+from src.synthetic_data import SyntheticDataGenerator
+
+def orders_with_gaps():
+    """Synthetic orders with missing Sales, Quantity and Region cells"""
+    df = SyntheticDataGenerator(seed=7, start_date='2021-01-01', end_date='2022-12-31').generate(20_000)
+    df['Quantity'] = df['Quantity'].astype(float)
+    df.loc[df.index[::97], 'Sales'] = np.nan
+    df.loc[df.index[::89], 'Quantity'] = np.nan
+    df.loc[df.index[::83], 'Region'] = None
+    return df
+
+def test_streamed_fences_match_exact_iqr_fences():
+    df = orders_with_gaps()
+    exact_lower, exact_upper = outlier_bounds(df, 'Sales')
+    lower, upper = streaming_outlier_bounds(frame_chunks(df, 3_000), 'Sales')
+    
+    iqr = df['Sales'].quantile(0.75) - df['Sales'].quantile(0.25)
+    assert lower == pytest.approx(exact_lower, abs=0.02 * iqr)
+    assert upper == pytest.approx(exact_upper, abs=0.02 * iqr)
+
+def test_streamed_group_fences_match_exact_group_fences():
+    df = orders_with_gaps().dropna(subset=['Sales'])
+    exact = outlier_bounds(df, 'Sales', ['Category', 'Sub-Category'])
+    streamed = streaming_outlier_bounds(frame_chunks(df, 3_000), 'Sales', ['Category', 'Sub-Category'])
+    
+    assert list(streamed.index) == list(exact.index)
+    quartiles = df.groupby(['Category', 'Sub-Category'], observed=True)['Sales'].quantile([0.25, 0.75]).unstack()
+    tolerance = 0.05 * (quartiles[0.75] - quartiles[0.25]).to_numpy()
+    assert (np.abs(streamed.to_numpy() - exact.to_numpy()) <= tolerance[:, None]).all()
+
+def test_plan_matches_the_step_by_step_cleaner():
+    df = orders_with_gaps()
+    expected = DataCleaner(df).clean_dates().handle_missing_values().remove_outliers('Sales').df
+    plan = CleaningPlan(outlier_column='Sales')
+    cleaned = plan.fit_transform(df.copy())
+    
+    pd.testing.assert_frame_equal(cleaned, expected)
+    assert plan.stats['imputed'] == df[['Sales', 'Quantity', 'Region']].isna().sum().sum()
+    assert plan.stats['rows_out'] == len(expected)
+
+def test_chunked_plan_fences_include_imputed_values():
+    df = orders_with_gaps()
+    exact = CleaningPlan(outlier_column='Sales', outlier_group_by='Category').fit(df)
+    chunked = CleaningPlan(outlier_column='Sales', outlier_group_by='Category').fit_chunks(frame_chunks(df, 3_000))
+    
+    iqr = (exact.bounds_['upper'] - exact.bounds_['lower']).to_numpy() / 4
+    assert chunked.fill_values_['Sales'] == pytest.approx(exact.fill_values_['Sales'], rel=0.02)
+    assert (np.abs(chunked.bounds_.to_numpy() - exact.bounds_.to_numpy()) <= 0.05 * iqr[:, None]).all()
+
+def test_chunked_plan_uses_the_configured_strategies():
+    df = orders_with_gaps()
+    plan = CleaningPlan(impute={'Quantity': 'mean', 'Region': 'mode', 'Sales': 'drop'}, outlier_column='Discount')
+    plan.fit_chunks(frame_chunks(df, 3_000))
+    cleaned = pd.concat(plan.transform_chunks(chunk.copy() for chunk in frame_chunks(df, 3_000)))
+    
+    assert plan.fill_values_['Quantity'] == pytest.approx(df['Quantity'].mean())
+    assert plan.fill_values_['Region'] == df['Region'].mode().iloc[0]
+    assert cleaned['Sales'].notna().all() and cleaned[['Quantity', 'Region']].notna().all().all()
+    assert len(cleaned) <= df['Sales'].notna().sum()
+
+def test_transform_requires_a_fitted_plan():
+    with pytest.raises(ValueError):
+        CleaningPlan().transform(pd.DataFrame({'Sales': [1.0]}))
@@ -0,0 +1,88 @@
+# tests/test_data_cache.py
+import os
+import numpy as np
+import pandas as pd
+from src.data_cache import DataCache, read_frame, write_frame, frame_extension
+
+def test_frame_round_trip_keeps_values_and_dtypes(tmp_path):
+    df = pd.DataFrame({
+        'Order Date': pd.date_range('2020-01-01', periods=5, freq='D'),
+        'Sales': np.arange(5, dtype='float32'),
+        'Region': pd.Categorical(['East', 'West', 'East', 'South', 'West'])
+    })
+    path = str(tmp_path / ('frame' + frame_extension()))
+    write_frame(df, path)
+    
+    pd.testing.assert_frame_equal(read_frame(path), df)
+
+def test_hit_after_put_and_miss_for_another_variant(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('Sales\n1\n2\n')
+    cache = DataCache(str(tmp_path / 'cache'))
+    df = pd.DataFrame({'Sales': [1.0, 2.0]})
+    cache.put(str(source), df, variant='float')
+    
+    pd.testing.assert_frame_equal(cache.get(str(source), variant='float'), df)
+    assert cache.get(str(source), variant='int') is None
+
+def test_index_survives_a_new_cache_instance(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('Sales\n1\n')
+    DataCache(str(tmp_path / 'cache')).put(str(source), pd.DataFrame({'Sales': [1.0]}))
+    
+    assert DataCache(str(tmp_path / 'cache')).get(str(source)) is not None
+
+def test_changed_source_misses_and_drops_the_stale_entry(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('Sales\n1\n')
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(str(source), pd.DataFrame({'Sales': [1.0]}))
+    source.write_text('Sales\n1\n2\n')
+    
+    assert cache.get(str(source)) is None
+    assert cache.index['entries'] == {}
+    assert [f for f in os.listdir(tmp_path / 'cache') if f != 'index.json'] == []
+
+def test_get_or_load_parses_once(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('Sales\n1\n2\n')
+    cache = DataCache(str(tmp_path / 'cache'))
+    loads = []
+    
+    def load():
+        loads.append(1)
+        return pd.read_csv(source)
+    
+    first = cache.get_or_load(str(source), load)
+    second = cache.get_or_load(str(source), load)
+    assert len(loads) == 1
+    pd.testing.assert_frame_equal(first, second)
+
+def test_least_recently_used_entry_is_evicted_first(tmp_path):
+    frame = pd.DataFrame({'Sales': np.arange(100_000, dtype='float64')})
+    sources = []
+    for name in ('a', 'b', 'c'):
+        path = tmp_path / f'{name}.csv'
+        path.write_text(name)
+        sources.append(str(path))
+    # Room for two of the ~0.8 MB frames
+    cache = DataCache(str(tmp_path / 'cache'), max_size_mb=2)
+    cache.put(sources[0], frame)
+    cache.put(sources[1], frame)
+    cache.get(sources[0])
+    cache.put(sources[2], frame)
+    
+    assert cache.get(sources[0]) is not None
+    assert cache.get(sources[1]) is None
+    assert cache.get(sources[2]) is not None
+
+def test_missing_cache_file_is_a_miss(tmp_path):
+    source = tmp_path / 'orders.csv'
+    source.write_text('Sales\n1\n')
+    cache = DataCache(str(tmp_path / 'cache'))
+    cache.put(str(source), pd.DataFrame({'Sales': [1.0]}))
+    for entry in cache.index['entries'].values():
+        os.remove(tmp_path / 'cache' / entry['file'])
+    
+    assert cache.get(str(source)) is None
+    assert cache.index['entries'] == {}
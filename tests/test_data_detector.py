@@ -0,0 +1,49 @@
+# tests/test_data_detector.py
+import pandas as pd
+from src.data_detector import DataColumnDetector, infer_semantic_type, sample_file
+from src.synthetic_data import SyntheticDataGenerator
+
+def test_value_based_types():
+    assert infer_semantic_type(pd.Series(['$1,204.50', '$15.00', '$310.99'])) == 'currency'
+    assert infer_semantic_type(pd.Series(['0.2', '0', '0.45', '0.1'])) == 'ratio'
+    assert infer_semantic_type(pd.Series(['02134', '10001', '94105', '60601'])) == 'code'
+    assert infer_semantic_type(pd.Series(['3', '1', '7', '2'])) == 'integer'
+    assert infer_semantic_type(pd.Series(['CA-2016-152156', 'US-2015-108966', 'CA-2017-100006'])) == 'id'
+    assert infer_semantic_type(pd.Series(['11/08/2016', '06/12/2016', '10/11/2015'])) == 'date'
+    assert infer_semantic_type(pd.Series(['East', 'West', 'East', 'West', 'South', 'East'])) == 'categorical'
+
+def test_sampled_file_detects_the_superstore_roles(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    SyntheticDataGenerator(seed=1).write_csv(path, 20_000)
+    detector = DataColumnDetector.from_file(path, sample_bytes=64 * 1024)
+    detected, mapping = detector.detect_columns()
+    
+    assert len(detector.df) < 20_000
+    # Sampled ranges reach the end of the file
+    assert pd.to_numeric(detector.df['Row ID']).max() > 15_000
+    assert mapping == {'date': 'Order Date', 'sales': 'Sales', 'category': 'Category', 'region': 'Region'}
+    assert {'Row ID', 'Order ID', 'Customer ID', 'Product ID'} <= set(detected['id_columns'])
+    # A single Country is not a slice
+    assert 'Country' not in detected['region_columns']
+
+def test_row_numbers_restarting_in_appended_files_stay_an_id():
+    part = SyntheticDataGenerator(seed=2).generate(10_000)
+    # More rows than the detector samples, so it works from a subsample
+    df = pd.concat([part, part, part], ignore_index=True)
+    detector = DataColumnDetector(df)
+    
+    assert len(df) > detector.sample_rows
+    assert detector.infer_types()['Row ID'] == 'id'
+    assert detector.read_schema(['Row ID'])['dtypes'] == {'Row ID': 'int32'}
+
+def test_read_schema_types_the_columns_it_is_asked_for(tmp_path):
+    path = str(tmp_path / 'orders.csv')
+    SyntheticDataGenerator(seed=3).write_csv(path, 2_000)
+    schema = DataColumnDetector(sample_file(path)).read_schema(['Order Date', 'Sales', 'Quantity', 'Region', 'Order ID'])
+    
+    assert schema['columns'] == ['Order Date', 'Sales', 'Quantity', 'Region', 'Order ID']
+    assert schema['date_formats'] == {'Order Date': '%m/%d/%Y'}
+    assert schema['dtypes'] == {'Sales': 'float32', 'Quantity': 'int32', 'Region': 'category', 'Order ID': 'category'}
+    
+    typed = pd.read_csv(path, usecols=schema['columns'], dtype=schema['dtypes'])
+    assert typed['Sales'].dtype == 'float32' and str(typed['Region'].dtype) == 'category'
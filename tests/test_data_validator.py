@@ -0,0 +1,80 @@
+# tests/test_data_validator.py
+import json
+import numpy as np
+import pandas as pd
+import pytest
+from src.data_validator import DataProfile, DataValidator, frame_chunks
+from src.synthetic_data import SyntheticDataGenerator
+
+MAPPING = {'date': 'Order Date', 'sales': 'Sales'}
+
+def orders_with_problems():
+    """Synthetic orders with 100 repeated rows, 3 blank dates, a refund and a free order"""
+    df = SyntheticDataGenerator(seed=4, start_date='2021-01-01', end_date='2022-12-31').generate(5_000)
+    df = pd.concat([df, df.iloc[4_000:4_100]], ignore_index=True)
+    df['Order Date'] = df['Order Date'].astype(object)
+    df.loc[[7, 8, 9], 'Order Date'] = None
+    df.loc[10, 'Sales'] = -25.0
+    df.loc[11, 'Sales'] = 0.0
+    return df
+
+def test_streamed_profile_matches_exact_statistics():
+    df = orders_with_problems()
+    profile = DataProfile('Order Date', 'Sales', expected_rows=len(df))
+    for chunk in frame_chunks(df, chunk_rows=1_000):
+        profile.update(chunk)
+    summary = profile.to_dict()
+    
+    dates = pd.to_datetime(df['Order Date'])
+    assert summary['rows'] == len(df) and summary['chunks'] == 6
+    assert summary['null_rates']['Order Date'] == round(3 / len(df), 6)
+    assert summary['min_date'] == str(dates.min().date()) and summary['max_date'] == str(dates.max().date())
+    assert summary['months'] == 24 and summary['missing_months'] == []
+    # The Bloom filter may take a few first sightings for repeats, never the reverse
+    assert 100 <= summary['duplicate_rows'] <= 100 + 0.01 * len(df)
+    assert (summary['negative_sales'], summary['zero_sales']) == (1, 1)
+    assert summary['cardinality']['Region'] == 4
+    assert summary['cardinality']['Customer ID'] == pytest.approx(df['Customer ID'].nunique(), rel=0.05)
+    json.dumps(summary)
+
+def test_merged_profiles_match_one_profile_over_both_parts():
+    df = orders_with_problems()
+    first, second = df.iloc[:2_500], df.iloc[2_500:]
+    whole = DataProfile('Order Date', 'Sales').update(df).to_dict()
+    merged = DataProfile('Order Date', 'Sales').update(first).merge(DataProfile('Order Date', 'Sales').update(second))
+    merged = merged.to_dict()
+    
+    for key in ('rows', 'null_rates', 'cardinality', 'min_date', 'max_date', 'months', 'negative_sales', 'total_sales'):
+        assert merged[key] == whole[key]
+    # Each repeated row sits in the same part as its original
+    assert 100 <= merged['duplicate_rows'] <= 100 + 0.01 * len(df)
+
+def test_months_without_rows_are_reported():
+    dates = pd.Series(pd.to_datetime(['2021-01-15', '2021-02-03', '2021-05-20', '2021-06-01']))
+    profile = DataProfile('Order Date', 'Sales').update(pd.DataFrame({'Order Date': dates, 'Sales': 1.0}))
+    
+    assert profile.to_dict()['missing_months'] == ['2021-03', '2021-04']
+
+def test_streaming_validation_scores_a_clean_dataset_fully():
+    df = SyntheticDataGenerator(seed=5, start_date='2021-01-01', end_date='2022-12-31').generate(3_000)
+    requirements, score, summary = DataValidator(df, MAPPING).validate_streaming()
+    
+    assert all(requirements.values())
+    assert score == 100.0
+    assert summary['rows'] == 3_000
+
+def test_streaming_validation_flags_duplicates_and_refunds():
+    df = orders_with_problems()
+    df.loc[:400, 'Sales'] = -1.0
+    requirements, score, _ = DataValidator(df, MAPPING).validate_streaming(chunks=frame_chunks(df, 1_000))
+    
+    assert not requirements['few_duplicates'] and not requirements['positive_sales']
+    assert requirements['sufficient_date_range'] and requirements['continuous_dates']
+    assert score == 75.0
+
+def test_missing_columns_stop_the_pass_after_the_first_chunk():
+    df = pd.DataFrame({'when': pd.date_range('2021-01-01', periods=5_000, freq='h'), 'amount': np.ones(5_000)})
+    requirements, _, summary = DataValidator(df, MAPPING).validate_streaming(chunks=frame_chunks(df, 1_000))
+    
+    assert summary['chunks'] == 1
+    assert not requirements['has_date_column'] and not requirements['has_sales_column']
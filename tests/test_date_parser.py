@@ -0,0 +1,35 @@
+# tests/test_date_parser.py
+import pandas as pd
+from src.date_parser import DateParser
+
+def test_format_inferred_from_unambiguous_values():
+    parser = DateParser()
+    assert parser.infer_format(['01/31/2021', '12/25/2021']) == '%m/%d/%Y'
+    assert parser.infer_format(['31/01/2021', '25/12/2021']) == '%d/%m/%Y'
+    assert parser.infer_format(['not a date', 'nor this']) is None
+
+def test_parse_keeps_missing_values_and_categoricals():
+    parser = DateParser()
+    dates = pd.Series(['01/31/2021', None, '01/31/2021', '02/01/2021'], name='Order Date')
+    
+    parsed = parser.parse(dates)
+    assert parsed.isna().tolist() == [False, True, False, False]
+    assert parsed.iloc[3] == pd.Timestamp('2021-02-01')
+    assert parser.parse(dates.astype('category')).equals(parsed)
+
+def test_cached_format_is_rechecked_for_another_file_with_the_same_column():
+    parser = DateParser()
+    parser.parse(pd.Series(['01/31/2021', '12/25/2021'], name='Order Date'))
+    assert parser.formats['Order Date'] == '%m/%d/%Y'
+    
+    iso = parser.parse(pd.Series(['2022-03-01', '2022-03-15'], name='Order Date'))
+    assert iso.notna().all()
+    assert parser.formats['Order Date'] == '%Y-%m-%d'
+
+def test_parse_columns_parses_each_column_once():
+    parser = DateParser()
+    df = pd.DataFrame({'Order Date': ['01/31/2021', 'soon'], 'Ship Date': ['02/02/2021', '02/03/2021']})
+    
+    assert parser.parse_columns(df, ['Order Date', 'Ship Date', 'Missing']) == {'Order Date': 1, 'Ship Date': 0}
+    assert parser.is_parsed(df, 'Order Date')
+    assert parser.parse_columns(df, ['Order Date']) == {}
@@ -0,0 +1,45 @@
+# tests/test_feature_store.py
+import sys
+import types
+import pandas as pd
+from src.feature_engineer import FeatureEngineer
+from src.feature_store import FeatureDefinition, FeatureStore
+
+HELPERS = '''
+def double(frame):
+    return frame * {factor}
+
+def compute(frame):
+    return double(frame).rename(columns=lambda col: col + '_doubled')
+'''
+
+def load_helpers(monkeypatch, path, factor):
+    """(Re)load a project module whose compute function delegates to a helper"""
+    with open(path, 'w') as f:
+        f.write(HELPERS.format(factor=factor))
+    module = types.ModuleType('src.feature_helpers')
+    module.__file__ = str(path)
+    exec(compile(open(path).read(), str(path), 'exec'), vars(module))
+    monkeypatch.setitem(sys.modules, 'src.feature_helpers', module)
+    return module
+
+def test_editing_a_helper_changes_the_definition_hash(monkeypatch, tmp_path):
+    path = tmp_path / 'feature_helpers.py'
+    before = FeatureDefinition('doubled', ['Sales'], load_helpers(monkeypatch, path, 2).compute).definition_hash()
+    same = FeatureDefinition('doubled', ['Sales'], load_helpers(monkeypatch, path, 2).compute).definition_hash()
+    after = FeatureDefinition('doubled', ['Sales'], load_helpers(monkeypatch, path, 3).compute).definition_hash()
+    
+    assert before == same
+    assert before != after
+
+def test_unchanged_features_are_read_back_from_the_store(tmp_path):
+    df = pd.DataFrame({'year': [2021] * 3 + [2022] * 3, 'month': [1, 1, 2, 1, 1, 2],
+                       'Sales': [1.0, 3.0, 5.0, 2.0, 4.0, 6.0]})
+    store = FeatureStore(str(tmp_path))
+    
+    first = FeatureEngineer(df, feature_store=store).create_aggregate_features().df
+    second = FeatureEngineer(df, feature_store=store).create_aggregate_features().df
+    
+    assert first['avg_monthly_sales'].tolist() == [2.0, 2.0, 5.0, 3.0, 3.0, 6.0]
+    pd.testing.assert_frame_equal(first, second)
+    assert len(store.manifest('transactions')['features']['monthly_aggregates']['versions']) == 1
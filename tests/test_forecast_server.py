@@ -0,0 +1,118 @@
+# tests/test_forecast_server.py
+import json
+import os
+import threading
+import urllib.error
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+import pandas as pd
+import pytest
+from src.forecast_server import ForecastServer, ModelCache, publish_recursive_model
+from src.model_registry import ModelRegistry
+
+SERIES_IDS = ['Total', 'Furniture', 'Technology']
+DATES = pd.date_range('2019-01-31', periods=36, freq='ME')
+
+@pytest.fixture(scope='module')
+def server(tmp_path_factory):
+    models_dir = tmp_path_factory.mktemp('models')
+    registry = ModelRegistry(str(models_dir))
+    months = np.arange(36)
+    furniture = 100 + 20 * np.sin(months * np.pi / 6)
+    technology = 50 + months
+    publish_recursive_model(registry, np.column_stack([furniture + technology, furniture, technology]),
+                            DATES, SERIES_IDS, 'xgboost')
+    # A test-set model needs lag features the server does not have
+    registry.save('random_forest', {'fitted': True}, 'abc')
+    
+    server = ForecastServer(str(models_dir), port=0, batch_window_ms=50)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield server
+    server.shutdown()
+    thread.join()
+
+def get(server, path):
+    """(status, JSON body) of a GET request"""
+    try:
+        with urllib.request.urlopen(server.address + path, timeout=30) as response:
+            return response.status, json.load(response)
+    except urllib.error.HTTPError as error:
+        return error.code, json.load(error)
+
+def test_forecast_continues_after_the_history(server):
+    status, body = get(server, '/forecast?model=xgboost&series=Furniture&horizon=3')
+    
+    assert status == 200
+    assert body['ds'] == ['2022-01-31', '2022-02-28', '2022-03-31']
+    assert len(body['yhat']) == 3 and all(np.isfinite(body['yhat']))
+
+def test_models_lists_only_servable_models(server):
+    assert get(server, '/models') == (200, {'models': ['xgboost']})
+
+def test_unservable_model_is_not_found_rather_than_an_error(server):
+    status, body = get(server, '/forecast?model=random_forest')
+    
+    assert status == 404
+    assert 'not servable' in body['error']
+
+def test_bad_requests_are_rejected(server):
+    assert get(server, '/forecast?model=xgboost&series=Office')[0] == 404
+    assert get(server, '/forecast?model=xgboost&horizon=0')[0] == 400
+    assert get(server, '/forecast?model=xgboost&horizon=soon')[0] == 400
+    assert get(server, '/nowhere')[0] == 404
+
+def test_concurrent_requests_share_batches(server):
+    before = get(server, '/metrics')[1]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        results = list(executor.map(lambda series: get(server, f'/forecast?series={series}&horizon=2'),
+                                    SERIES_IDS * 4))
+    after = get(server, '/metrics')[1]
+    
+    assert all(status == 200 for status, _ in results)
+    assert after['batches'] - before['batches'] < len(results)
+    assert after['cache']['models'] == ['xgboost_serving']
+
+def test_republishing_unchanged_history_skips_the_refit(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    values = np.tile(np.arange(36, dtype=float)[:, None], (1, 2))
+    publish_recursive_model(registry, values, DATES, ['a', 'b'])
+    saved_at = os.stat(tmp_path / 'xgboost_serving.pkl').st_mtime_ns
+    
+    assert publish_recursive_model(registry, values, DATES, ['a', 'b']) == 'xgboost_serving'
+    assert os.stat(tmp_path / 'xgboost_serving.pkl').st_mtime_ns == saved_at
+
+def test_model_cache_evicts_the_least_recently_used_model(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    for name in ('a', 'b', 'c'):
+        registry.save(name, np.zeros(60_000), name)
+    # Each model is ~0.5 MB on disk: room for two
+    cache = ModelCache(registry, max_memory_mb=1)
+    cache.get('a')
+    cache.get('b')
+    cache.get('a')
+    cache.get('c')
+    
+    stats = cache.stats()
+    assert stats['models'] == ['a', 'c']
+    assert (stats['hits'], stats['misses'], stats['evictions']) == (1, 3, 1)
+
+def test_model_cache_serves_a_republished_model_without_a_restart(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('a', {'version': 1}, 'v1')
+    cache = ModelCache(registry)
+    assert cache.get('a') == {'version': 1}
+    assert cache.get('a') == {'version': 1}
+    
+    registry.save('a', {'version': 2, 'padding': 'x' * 100}, 'v2')
+    assert cache.get('a')['version'] == 2
+    
+    stats = cache.stats()
+    assert (stats['hits'], stats['misses'], stats['reloads']) == (1, 2, 1)
+    assert stats['memory_mb'] == round(os.path.getsize(tmp_path / 'a.pkl') / 1024 / 1024, 2)
+    
+    os.remove(tmp_path / 'a.pkl')
+    with pytest.raises(KeyError):
+        cache.get('a')
+    assert cache.stats()['models'] == []
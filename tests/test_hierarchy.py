@@ -0,0 +1,100 @@
+# tests/test_hierarchy.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.hierarchy import SeriesHierarchy
+from src.hierarchical_forecaster import MODELS, HierarchicalForecaster, seasonal_naive_forecast
+from src.synthetic_data import SyntheticDataGenerator
+
+ORDERS = pd.DataFrame({
+    'Order Date': pd.to_datetime(['2021-01-10', '2021-01-12', '2021-01-20', '2021-03-05', '2021-03-09']),
+    'Category': ['Furniture', 'Furniture', 'Technology', 'Furniture', 'Technology'],
+    'Region': ['East', 'West', 'East', 'East', 'East'],
+    'Sales': [10.0, 20.0, 5.0, 7.0, 3.0]
+})
+
+def test_every_node_sums_its_bottom_series():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    
+    assert hierarchy.series_ids == ['Total', 'Furniture', 'Technology',
+                                    'Furniture | East', 'Furniture | West', 'Technology | East']
+    assert hierarchy.level_name(2) == 'Category x Region'
+    # February has no orders at all and is kept as zeros
+    assert hierarchy.series('Total')['y'].tolist() == [35.0, 0.0, 10.0]
+    assert hierarchy.series('Furniture')['y'].tolist() == [30.0, 0.0, 7.0]
+    assert hierarchy.series('Technology | East')['y'].tolist() == [5.0, 0.0, 3.0]
+
+def test_long_frame_has_one_row_per_series_and_period():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    long = hierarchy.to_long()
+    
+    assert len(long) == hierarchy.n_series * 3
+    assert long.loc[long['series_id'] == 'Furniture | West', 'y'].tolist() == [20.0, 0.0, 0.0]
+    assert set(long['level']) == {'Total', 'Category', 'Category x Region'}
+
+@pytest.mark.parametrize('method', ['bottom_up', 'ols', 'wls'])
+def test_reconciled_forecasts_add_up(method):
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    base = np.random.default_rng(0).uniform(1, 50, (4, hierarchy.n_series))
+    reconciled = hierarchy.reconcile(base, method)
+    
+    bottom = reconciled[:, hierarchy.bottom_index]
+    assert np.allclose(reconciled, bottom @ hierarchy.summing_matrix.T)
+
+def test_bottom_up_keeps_bottom_forecasts():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    base = np.arange(hierarchy.n_series, dtype=float)[None, :]
+    reconciled = hierarchy.reconcile(base, 'bottom_up')
+    
+    assert np.array_equal(reconciled[0, hierarchy.bottom_index], base[0, hierarchy.bottom_index])
+    assert reconciled[0, 0] == base[0, hierarchy.bottom_index].sum()
+
+@pytest.mark.parametrize('method', ['ols', 'wls'])
+def test_coherent_forecasts_are_left_unchanged(method):
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    coherent = np.array([[4.0, 1.0, 2.0]]) @ hierarchy.summing_matrix.T
+    
+    assert np.allclose(hierarchy.reconcile(coherent, method), coherent)
+
+def test_unknown_reconciliation_method_is_rejected():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category'])
+    with pytest.raises(ValueError):
+        hierarchy.reconcile(np.zeros((1, hierarchy.n_series)), 'top_down')
+
+def test_seasonal_naive_repeats_the_last_season():
+    values = np.arange(24, dtype=float).reshape(12, 2)
+    forecast = seasonal_naive_forecast(values, periods=15, season_length=12)
+    
+    assert forecast.shape == (15, 2)
+    assert np.array_equal(forecast[:12], values)
+    assert np.array_equal(forecast[12:], values[:3])
+
+def test_forecaster_frame_has_base_and_reconciled_rows_after_the_history():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category', 'Region'])
+    forecaster = HierarchicalForecaster(hierarchy, model='seasonal_naive')
+    forecaster.fit_forecast(periods=2)
+    frame = forecaster.reconcile('wls')
+    
+    assert len(frame) == hierarchy.n_series * 2
+    assert frame['ds'].drop_duplicates().dt.strftime('%Y-%m-%d').tolist() == ['2021-04-30', '2021-05-31']
+    totals = frame[frame['series_id'] == 'Total'].set_index('ds')['yhat']
+    bottoms = frame[frame['series_id'].str.contains(' | ', regex=False)].groupby('ds')['yhat'].sum()
+    assert np.allclose(totals, bottoms)
+
+@pytest.mark.parametrize('model', MODELS)
+def test_every_supported_model_forecasts_every_node(model):
+    if model == 'prophet':
+        pytest.importorskip('prophet')
+    orders = SyntheticDataGenerator(seed=6, start_date='2020-01-01', end_date='2022-12-31').generate(3_000)
+    hierarchy = SeriesHierarchy.from_transactions(orders, levels=['Category'])
+    forecaster = HierarchicalForecaster(hierarchy, model=model, max_workers=1)
+    
+    base = forecaster.fit_forecast(periods=3)
+    assert base.shape == (3, hierarchy.n_series)
+    assert np.isfinite(base).all()
+    assert forecaster.future_dates.strftime('%Y-%m-%d').tolist() == ['2023-01-31', '2023-02-28', '2023-03-31']
+
+def test_unknown_model_is_rejected_before_fitting():
+    hierarchy = SeriesHierarchy.from_transactions(ORDERS, levels=['Category'])
+    with pytest.raises(ValueError, match='Unknown model'):
+        HierarchicalForecaster(hierarchy, model='arima')
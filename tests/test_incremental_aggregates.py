@@ -0,0 +1,112 @@
+# tests/test_incremental_aggregates.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.incremental_aggregates import IncrementalAggregateStore
+
+HEADER = 'Order Date,Category,Sales\n'
+FIRST_ROWS = ('2021-01-05,Furniture,100\n'
+              '2021-01-20,Technology,50\n'
+              '2021-03-02,Furniture,30\n')
+APPENDED_ROWS = ('2021-03-15,Technology,70\n'
+                 '2021-04-01,Furniture,10\n')
+
+def exact_stats(csv_path, by=()):
+    df = pd.read_csv(csv_path, parse_dates=['Order Date'])
+    keys = [df['Order Date'].dt.to_period('M').rename('period')] + [df[col] for col in by]
+    grouped = df.groupby(keys)['Sales']
+    return pd.DataFrame({'mean': grouped.mean(), 'std': grouped.std(), 'count': grouped.count()})
+
+def test_append_reads_only_new_rows_and_matches_a_full_rebuild(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates'))
+    store.ingest_file(str(csv_path))
+    with open(csv_path, 'a') as f:
+        f.write(APPENDED_ROWS)
+    
+    reopened = IncrementalAggregateStore(str(tmp_path / 'aggregates'))
+    reopened.ingest_file(str(csv_path))
+    
+    assert reopened.partials['count'].sum() == 5
+    pd.testing.assert_frame_equal(reopened.period_stats(), exact_stats(csv_path), check_names=False)
+
+def test_partial_last_line_waits_for_the_next_ingest(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS + '2021-03-15,Techno')
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates'))
+    store.ingest_file(str(csv_path))
+    assert store.partials['count'].sum() == 3
+    
+    with open(csv_path, 'a') as f:
+        f.write('logy,70\n')
+    store.ingest_file(str(csv_path))
+    assert store.partials['count'].sum() == 4
+    assert store.partials.loc[pd.Period('2021-03', 'M'), 'sum'] == 100
+
+def test_rewrite_with_the_same_header_rebuilds(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates'))
+    store.ingest_file(str(csv_path))
+    
+    # Same header and a longer body, so it looks like an append by size alone
+    csv_path.write_text(HEADER + FIRST_ROWS.replace('100', '900') + APPENDED_ROWS)
+    store.ingest_file(str(csv_path))
+    
+    assert store.partials['count'].sum() == 5
+    pd.testing.assert_frame_equal(store.period_stats(), exact_stats(csv_path), check_names=False)
+
+def test_grouped_store_gives_per_group_and_overall_stats(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS + APPENDED_ROWS)
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates'), group_by=['Category'])
+    store.ingest_file(str(csv_path))
+    
+    pd.testing.assert_frame_equal(store.period_stats(), exact_stats(csv_path, ['Category']), check_names=False)
+    pd.testing.assert_frame_equal(store.period_stats(by_group=False), exact_stats(csv_path), check_names=False)
+
+def test_store_for_another_grouping_starts_empty(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    
+    grouped = IncrementalAggregateStore(str(tmp_path / 'aggregates'), group_by=['Category'])
+    assert len(grouped.partials) == 0
+
+def test_time_series_fills_months_without_rows_with_zero(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    series = IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path)).time_series()
+    
+    assert series['ds'].dt.strftime('%Y-%m-%d').tolist() == ['2021-01-31', '2021-02-28', '2021-03-31']
+    assert np.array_equal(series['y'], [150.0, 0.0, 30.0])
+
+def test_crash_between_partials_and_state_does_not_double_count(tmp_path, monkeypatch):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    with open(csv_path, 'a') as f:
+        f.write(APPENDED_ROWS)
+    
+    # The new partials reach disk, but the process dies before the state does
+    def crash(*args, **kwargs):
+        raise KeyboardInterrupt
+    monkeypatch.setattr('src.incremental_aggregates.json.dump', crash)
+    with pytest.raises(KeyboardInterrupt):
+        IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    monkeypatch.undo()
+    
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    assert store.partials['count'].sum() == 5
+    pd.testing.assert_frame_equal(store.period_stats(), exact_stats(csv_path), check_names=False)
+
+def test_unreadable_state_rebuilds_from_scratch(tmp_path):
+    csv_path = tmp_path / 'orders.csv'
+    csv_path.write_text(HEADER + FIRST_ROWS)
+    IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    state_path = tmp_path / 'aggregates' / 'state.json'
+    state_path.write_text(state_path.read_text()[:20])
+    
+    store = IncrementalAggregateStore(str(tmp_path / 'aggregates')).ingest_file(str(csv_path))
+    assert store.partials['count'].sum() == 3
@@ -0,0 +1,62 @@
+# tests/test_model_registry.py
+import pickle
+import pandas as pd
+from src.model_registry import LazyModel, ModelRegistry, data_fingerprint
+
+class Doubler:
+    loads = 0
+    
+    def __init__(self):
+        self.scale = 2
+    
+    def __setstate__(self, state):
+        Doubler.loads += 1
+        self.__dict__.update(state)
+    
+    def predict(self, values):
+        return [self.scale * v for v in values]
+
+def test_fingerprint_tracks_data_and_params():
+    data = pd.DataFrame({'ds': pd.date_range('2021-01-31', periods=3, freq='ME'), 'y': [1.0, 2.0, 3.0]})
+    
+    assert data_fingerprint(data, {'depth': 3}) == data_fingerprint(data.copy(), {'depth': 3})
+    assert data_fingerprint(data, {'depth': 3}) != data_fingerprint(data, {'depth': 4})
+    assert data_fingerprint(data) != data_fingerprint(data.assign(y=[1.0, 2.0, 4.0]))
+
+def test_load_is_lazy_until_the_model_is_used(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('doubler', Doubler(), 'abc')
+    Doubler.loads = 0
+    
+    model = registry.load('doubler', 'abc')
+    assert isinstance(model, LazyModel)
+    assert Doubler.loads == 0
+    assert model.predict([1, 2]) == [2, 4]
+    model.predict([3])
+    assert Doubler.loads == 1
+
+def test_load_misses_on_another_fingerprint_or_a_missing_file(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('doubler', Doubler(), 'abc', params={'scale': 2})
+    
+    assert registry.load('doubler', 'other') is None
+    assert registry.load('unknown') is None
+    assert registry.metadata('doubler')['params'] == {'scale': 2}
+    (tmp_path / 'doubler.pkl').unlink()
+    assert registry.load('doubler', 'abc') is None
+
+def test_names_lists_registered_models(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('b_model', Doubler(), '1')
+    registry.save('a_model', Doubler(), '2')
+    
+    assert registry.names() == ['a_model', 'b_model']
+
+def test_lazy_handle_pickles_without_loading(tmp_path):
+    registry = ModelRegistry(str(tmp_path))
+    registry.save('doubler', Doubler(), 'abc')
+    Doubler.loads = 0
+    
+    restored = pickle.loads(pickle.dumps(registry.load('doubler')))
+    assert Doubler.loads == 0
+    assert restored.predict([5]) == [10]
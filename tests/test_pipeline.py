@@ -0,0 +1,125 @@
+# tests/test_pipeline.py
+import os
+import pytest
+from src.pipeline import Pipeline, value_hash
+
+def build(cache_dir, calls, out_path, scale=2):
+    """source -> doubled -> written, where written saves its total to out_path"""
+    pipeline = Pipeline(str(cache_dir), max_workers=2)
+    
+    def source():
+        calls.append('source')
+        return [1, 2, 3]
+    
+    def doubled(values, scale):
+        calls.append('doubled')
+        return [v * scale for v in values]
+    
+    def written(values, path):
+        calls.append('written')
+        with open(path, 'w') as f:
+            f.write(str(sum(values)))
+        return sum(values)
+    
+    pipeline.add('source', source)
+    pipeline.add('doubled', doubled, ['source'], config={'scale': scale})
+    pipeline.add('written', written, ['doubled'], config={'path': str(out_path)}, outputs=['{path}'])
+    return pipeline
+
+def test_second_run_uses_cached_outputs(tmp_path):
+    calls = []
+    first = build(tmp_path / 'cache', calls, tmp_path / 'total.txt').run(['written'])
+    calls.clear()
+    second = build(tmp_path / 'cache', calls, tmp_path / 'total.txt').run(['written'])
+    
+    assert first == second == {'written': 12}
+    assert calls == []
+
+def test_config_change_reruns_only_downstream_stages(tmp_path):
+    build(tmp_path / 'cache', [], tmp_path / 'total.txt').run(['written'])
+    calls = []
+    result = build(tmp_path / 'cache', calls, tmp_path / 'total.txt', scale=3).run(['written'])
+    
+    assert result == {'written': 18}
+    assert calls == ['doubled', 'written']
+
+def test_deleted_output_file_reruns_the_stage_that_wrote_it(tmp_path):
+    out_path = tmp_path / 'total.txt'
+    build(tmp_path / 'cache', [], out_path).run(['written'])
+    os.remove(out_path)
+    calls = []
+    build(tmp_path / 'cache', calls, out_path).run(['written'])
+    
+    assert calls == ['written']
+    assert out_path.read_text() == '12'
+
+def test_modified_output_file_reruns_the_stage_that_wrote_it(tmp_path):
+    out_path = tmp_path / 'total.txt'
+    build(tmp_path / 'cache', [], out_path).run(['written'])
+    out_path.write_text('edited by hand')
+    calls = []
+    build(tmp_path / 'cache', calls, out_path).run(['written'])
+    
+    assert calls == ['written']
+    assert out_path.read_text() == '12'
+
+def test_failed_stage_resumes_from_the_failure(tmp_path):
+    calls = []
+    pipeline = build(tmp_path / 'cache', calls, tmp_path / 'missing_dir' / 'total.txt')
+    with pytest.raises(FileNotFoundError):
+        pipeline.run(['written'])
+    assert pipeline.status == {'source': 'ran', 'doubled': 'ran', 'written': 'failed'}
+    
+    os.makedirs(tmp_path / 'missing_dir')
+    calls.clear()
+    build(tmp_path / 'cache', calls, tmp_path / 'missing_dir' / 'total.txt').run(['written'])
+    assert calls == ['written']
+
+def test_force_reruns_a_cached_stage(tmp_path):
+    build(tmp_path / 'cache', [], tmp_path / 'total.txt').run(['written'])
+    calls = []
+    build(tmp_path / 'cache', calls, tmp_path / 'total.txt').run(['written'], force=['doubled'])
+    
+    # written's input is unchanged, so it stays cached
+    assert calls == ['doubled']
+
+def test_dependency_cycle_is_rejected(tmp_path):
+    pipeline = Pipeline(str(tmp_path))
+    pipeline.add('a', lambda b: b, ['b'])
+    pipeline.add('b', lambda a: a, ['a'])
+    with pytest.raises(ValueError, match='cycle'):
+        pipeline.run(['a'])
+
+class Node:
+    def __init__(self, value):
+        self.value = value
+        self.children = []
+        self.parent = None
+    
+    def add(self, child):
+        child.parent = self
+        self.children.append(child)
+        return self
+
+def test_objects_with_back_references_hash_by_content():
+    first = Node(1).add(Node(2))
+    same = Node(1).add(Node(2))
+    other = Node(1).add(Node(3))
+    
+    assert value_hash(first) == value_hash(same)
+    assert value_hash(first) != value_hash(other)
+
+def test_stage_returning_a_cyclic_object_runs_and_caches(tmp_path):
+    calls = []
+    
+    def tree():
+        calls.append('tree')
+        return Node(1).add(Node(2))
+    
+    for _ in range(2):
+        pipeline = Pipeline(str(tmp_path))
+        pipeline.add('tree', tree)
+        output = pipeline.run(['tree'])['tree']
+    
+    assert calls == ['tree']
+    assert output.children[0].parent is output
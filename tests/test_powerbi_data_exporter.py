@@ -0,0 +1,48 @@
+# tests/test_powerbi_data_exporter.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.powerbi_data_exporter import aggregation_cube, ALL_MEMBER
+from src.synthetic_data import SyntheticDataGenerator
+
+GRAINS = {'M': 'fact_sales_monthly', 'Q': 'fact_sales_quarterly', 'Y': 'fact_sales_yearly'}
+
+def direct_aggregates(df, grain, dimensions):
+    """Sales, Transactions and Avg_Discount straight from the raw rows"""
+    keys = [df['Order Date'].dt.to_period(grain).dt.to_timestamp().rename('Date')] + [df[d] for d in dimensions]
+    grouped = df.assign(Discounted=df['Sales'] * df['Discount']).groupby(keys, observed=True)
+    expected = pd.DataFrame({
+        'Sales': grouped['Sales'].sum(),
+        'Transactions': grouped['Sales'].size(),
+        'Avg_Discount': grouped['Discounted'].sum() / grouped['Sales'].sum()
+    })
+    return expected.sort_index()
+
+@pytest.mark.parametrize('grain', ['M', 'Q', 'Y'])
+@pytest.mark.parametrize('dimensions', [('Category', 'Region'), ()])
+def test_cube_cells_match_a_groupby_on_the_raw_rows(grain, dimensions):
+    df = SyntheticDataGenerator(seed=8, start_date='2021-01-01', end_date='2022-12-31').generate(5_000)
+    tables = aggregation_cube(df, dimensions=['Category', 'Region', 'Segment'], max_dimensions=2)
+    table = tables[GRAINS[grain]]
+    
+    grouping = ' x '.join(dimensions) if dimensions else 'Total'
+    cells = table[table['Grouping'] == grouping]
+    for d in ['Category', 'Region', 'Segment']:
+        if d not in dimensions:
+            assert (cells[d] == ALL_MEMBER).all()
+    cells = cells.set_index(['Date', *dimensions])[['Sales', 'Transactions', 'Avg_Discount']].sort_index()
+    expected = direct_aggregates(df, grain, list(dimensions))
+    
+    assert [tuple(np.atleast_1d(key)) for key in cells.index] == [tuple(np.atleast_1d(key)) for key in expected.index]
+    np.testing.assert_allclose(cells['Sales'], expected['Sales'], rtol=1e-9)
+    assert (cells['Transactions'].to_numpy() == expected['Transactions'].to_numpy()).all()
+    np.testing.assert_allclose(cells['Avg_Discount'], expected['Avg_Discount'], rtol=1e-9)
+
+def test_cube_has_every_grouping_up_to_max_dimensions():
+    df = SyntheticDataGenerator(seed=8, start_date='2021-01-01', end_date='2021-12-31').generate(1_000)
+    table = aggregation_cube(df, dimensions=['Category', 'Region', 'Segment'], grains=('Y',))['fact_sales_yearly']
+    
+    assert set(table['Grouping']) == {'Total', 'Category', 'Region', 'Segment', 'Category x Region',
+                                      'Category x Segment', 'Region x Segment'}
+    # Every grouping partitions the same rows
+    assert (table.groupby('Grouping', observed=True)['Transactions'].sum() == len(df)).all()
@@ -0,0 +1,73 @@
+# tests/test_sketches.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.sketches import BloomFilter, HyperLogLog, QuantileSketch, hash_values
+
+def test_quantiles_close_to_exact_with_bounded_centroids():
+    values = np.random.default_rng(0).lognormal(3, 1, 200_000)
+    sketch = QuantileSketch()
+    for chunk in np.array_split(values, 20):
+        sketch.update(chunk)
+    
+    q = [0.01, 0.25, 0.5, 0.75, 0.99]
+    exact = np.quantile(values, q)
+    assert np.allclose(sketch.quantile(q), exact, rtol=0.02)
+    assert sketch.quantile(0) == values.min() and sketch.quantile(1) == values.max()
+    assert len(sketch.means) < 2 * sketch.compression
+    assert len(sketch) == len(values)
+
+def test_merged_quantile_sketches_match_one_over_all_values():
+    rng = np.random.default_rng(1)
+    parts = [rng.normal(100, 15, 50_000), rng.normal(160, 5, 10_000)]
+    merged = QuantileSketch().update(parts[0]).merge(QuantileSketch().update(parts[1]))
+    
+    everything = np.concatenate(parts)
+    assert np.allclose(merged.quantile([0.25, 0.5, 0.9]), np.quantile(everything, [0.25, 0.5, 0.9]), rtol=0.01)
+
+def test_quantile_sketch_ignores_nans_and_handles_empty():
+    assert np.isnan(QuantileSketch().quantile(0.5))
+    sketch = QuantileSketch().update([1.0, np.nan, 3.0])
+    assert len(sketch) == 2
+    assert sketch.quantile(0.5) == pytest.approx(2.0)
+
+def test_hyperloglog_estimate_within_a_few_percent():
+    values = pd.Series(np.arange(50_000)).astype(str)
+    hll = HyperLogLog()
+    # Repeats do not add to the count
+    hll.update(values).update(values.iloc[:10_000])
+    
+    assert hll.estimate() == pytest.approx(50_000, rel=0.05)
+
+def test_hyperloglog_small_sets_are_nearly_exact():
+    assert HyperLogLog().update(pd.Series(['East', 'West', 'South', 'Central'])).estimate() == pytest.approx(4, abs=0.1)
+
+def test_merged_hyperloglogs_estimate_the_union():
+    left = HyperLogLog().update(np.arange(0, 30_000))
+    right = HyperLogLog().update(np.arange(20_000, 50_000))
+    
+    assert left.merge(right).estimate() == pytest.approx(50_000, rel=0.05)
+    with pytest.raises(ValueError):
+        left.merge(HyperLogLog(precision=14))
+
+def test_bloom_filter_flags_repeats_without_false_negatives():
+    bloom = BloomFilter(100_000)
+    first = bloom.add(pd.Series(np.arange(50_000)))
+    again = bloom.add(pd.Series(np.arange(40_000, 60_000)))
+    
+    assert first.mean() < 0.01
+    assert again[:10_000].all()
+    assert again[10_000:].mean() < 0.02
+
+def test_bloom_filter_flags_repeats_within_one_batch():
+    rows = pd.DataFrame({'Order ID': ['A', 'B', 'A'], 'Sales': [1.0, 2.0, 1.0]})
+    assert BloomFilter(10).add_hashes(hash_values(rows)).tolist() == [False, False, True]
+
+def test_merged_bloom_filters_remember_both_sides():
+    left, right = BloomFilter(1000), BloomFilter(1000)
+    left.add(np.arange(100))
+    right.add(np.arange(100, 200))
+    
+    assert left.merge(right).add(np.arange(200)).all()
+    with pytest.raises(ValueError):
+        left.merge(BloomFilter(5000))
@@ -0,0 +1,78 @@
+# tests/test_xgboost_model.py
+import numpy as np
+import pandas as pd
+import pytest
+from src.xgboost_model import MLForecaster, pooled_training_set
+
+DATES = pd.date_range('2021-01-31', periods=36, freq='ME')
+
+def panel():
+    """Three seasonal monthly series of very different sizes, (36, 3)"""
+    season = 1 + 0.3 * np.sin(2 * np.pi * np.arange(36) / 12)
+    trend = np.linspace(1.0, 1.5, 36)
+    return np.column_stack([100 * season * trend, 5_000 * season, 20 * trend])
+
+class ShiftEstimator:
+    """Predicts lag_1 + 1 and records the feature rows it was asked about"""
+    def __init__(self):
+        self.calls = []
+    
+    def predict(self, X):
+        self.calls.append(X.copy())
+        return X[:, 0] + 1
+
+def test_pooled_training_set_aligns_lags_with_the_horizon():
+    values = panel()
+    X, y = pooled_training_set(values, DATES, horizon=3, scale=False)
+    
+    # First usable row of a series is t = 5 + horizon; its lag_1 is the value at the origin t - 3
+    assert len(X) == 3 * (36 - 8)
+    assert X[0, 0] == values[5, 0] and y[0] == values[8, 0]
+    assert X[0, 4] == DATES[8].month
+
+def test_recursive_forecast_shape_and_dates():
+    values = panel()
+    forecaster = MLForecaster(n_jobs=1)
+    forecaster.fit_recursive(values, DATES)
+    forecast = forecaster.forecast_recursive(values, DATES, periods=12)
+    
+    assert forecast.shape == (12, 3)
+    assert np.isfinite(forecast).all()
+    # Scaling keeps each series near its own level
+    assert (forecast.mean(axis=0).argsort() == values.mean(axis=0).argsort()).all()
+    
+    frame = forecaster.make_forecast(pd.DataFrame({'ds': DATES, 'y': values[:, 0]}), periods=4)
+    assert frame['ds'].tolist() == list(pd.to_datetime(['2024-01-31', '2024-02-29', '2024-03-31', '2024-04-30']))
+    assert frame['ds'].min() > DATES[-1]
+
+def test_recursive_steps_feed_predictions_back_as_lags():
+    values = panel()
+    forecaster = MLForecaster()
+    estimator = ShiftEstimator()
+    forecaster.recursive_models['xgboost'] = (estimator, False)
+    forecast = forecaster.forecast_recursive(values, DATES, periods=4)
+    
+    last = values[-1]
+    assert np.allclose(forecast, last + np.arange(1, 5)[:, None])
+    # Step 2 onwards sees the previous prediction as lag_1, and step 4 sees step 1 as lag_3
+    for step in range(1, 4):
+        assert np.allclose(estimator.calls[step][:, 0], forecast[step - 1])
+    assert np.allclose(estimator.calls[3][:, 1], forecast[0])
+    assert np.allclose(estimator.calls[1][:, 3], (values[-2] + values[-1] + forecast[0]) / 3)
+    assert [X[0, 4] for X in estimator.calls] == [1, 2, 3, 4]
+
+def test_direct_forecast_uses_one_model_per_horizon():
+    values = panel()
+    forecaster = MLForecaster(n_jobs=1)
+    estimators = forecaster.fit_direct(values, DATES, horizons=range(1, 7), model='random_forest')
+    forecast = forecaster.forecast_direct(values, DATES, periods=6, model='random_forest')
+    
+    assert sorted(estimators) == [1, 2, 3, 4, 5, 6]
+    assert forecast.shape == (6, 3)
+    assert np.isfinite(forecast).all()
+    with pytest.raises(ValueError):
+        forecaster.forecast_direct(values, DATES, periods=12, model='random_forest')
+    
+    frame = forecaster.make_forecast(pd.DataFrame({'ds': DATES, 'y': values[:, 1]}), periods=3,
+                                     model='random_forest', strategy='direct')
+    assert len(frame) == 3 and frame['ds'].iloc[0] == pd.Timestamp('2024-01-31')